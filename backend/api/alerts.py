@@ -1,11 +1,22 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Header, Response
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import json
 import os
+import sys
 import logging
 
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Shared project log writer, project database, ETag helpers and alert snapshot
+# (kebab-case log-writer.py, project-db.py, doc-store.py, alert-scheduler.py)
+from utils import log_writer
+from utils import project_db
+from utils import doc_store
+from utils import alert_scheduler
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,55 +32,49 @@ class AlertTask(BaseModel):
     due_date: datetime
     days_overdue: int
 
+class UpcomingTask(BaseModel):
+    id: str
+    title: str
+    owner: str
+    due_date: datetime
+    days_until_due: int
+
 class AlertResponse(BaseModel):
     message: str
     alerts_sent: int
     overdue_tasks: List[AlertTask]
+    # Set when served from the precomputed snapshot
+    upcoming_tasks: Optional[List[UpcomingTask]] = None
+    generation: Optional[int] = None
+    computed_at: Optional[str] = None
 
 class AlertRequest(BaseModel):
     send_notifications: bool = True
     include_pending: bool = False
+    plan_id: Optional[int] = None  # Only this plan's stories; all stories and tasks if omitted
 
 # Helper functions
-def load_plan_data():
-    """Load the current plan data to check for overdue tasks."""
+def find_overdue_tasks(include_pending=False, plan_id=None):
+    """Find tasks that are overdue based on their due date, most overdue first."""
+    today = datetime.now().date()
     try:
-        plan_path = os.path.join("data", "plan.json")
-        if not os.path.exists(plan_path):
-            logger.warning("No plan.json found. Creating empty plan.")
-            return {"tasks": []}
-        
-        with open(plan_path, "r") as f:
-            return json.load(f)
+        # Only the items due before today are read from the work-item due-date index
+        overdue = project_db.work_items.overdue(today, include_done=include_pending, plan_id=plan_id)
     except Exception as e:
-        logger.error(f"Error loading plan data: {e}")
-        return {"tasks": []}
-
-def find_overdue_tasks(include_pending=False):
-    """Find tasks that are overdue based on their due date."""
-    plan_data = load_plan_data()
-    today = datetime.now().date()
-    overdue_tasks = []
+        logger.error(f"Error loading work items: {e}")
+        return []
     
-    for task in plan_data.get("tasks", []):
-        # Skip if task has no due date or is already done
-        if not task.get("due_date") or (task.get("status", "").lower() == "done" and not include_pending):
-            continue
-        
-        due_date = datetime.fromisoformat(task["due_date"]).date()
-        if due_date < today:
-            days_overdue = (today - due_date).days
-            overdue_tasks.append(
-                AlertTask(
-                    id=task.get("id", "unknown"),
-                    title=task.get("title", "Untitled Task"),
-                    owner=task.get("owner", "Unassigned"),
-                    due_date=datetime.fromisoformat(task["due_date"]),
-                    days_overdue=days_overdue
-                )
-            )
-    
-    return overdue_tasks
+    # Fields come straight from the index with the right types, so skip re-validating each one
+    return [
+        AlertTask.construct(
+            id=task["id"],
+            title=task.get("title") or "Untitled Task",
+            owner=task.get("owner") or "Unassigned",
+            due_date=datetime.fromordinal(today.toordinal() - days_overdue),
+            days_overdue=days_overdue
+        )
+        for task, days_overdue in overdue
+    ]
 
 def send_notifications(overdue_tasks: List[AlertTask]):
     """Send notifications to task owners about overdue tasks."""
@@ -80,8 +85,7 @@ def send_notifications(overdue_tasks: List[AlertTask]):
             logger.info(f"Sending notification to {task.owner} about task '{task.title}' overdue by {task.days_overdue} days")
             
             # Log to project_log.md
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M')
-            log_entry = f"- **{timestamp}**: Alert sent to {task.owner} for overdue task '{task.title}' ({task.days_overdue} days late)"
+            log_entry = f"Alert sent to {task.owner} for overdue task '{task.title}' ({task.days_overdue} days late)"
             append_to_project_log(log_entry)
             
             notifications_sent += 1
@@ -92,20 +96,8 @@ def send_notifications(overdue_tasks: List[AlertTask]):
 
 def append_to_project_log(log_entry):
     """Append an entry to the project_log.md file."""
-    try:
-        log_path = os.path.join("..", "project_log.md")
-        
-        # Read existing content
-        with open(log_path, "r") as f:
-            content = f.read()
-        
-        # Append new entry
-        with open(log_path, "w") as f:
-            f.write(content + "\n" + log_entry)
-            
+    if log_writer.append_entry(log_entry):
         logger.info("Added entry to project_log.md")
-    except Exception as e:
-        logger.error(f"Failed to update project log: {e}")
 
 # Routes
 @router.post("/alerts", response_model=AlertResponse)
@@ -115,8 +107,9 @@ async def check_overdue_tasks(request: AlertRequest, background_tasks: Backgroun
     
     - `send_notifications`: If true, will send notifications to task owners
     - `include_pending`: If true, will include tasks marked as Done
+    - `plan_id`: Only check this plan's stories
     """
-    overdue_tasks = find_overdue_tasks(include_pending=request.include_pending)
+    overdue_tasks = find_overdue_tasks(include_pending=request.include_pending, plan_id=request.plan_id)
     
     if not overdue_tasks:
         return AlertResponse(
@@ -136,12 +129,29 @@ async def check_overdue_tasks(request: AlertRequest, background_tasks: Backgroun
     )
 
 @router.get("/alerts/check", response_model=AlertResponse)
-async def check_alerts():
-    """Quick check endpoint that just reports overdue tasks without sending notifications."""
-    overdue_tasks = find_overdue_tasks()
+async def check_alerts(plan_id: Optional[int] = None, if_none_match: Optional[str] = Header(None)):
+    """
+    Quick check endpoint that just reports overdue tasks without sending notifications.
+    Without plan_id this serves the background snapshot (overdue and upcoming tasks) with its
+    ETag; send it back as If-None-Match to get 304 Not Modified until the snapshot changes.
+    """
+    if plan_id is None:
+        snapshot = alert_scheduler.default_precomputer.get_snapshot()
+        headers = {"ETag": snapshot["etag"]}
+        if doc_store.etag_matches(if_none_match, snapshot["version"]):
+            return Response(status_code=304, headers=headers)
+        # The body was serialised when the snapshot was computed
+        return Response(content=snapshot["body"], media_type="application/json", headers=headers)
+
+    overdue_tasks = find_overdue_tasks(plan_id=plan_id)
     
     return AlertResponse(
         message=f"Found {len(overdue_tasks)} overdue tasks.",
         alerts_sent=0,
         overdue_tasks=overdue_tasks
     )
+
+@router.get("/alerts/stats")
+async def get_alert_stats():
+    """Alert snapshot generation, timing and scheduler state."""
+    return alert_scheduler.default_precomputer.get_stats()
@@ -23,6 +23,9 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import the gemini-utils module properly (kebab-case file, Python-compatible import)
 from utils import gemini_utils
+from utils import log_writer
+from utils import project_db
+from utils import doc_store
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -33,14 +36,8 @@ os.makedirs("data", exist_ok=True)
 
 # Function to log to project_log.md
 def log_action(action_description):
-    try:
-        log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "project_log.md")
-        with open(log_path, "a") as log_file:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-            log_file.write(f"- **{timestamp}**: {action_description}\n")
-            logger.info(f"Logged action: {action_description}")
-    except Exception as e:
-        logger.error(f"Error logging to project_log.md: {e}")
+    if log_writer.append_entry(action_description):
+        logger.info(f"Logged action: {action_description}")
 
 # Root endpoint
 @app.route("/")
@@ -66,6 +63,14 @@ def create_plan():
         # Get request body
         plan_text = request.json.get("plan_text", "")
         
+        # If-Match: only replace the current plan if it is still the one the client saw
+        expected_version = None
+        if_match = request.headers.get("If-Match")
+        if if_match and if_match.strip() != "*":
+            expected_version = project_db.plans.current_version()
+            if not doc_store.etag_matches(if_match, expected_version):
+                return jsonify({"detail": "Plan has changed"}), 412, {"ETag": doc_store.make_etag(expected_version)}
+        
         # Call Gemini to parse the plan
         parsed_plan = gemini_utils.parse_plan_with_gemini(plan_text)
         
@@ -89,19 +94,9 @@ def create_plan():
             for owner in owners
         ]
         
-        # Store in file
-        plan_data = {
-            "title": title,
-            "due_date": due_date,
-            "stories": stories,
-            "created_at": datetime.now().isoformat()
-        }
-        
-        data_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data")
-        os.makedirs(data_path, exist_ok=True)
-        
-        with open(os.path.join(data_path, "plan.json"), "w") as f:
-            json.dump(plan_data, f, indent=2)
+        # Store in the project database shared with the FastAPI backend
+        plan_id = project_db.plans.add_plan(title, due_date, stories, plan_text=plan_text,
+                                            expected_version=expected_version)
         
         # Log the action
         log_action(f"Plan created: {title} with {len(stories)} stories")
@@ -111,8 +106,10 @@ def create_plan():
             "stories": stories,
             "message": f"Plan created with {len(stories)} stories",
             "timestamp": datetime.now().isoformat()
-        })
+        }), 200, {"ETag": doc_store.make_etag(str(plan_id))}
         
+    except doc_store.VersionConflict as e:
+        return jsonify({"detail": "Plan has changed"}), 412, {"ETag": doc_store.make_etag(e.current)}
     except Exception as e:
         logger.error(f"Error creating plan: {e}")
         return jsonify({"detail": str(e)}), 500
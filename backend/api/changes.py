@@ -0,0 +1,68 @@
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+from typing import List, Dict, Any, Optional
+import asyncio
+import os
+import sys
+import logging
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Shared project database and its change feed (kebab-case project-db.py)
+from utils import project_db
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# How often a waiting long-poll checks the feed for changes made by any process
+POLL_INTERVAL_MS = int(os.getenv("CHANGE_FEED_POLL_MS", "250"))
+
+# Create router
+router = APIRouter(tags=["changes"])
+
+# Models
+class ChangeEvent(BaseModel):
+    seq: int
+    kind: str
+    entity_id: str
+    payload: Dict[str, Any]
+    created_at: str
+
+class ChangesResponse(BaseModel):
+    changes: List[ChangeEvent]
+    next_since: int
+    has_more: bool
+
+# Routes
+@router.get("/changes", response_model=ChangesResponse)
+async def get_changes(
+    since: int = Query(0, ge=0, description="Sequence number of the last change already seen"),
+    limit: int = Query(100, ge=1, le=1000),
+    timeout: float = Query(25, ge=0, le=60, description="Seconds to wait for a change when there is none yet"),
+    kinds: Optional[str] = Query(None, description="Comma-separated change kinds, e.g. task_status_changed,plan_added")
+):
+    """
+    Long-poll the change feed: return the changes after `since` as soon as
+    there are any, or an empty list after `timeout` seconds. Pass `next_since`
+    back as `since` on the next call.
+    """
+    kind_list = [kind.strip() for kind in kinds.split(",") if kind.strip()] if kinds else None
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + timeout
+    while True:
+        try:
+            changes = project_db.changes.read(since, limit, kind_list)
+        except Exception as e:
+            logger.error(f"Error reading change feed: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to read changes: {str(e)}")
+        if changes or loop.time() >= deadline:
+            break
+        await asyncio.sleep(min(POLL_INTERVAL_MS / 1000, max(deadline - loop.time(), 0)))
+    
+    return ChangesResponse(
+        changes=changes,
+        next_since=changes[-1]["seq"] if changes else since,
+        has_more=len(changes) == limit
+    )
@@ -0,0 +1,74 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import AsyncIterator
+import json
+import os
+import sys
+import logging
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import gemini-utils module following windsurf conventions
+from utils import gemini_utils
+
+# Create router
+router = APIRouter(tags=["chat"])
+
+# Models
+class ChatInput(BaseModel):
+    prompt: str
+
+# Helper functions
+def format_sse(data: dict, event: str = None) -> str:
+    """Format a payload as one Server-Sent Events message."""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
+
+async def stream_chat_events(request: Request, prompt: str) -> AsyncIterator[str]:
+    """
+    Forward Gemini chunks to the client as SSE messages.
+    Stops (and cancels the Gemini request) as soon as the client disconnects.
+    """
+    chunks = gemini_utils.stream_completion_async(prompt)
+    try:
+        async for chunk in chunks:
+            if await request.is_disconnected():
+                logger.info("Chat stream client disconnected")
+                break
+            yield format_sse({"text": chunk})
+        else:
+            yield format_sse({}, event="done")
+    except Exception as e:
+        logger.error(f"Error streaming completion from Gemini: {e}")
+        yield format_sse({"detail": f"Error generating response: {str(e)}"}, event="error")
+    finally:
+        await chunks.aclose()
+
+def _streaming_response(request: Request, prompt: str) -> StreamingResponse:
+    if not prompt or prompt.strip() == "":
+        raise HTTPException(status_code=400, detail="Prompt cannot be empty")
+    return StreamingResponse(
+        stream_chat_events(request, prompt),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# Routes
+@router.post("/chat/stream")
+async def stream_chat(chat_input: ChatInput, request: Request):
+    """
+    Stream a Gemini completion as Server-Sent Events.
+    Each chunk is sent as `data: {"text": ...}`; the stream ends with a `done` event.
+    """
+    return _streaming_response(request, chat_input.prompt)
+
+@router.get("/chat/stream")
+async def stream_chat_get(prompt: str, request: Request):
+    """Same as POST /chat/stream, for browser EventSource clients."""
+    return _streaming_response(request, prompt)
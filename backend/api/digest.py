@@ -4,7 +4,16 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import json
 import os
+import sys
 import logging
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Shared project log writer, history reader and project database (kebab-case log-writer.py, log-segments.py, project-db.py)
+from utils import log_writer
+from utils import log_segments
+from utils import project_db
 import base64
 from fastapi.responses import FileResponse
 import matplotlib.pyplot as plt
@@ -30,6 +39,7 @@ class DigestRequest(BaseModel):
     include_charts: bool = True
     include_blockers: bool = True
     title: Optional[str] = "Project Status Report"
+    plan_id: Optional[int] = None  # Report on one plan's stories; all stories and tasks if omitted
 
 class DigestResponse(BaseModel):
     message: str
@@ -37,51 +47,46 @@ class DigestResponse(BaseModel):
     charts: Optional[Dict[str, str]] = None  # Base64 encoded chart images
 
 # Helper functions
-def load_plan_data():
-    """Load the current plan data to analyze task status."""
+def load_plan_data(plan_id=None):
+    """Load the work items (plan stories and tasks) to analyze task status."""
     try:
-        plan_path = os.path.join("data", "plan.json")
-        if not os.path.exists(plan_path):
-            logger.warning("No plan.json found. Creating empty plan.")
-            return {"tasks": []}
-        
-        with open(plan_path, "r") as f:
-            return json.load(f)
+        # Normalized items from the in-memory index, for one plan or all of them
+        return {"tasks": project_db.work_items.items(plan_id=plan_id)}
     except Exception as e:
         logger.error(f"Error loading plan data: {e}")
         return {"tasks": []}
 
-def read_project_log():
-    """Read the project_log.md file and parse entries"""
+def _make_digest_entry(timestamp_str, message):
+    """Build a digest log entry, or None if the timestamp can't be parsed"""
+    # Convert Unicode hyphens to regular hyphens for parsing
+    timestamp_str = timestamp_str.replace('\u2011', '-')
+    
+    # Parse the timestamp
     try:
-        log_path = os.path.join("..", "project_log.md")
-        
-        # Read existing content
-        with open(log_path, "r") as f:
-            content = f.read()
-            
-        # Parse the log entries
-        entries = []
-        import re
-        pattern = r'\- \*\*([\d\u2011\-\s:]+)\*\*: (.+)'
-        
-        for match in re.finditer(pattern, content):
-            timestamp_str = match.group(1)
-            message = match.group(2)
-            
-            # Convert Unicode hyphens to regular hyphens for parsing
-            timestamp_str = timestamp_str.replace('\u2011', '-')
-            
-            # Parse the timestamp
-            try:
-                timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M')
-                entries.append({
-                    "timestamp": timestamp,
-                    "message": message
-                })
-            except ValueError:
-                logger.warning(f"Could not parse timestamp: {timestamp_str}")
-        
+        timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M')
+    except ValueError:
+        logger.warning(f"Could not parse timestamp: {timestamp_str}")
+        return None
+    return {
+        "timestamp": timestamp,
+        "message": message
+    }
+
+def read_project_log(start_date=None, end_date=None):
+    """
+    Read the project log entries with parsed timestamps, dated within
+    [start_date, end_date] (YYYY-MM-DD) when given.
+    Only the rotated monthly segments overlapping the window are opened, and
+    parsed entries are cached, so only bytes appended since the last read are parsed.
+    """
+    try:
+        entries = log_segments.default_history.entries(_make_digest_entry, start_date, end_date)
+        if start_date or end_date:
+            entries = [
+                e for e in entries
+                if (not start_date or e["timestamp"].strftime('%Y-%m-%d') >= start_date)
+                and (not end_date or e["timestamp"].strftime('%Y-%m-%d') <= end_date)
+            ]
         return entries
     except Exception as e:
         logger.error(f"Error reading project log: {e}")
@@ -309,23 +314,8 @@ def create_pdf_report(title, plan_data, log_entries, charts=None, include_blocke
 
 def append_to_project_log(log_entry):
     """Append a new entry to the project_log.md file."""
-    try:
-        log_path = os.path.join("..", "project_log.md")
-        
-        # Read existing content
-        with open(log_path, "r") as f:
-            content = f.read()
-        
-        # Format the timestamp with Unicode hyphens to match style
-        timestamp = datetime.now().strftime('%Y\u2011%m\u2011%d %H:%M')
-        
-        # Append new entry
-        with open(log_path, "w") as f:
-            f.write(f"{content}\n- **{timestamp}**: {log_entry}")
-            
+    if log_writer.append_entry(log_entry):
         logger.info(f"Added entry to project_log.md: {log_entry}")
-    except Exception as e:
-        logger.error(f"Failed to update project log: {e}")
 
 # Routes
 @router.post("/digest", response_model=DigestResponse)
@@ -338,11 +328,12 @@ async def generate_digest(request: DigestRequest):
     - `include_charts`: Whether to include charts in the response
     - `include_blockers`: Whether to include blocker information
     - `title`: Report title
+    - `plan_id`: Optional plan to report on
     """
     try:
         # Load data
-        plan_data = load_plan_data()
-        log_entries = read_project_log()
+        plan_data = load_plan_data(request.plan_id)
+        log_entries = read_project_log(request.start_date, request.end_date)
         
         # Generate charts
         charts = {}
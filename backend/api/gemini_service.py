@@ -5,10 +5,9 @@ Following windsurf conventions: kebab-case filename, camelCase module usage.
 """
 
 import os
-import json
+import sys
 import logging
-from typing import Dict, Any, List, Optional
-import google.generativeai as genai
+from typing import Dict, Any, AsyncIterator, List, Optional
 from dotenv import load_dotenv
 
 # Setup logging
@@ -18,16 +17,21 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    logger.warning("GEMINI_API_KEY not found in environment variables")
-    # Use a placeholder instead of hardcoding a real key
-    GEMINI_API_KEY = "PLACEHOLDER_API_KEY_MISSING"
-    logger.error("No GEMINI_API_KEY provided. Please add it to your .env file")
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Configure the Gemini model
-genai.configure(api_key=GEMINI_API_KEY)
+# Import the shared Gemini client, request coalescing, telemetry and plan parsing
+# (kebab-case files, Python-compatible imports)
+from utils import gemini_client
+from utils import single_flight
+from utils import llm_metrics
+from utils import gemini_utils
+
+# The plan prompt, cache key and fallback are defined once, in gemini-utils.py
+PLAN_PROMPT_VERSION = gemini_utils.PLAN_PROMPT_VERSION
+build_plan_prompt = gemini_utils.build_plan_prompt
+fallback_plan = gemini_utils.fallback_plan
+plan_cache_key = gemini_utils.plan_cache_key
 
 def parse_plan(plan_text: str) -> Dict[str, Any]:
     """
@@ -39,50 +43,19 @@ def parse_plan(plan_text: str) -> Dict[str, Any]:
     Returns:
         Dictionary with parsed plan data
     """
-    try:
-        # Create a prompt for Gemini
-        prompt = f"""
-        Parse the following project plan text into a structured format.
-        
-        TEXT: {plan_text}
-        
-        Extract the following information:
-        1. Title of the project/task
-        2. Due date (convert any date format to YYYY-MM-DD)
-        3. Team members and their roles
-        
-        Return the information in the following JSON format:
-        {{
-            "title": "The project title",
-            "due_date": "YYYY-MM-DD",
-            "team_members": [
-                {{ "name": "Name1", "role": "Role1" }},
-                {{ "name": "Name2", "role": "Role2" }}
-            ]
-        }}
-        
-        Only return the JSON, no other text.
-        """
-        
-        # Call Gemini API directly
-        model = genai.GenerativeModel(model_name="gemini-pro")
-        response = model.generate_content(prompt)
-        result = response.text
-        
-        # Parse the result
-        parsed_data = json.loads(result)
-        
-        logger.info(f"Successfully parsed plan: {parsed_data['title']}")
-        return parsed_data
+    return gemini_utils.parse_plan_with_gemini(plan_text, log_to_project=False)
+
+async def parse_plan_async(plan_text: str) -> Dict[str, Any]:
+    """
+    Parse a plan description without blocking the event loop.
+    
+    Args:
+        plan_text: String containing the plan description
         
-    except Exception as e:
-        logger.error(f"Error parsing plan with Gemini: {e}")
-        # Return a fallback structure
-        return {
-            "title": plan_text[:30] + "..." if len(plan_text) > 30 else plan_text,
-            "due_date": "2025-12-31",
-            "team_members": [{"name": "Unassigned", "role": "Developer"}]
-        }
+    Returns:
+        Dictionary with parsed plan data
+    """
+    return await gemini_utils.parse_plan_with_gemini_async(plan_text, log_to_project=False)
 
 def generate_completion(prompt: str) -> str:
     """
@@ -95,9 +68,44 @@ def generate_completion(prompt: str) -> str:
         Generated text response
     """
     try:
-        model = genai.GenerativeModel(model_name="gemini-pro")
-        response = model.generate_content(prompt)
-        return response.text
+        return single_flight.completion_flight.do(
+            single_flight.prompt_key(prompt),
+            lambda: gemini_client.generate_text(prompt)
+        )
+    except Exception as e:
+        logger.error(f"Error generating completion: {e}")
+        llm_metrics.registry.record_outcome("completion", "fallback", error=e)
+        return f"Error: Could not generate response due to {str(e)}"
+
+async def generate_completion_async(prompt: str) -> str:
+    """
+    Generate text completion without blocking the event loop.
+    
+    Args:
+        prompt: String containing the prompt
+        
+    Returns:
+        Generated text response
+    """
+    try:
+        return await single_flight.completion_flight.do_async(
+            single_flight.prompt_key(prompt),
+            lambda: gemini_client.generate_text_async(prompt)
+        )
     except Exception as e:
         logger.error(f"Error generating completion: {e}")
+        llm_metrics.registry.record_outcome("completion", "fallback", error=e)
         return f"Error: Could not generate response due to {str(e)}"
+
+async def generate_completion_stream(prompt: str) -> AsyncIterator[str]:
+    """
+    Stream a text completion, yielding chunks as Gemini produces them.
+    
+    Args:
+        prompt: String containing the prompt
+        
+    Yields:
+        Pieces of the generated text response
+    """
+    async for chunk in gemini_client.stream_text_async(prompt):
+        yield chunk
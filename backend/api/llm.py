@@ -0,0 +1,39 @@
+from fastapi import APIRouter
+import os
+import sys
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Shared Gemini client, request coalescing and telemetry
+# (kebab-case gemini-client.py, single-flight.py, llm-metrics.py)
+from utils import gemini_client
+from utils import single_flight
+from utils import llm_metrics
+
+# Create router
+router = APIRouter(tags=["llm"])
+
+# Routes
+@router.get("/llm/stats")
+async def get_llm_client_stats():
+    """
+    Report the shared Gemini client's state and timings.
+    Compare first_call_ms (cold) with steady_state_avg_ms to see connection setup cost.
+    """
+    return gemini_client.get_stats()
+
+@router.get("/llm/coalescing")
+async def get_llm_coalescing_stats():
+    """Report how many plan parses and completions joined an identical in-flight call."""
+    return single_flight.get_stats()
+
+@router.get("/llm/metrics")
+async def get_llm_metrics():
+    """
+    Report LLM call telemetry: latency percentiles and histogram buckets,
+    prompt/response characters and tokens, and errors by class (timeout,
+    quota, bad_json, network, other) per operation, plus plan-parse
+    outcomes with fallback rates.
+    """
+    return llm_metrics.registry.snapshot()
@@ -1,11 +1,22 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 from datetime import datetime
 import os
-import re
+import sys
 import logging
 
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Shared project log writer, day index, tail reader, parsed-entry cache and history reader
+# (kebab-case log-writer.py, log-index.py, log-reader.py, log-cache.py, log-segments.py)
+from utils import log_writer
+from utils import log_index
+from utils import log_reader
+from utils import log_cache
+from utils import log_segments
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,6 +34,23 @@ class LogResponse(BaseModel):
     entries: List[LogEntry]
     total_entries: int
 
+class LogPageResponse(LogResponse):
+    # total_entries counts the whole log (rotated months included), not just this page
+    # Position to pass as "before" for the next (older) page
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+
+class LogSearchHit(LogEntry):
+    score: float
+
+class LogSearchResponse(BaseModel):
+    query: str
+    hits: List[LogSearchHit]
+    total_hits: int
+    offset: int
+    limit: int
+    has_more: bool = False
+
 class LogFilterRequest(BaseModel):
     keyword: Optional[str] = None
     date_from: Optional[str] = None
@@ -30,90 +58,194 @@ class LogFilterRequest(BaseModel):
     limit: Optional[int] = 50
 
 # Helper functions
+def _make_log_entry(timestamp_str, message):
+    """Build a LogEntry from a parsed (timestamp, message) pair"""
+    # Extract date part only
+    date_only = timestamp_str.split(" ")[0]
+    
+    return LogEntry(
+        timestamp=timestamp_str,
+        message=message,
+        date=date_only
+    )
+
+def parse_log_entries(content):
+    """Parse log entries out of project log text"""
+    return [_make_log_entry(timestamp_str, message) for timestamp_str, message in log_cache.parse_raw_entries(content)]
+
 def read_project_log():
-    """Read the project_log.md file and parse entries"""
+    """
+    Return every entry in the project log history, rotated monthly segments included.
+    Entries come from parsed-log caches, which only parse bytes appended since
+    the last read.
+    """
     try:
-        log_path = os.path.join("..", "project_log.md")
-        
-        # Read existing content
-        with open(log_path, "r") as f:
-            content = f.read()
-            
-        # Parse the log entries
-        entries = []
-        pattern = r'\- \*\*([\d\u2011\-\s:]+)\*\*: (.+)'
-        
-        for match in re.finditer(pattern, content):
-            timestamp_str = match.group(1)
-            message = match.group(2)
-            
-            # Extract date part only
-            date_only = timestamp_str.split(" ")[0]
-            
-            entries.append(LogEntry(
-                timestamp=timestamp_str,
-                message=message,
-                date=date_only
-            ))
-            
-        return entries
+        return log_segments.default_history.entries(_make_log_entry)
     except Exception as e:
         logger.error(f"Error reading project log: {e}")
         return []
 
-def append_to_project_log(entry):
-    """Append an entry to the project_log.md file"""
+def search_log_entries(query, prefix=True, date_from=None, date_to=None):
+    """
+    Return the entries whose messages match a keyword query, in log order.
+    Only the segments overlapping [date_from, date_to] are searched, through
+    their keyword indexes. Words are matched as prefixes by default, which is
+    close to the substring matching keyword filters used before the index.
+    """
     try:
-        log_path = os.path.join("..", "project_log.md")
-        
-        # Read existing content
-        with open(log_path, "r") as f:
-            content = f.read()
-        
-        # Format the timestamp with Unicode hyphens to match style
-        timestamp = datetime.now().strftime('%Y\u2011%m\u2011%d %H:%M')
+        matches = log_segments.default_history.filter(query, prefix, date_from, date_to)
+        return [_make_log_entry(timestamp_str, message) for timestamp_str, message in matches]
+    except Exception as e:
+        logger.error(f"Error searching project log: {e}")
+        return []
+
+def read_project_log_range(date_from=None, date_to=None):
+    """
+    Read only the entries dated within [date_from, date_to] (YYYY-MM-DD).
+    Only the monthly segments overlapping the range are opened, and in the
+    active log the sidecar day index maps each day to its byte range, so only
+    those bytes are read and parsed.
+    """
+    try:
+        entries = []
+        for segment in log_segments.default_history.segments(date_from, date_to):
+            entries.extend(segment.entries(_make_log_entry))
+        try:
+            entries.extend(parse_log_entries(log_index.default_index.read_range(date_from, date_to)))
+        except FileNotFoundError:
+            pass
+    except Exception as e:
+        logger.error(f"Error reading project log range: {e}")
+        return []
+    
+    # Segments hold whole months, and a line holding two glued entries can bring in a neighbouring day
+    return [
+        e for e in entries
+        if (not date_from or _entry_day(e) >= date_from) and (not date_to or _entry_day(e) <= date_to)
+    ]
+
+def _parse_cursor(cursor):
+    """
+    Split a page cursor into (segment month or None for the active log, position).
+    Cursors into the active log are byte offsets ("1234"); cursors into a
+    rotated segment are "YYYY-MM:<entry count>".
+    """
+    if not cursor:
+        return None, None
+    try:
+        if ":" in cursor:
+            month, position = cursor.split(":", 1)
+            # An empty position starts from the end of the segment
+            return month, int(position) if position else None
+        return None, int(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid log cursor: {cursor}")
+
+def _read_head_page(limit, before=None):
+    """
+    Read the newest `limit` entries of the active log that start before byte
+    offset `before`, walking the file backwards from the end so only the
+    returned lines are read and parsed. Returns (entries newest first, next
+    byte offset, has more).
+    """
+    entries = []
+    next_cursor = None
+    has_more = False
+    try:
+        for offset, line in log_reader.read_lines_backwards(log_writer.PROJECT_LOG_PATH, before):
+            line_entries = parse_log_entries(line.decode("utf-8", errors="replace"))
+            if not line_entries:
+                continue
+            if len(entries) >= limit:
+                # One more entry exists beyond this page
+                has_more = True
+                break
+            # A line can hold several glued entries from older writers; keep them together
+            entries.extend(reversed(line_entries))
+            next_cursor = offset
+    except FileNotFoundError:
+        pass
+    
+    return entries, next_cursor if has_more else None, has_more
+
+def read_project_log_page(limit, before=None):
+    """
+    Read the newest `limit` entries before cursor `before`: first from the tail
+    of the active log, then from rotated monthly segments, newest month first.
+    Only the segments a page reaches are opened.
+    Returns (entries newest first, next cursor, has more).
+    """
+    month, position = _parse_cursor(before)
+    entries = []
+    try:
+        if month is None:
+            entries, next_offset, has_more = _read_head_page(limit, position)
+            if has_more:
+                return entries, str(next_offset), True
+            position = None
         
-        # Append new entry
-        with open(log_path, "w") as f:
-            f.write(f"{content}\n- **{timestamp}**: {entry}")
-            
-        logger.info(f"Added entry to project_log.md: {entry}")
-        return True
+        history = log_segments.default_history
+        months = [m for m in reversed(history.months()) if month is None or m <= month]
+        for index, segment_month in enumerate(months):
+            segment_entries = history.segment(segment_month).entries(_make_log_entry)
+            end = len(segment_entries) if position is None or segment_month != month else min(position, len(segment_entries))
+            start = max(end - (limit - len(entries)), 0)
+            entries.extend(reversed(segment_entries[start:end]))
+            if len(entries) >= limit:
+                if start > 0:
+                    return entries, f"{segment_month}:{start}", True
+                if index + 1 < len(months):
+                    return entries, f"{months[index + 1]}:", True
+                break
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Failed to update project log: {e}")
+        logger.error(f"Error reading project log page: {e}")
+    
+    return entries, None, False
+
+def _entry_day(entry):
+    """Entry date as YYYY-MM-DD (log timestamps may use U+2011 hyphens)"""
+    return entry.date.replace('\u2011', '-')
+
+def _filter_date(value):
+    """Normalise a YYYY-MM-DD filter value, or None if it is missing or invalid"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        # Invalid date format, ignore this filter
+        return None
+
+def append_to_project_log(entry):
+    """Append an entry to the project_log.md file"""
+    if not log_writer.append_entry(entry):
         return False
+    logger.info(f"Added entry to project_log.md: {entry}")
+    return True
 
 def filter_log_entries(entries, filters):
-    """Filter log entries based on the provided filters"""
+    """
+    Filter log entries based on the provided filters.
+    Keyword matching is done against the search index: entries outside the
+    index's matches are dropped, without scanning their messages.
+    """
     filtered_entries = entries
     
     # Filter by keyword
     if filters.keyword:
-        keyword = filters.keyword.lower()
-        filtered_entries = [e for e in filtered_entries if keyword in e.message.lower()]
+        matches = set(log_segments.default_history.filter(filters.keyword, prefix=True))
+        filtered_entries = [e for e in filtered_entries if (e.timestamp, e.message) in matches]
     
-    # Filter by date range
-    if filters.date_from:
-        try:
-            date_from = datetime.strptime(filters.date_from, '%Y-%m-%d').date()
-            filtered_entries = [
-                e for e in filtered_entries 
-                if datetime.strptime(e.date.replace('\u2011', '-'), '%Y-%m-%d').date() >= date_from
-            ]
-        except ValueError:
-            # Invalid date format, ignore this filter
-            pass
+    # Filter by date range (ISO dates compare correctly as strings)
+    date_from = _filter_date(filters.date_from)
+    if date_from:
+        filtered_entries = [e for e in filtered_entries if _entry_day(e) >= date_from]
             
-    if filters.date_to:
-        try:
-            date_to = datetime.strptime(filters.date_to, '%Y-%m-%d').date()
-            filtered_entries = [
-                e for e in filtered_entries 
-                if datetime.strptime(e.date.replace('\u2011', '-'), '%Y-%m-%d').date() <= date_to
-            ]
-        except ValueError:
-            # Invalid date format, ignore this filter
-            pass
+    date_to = _filter_date(filters.date_to)
+    if date_to:
+        filtered_entries = [e for e in filtered_entries if _entry_day(e) <= date_to]
     
     # Apply limit
     if filters.limit and filters.limit > 0:
@@ -122,23 +254,45 @@ def filter_log_entries(entries, filters):
     return filtered_entries
 
 # Routes
-@router.get("/log", response_model=LogResponse)
-async def get_project_log():
-    """Get all entries from the project log"""
-    entries = read_project_log()
-    
-    # Return in reverse chronological order (newest first)
-    entries.reverse()
+@router.get("/log", response_model=LogPageResponse)
+async def get_project_log(
+    limit: int = Query(50, ge=1, le=1000),
+    before: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor")
+):
+    """
+    Get a page of entries from the project log, newest first.
+    Pass next_cursor back as before to fetch older entries.
+    """
+    entries, next_cursor, has_more = read_project_log_page(limit, before)
+    try:
+        total_entries = log_segments.default_history.count()
+    except Exception as e:
+        logger.error(f"Error counting project log entries: {e}")
+        total_entries = len(entries)
     
-    return LogResponse(
+    return LogPageResponse(
         entries=entries,
-        total_entries=len(entries)
+        total_entries=total_entries,
+        next_cursor=next_cursor,
+        has_more=has_more
     )
 
 @router.post("/log/filter", response_model=LogResponse)
 async def filter_project_log(filters: LogFilterRequest):
     """Get filtered entries from the project log"""
-    all_entries = read_project_log()
+    date_from = _filter_date(filters.date_from)
+    date_to = _filter_date(filters.date_to)
+    
+    if filters.keyword:
+        # The keyword indexes of the segments in range yield just the matching entries; dates are checked on those
+        all_entries = search_log_entries(filters.keyword, date_from=date_from, date_to=date_to)
+        filters = filters.copy(update={"keyword": None})
+    elif date_from or date_to:
+        # Seek to the requested days instead of reading the whole log
+        all_entries = read_project_log_range(date_from, date_to)
+        filters = filters.copy(update={"date_from": None, "date_to": None})
+    else:
+        all_entries = read_project_log()
     
     # Apply filters
     filtered_entries = filter_log_entries(all_entries, filters)
@@ -151,6 +305,36 @@ async def filter_project_log(filters: LogFilterRequest):
         total_entries=len(filtered_entries)
     )
 
+@router.get("/log/search", response_model=LogSearchResponse)
+async def search_project_log(
+    q: str = Query(..., min_length=1, description='Words to match; use OR between alternatives and a trailing * for prefixes'),
+    mode: str = Query("all", regex="^(all|any)$", description="all: every word must match, any: at least one"),
+    prefix: bool = Query(False, description="Match every word as a prefix"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """
+    Search the project log through its keyword index.
+    Hits are ranked by how rare their matching words are, newest first on ties.
+    """
+    try:
+        total_hits, hits = log_segments.default_history.search(q, prefix=prefix, mode=mode, offset=offset, limit=limit)
+    except Exception as e:
+        logger.error(f"Error searching project log: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to search project log: {str(e)}")
+    
+    return LogSearchResponse(
+        query=q,
+        hits=[
+            LogSearchHit(**_make_log_entry(timestamp_str, message).dict(), score=score)
+            for score, timestamp_str, message in hits
+        ],
+        total_hits=total_hits,
+        offset=offset,
+        limit=limit,
+        has_more=offset + len(hits) < total_hits
+    )
+
 @router.post("/log/entry")
 async def add_log_entry(entry: str):
     """Add a new entry to the project log (for testing)"""
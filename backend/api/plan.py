@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import json
@@ -18,8 +19,16 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import gemini-utils module following windsurf conventions
 # File is named gemini-utils.py (kebab-case) but imported as gemini_utils (Python-compatible)
 from utils import gemini_utils
-# Use the parse_plan_with_gemini function from the module
-parse_plan_with_gemini = gemini_utils.parse_plan_with_gemini
+# Use the async variants so the Gemini round trip doesn't block the event loop
+parse_plan_with_gemini_async = gemini_utils.parse_plan_with_gemini_async
+parse_plans_with_gemini_async = gemini_utils.parse_plans_with_gemini_async
+
+# Shared plan parse cache, project log writer, project database and document versions/ETags
+# (kebab-case plan-cache.py, log-writer.py, project-db.py, doc-store.py)
+from utils import plan_cache
+from utils import log_writer
+from utils import project_db
+from utils import doc_store
 
 # Create router
 router = APIRouter(tags=["plan"])
@@ -39,55 +48,83 @@ class PlanOutput(BaseModel):
     message: str
     timestamp: str
 
+class PlanBatchInput(BaseModel):
+    plan_texts: List[str]
+
+class PlanBatchItem(BaseModel):
+    plan_text: str
+    title: str
+    due_date: str
+    stories: List[StoryItem]
+
+class PlanBatchOutput(BaseModel):
+    plans: List[PlanBatchItem]
+    total_stories: int
+    message: str
+    timestamp: str
+
+# Upper bound on plans accepted by one /plan/batch request
+MAX_BATCH_PLANS = 500
+
+# Helper functions
+def _expected_plan_version(if_match: Optional[str]) -> Optional[str]:
+    """
+    Plan version an If-Match header requires, or None to write unconditionally.
+    Fails fast with 412 if the current plan already differs, before any parsing.
+    """
+    if not if_match or if_match.strip() == "*":
+        return None
+    current_version = project_db.plans.current_version()
+    if not doc_store.etag_matches(if_match, current_version):
+        raise HTTPException(status_code=412, detail=f"Plan has changed (current ETag {doc_store.make_etag(current_version)})")
+    return current_version
+
+def build_stories(parsed_plan: Dict[str, Any], plan_text: str):
+    """Turn a parsed plan into its title, due date and one story per team member."""
+    title = parsed_plan.get('title', plan_text)
+    due_date = parsed_plan.get('due_date', '2025-12-31')
+    
+    # Extract owners from team members
+    owners = []
+    for member in parsed_plan.get('team_members', []):
+        owners.append(member.get('name', 'Unassigned'))
+    
+    stories = [
+        StoryItem(
+            title=title,
+            owner=owner,
+            due_date=due_date
+        )
+        for owner in owners
+    ]
+    return title, due_date, stories
+
 # Routes
 @router.post("/plan", response_model=PlanOutput)
-async def create_plan(plan_input: PlanInput):
+async def create_plan(plan_input: PlanInput, response: Response, if_match: Optional[str] = Header(None)):
     """
     Parse the user's plan text and create a structured plan.
     Example: /plan Redesign landing page by Sep-05; Dev: Alice,Bob; Mktg: Carol
+    With If-Match, the plan only replaces the current one if that still has the given ETag (else 412).
     """
+    expected_version = _expected_plan_version(if_match)
     try:
         # Use Gemini for plan parsing
         plan_text = plan_input.plan_text
         
         # Call our Gemini API service to parse the plan text
-        parsed_plan = parse_plan_with_gemini(plan_text)
+        parsed_plan = await parse_plan_with_gemini_async(plan_text)
         
-        # Extract information from the parsed plan
-        title = parsed_plan.get('title', plan_text)
-        due_date = parsed_plan.get('due_date', '2025-12-31')
+        # Extract information from the parsed plan and create stories
+        title, due_date, stories = build_stories(parsed_plan, plan_text)
         
-        # Extract owners from team members
-        owners = []
-        for member in parsed_plan.get('team_members', []):
-            owners.append(member.get('name', 'Unassigned'))
-        
-        # Create stories
-        stories = [
-            StoryItem(
-                title=title,
-                owner=owner,
-                due_date=due_date
-            )
-            for owner in owners
-        ]
-        
-        # Store the plan in a JSON file
-        plan_data = {
-            "title": title,
-            "due_date": due_date,
-            "stories": [story.dict() for story in stories],
-            "created_at": datetime.now().isoformat()
-        }
-        
-        os.makedirs("data", exist_ok=True)
-        with open("data/plan.json", "w") as f:
-            json.dump(plan_data, f, indent=2)
+        # Store the plan and its stories
+        plan_id = project_db.plans.add_plan(title, due_date, [story.dict() for story in stories], plan_text=plan_text,
+                                            expected_version=expected_version)
+        response.headers["ETag"] = doc_store.make_etag(str(plan_id))
         
         # Update project log
-        with open("../project_log.md", "a") as log_file:
-            timestamp = datetime.now().strftime("%Y‑%m‑%d %H:%M")
-            log_file.write(f"- **{timestamp}**: /plan executed – parsed plan and created {len(stories)} stories\n")
+        log_writer.append_entry(f"/plan executed – parsed plan and created {len(stories)} stories")
         
         return PlanOutput(
             stories=stories,
@@ -95,5 +132,93 @@ async def create_plan(plan_input: PlanInput):
             timestamp=datetime.now().isoformat()
         )
     
+    except doc_store.VersionConflict as e:
+        raise HTTPException(status_code=412, detail=f"Plan has changed (current ETag {doc_store.make_etag(e.current)})")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create plan: {str(e)}")
+
+@router.post("/plan/batch", response_model=PlanBatchOutput)
+async def create_plan_batch(batch_input: PlanBatchInput, response: Response, if_match: Optional[str] = Header(None)):
+    """
+    Parse many plan texts at once, e.g. when importing a quarter's roadmap.
+    Plans that need Gemini are packed into a few multi-item requests, and all
+    resulting plans are stored as one batch in a single transaction.
+    If-Match works as for /plan.
+    """
+    plan_texts = batch_input.plan_texts
+    if not plan_texts:
+        raise HTTPException(status_code=400, detail="plan_texts cannot be empty")
+    if len(plan_texts) > MAX_BATCH_PLANS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_PLANS} plans per batch")
+    expected_version = _expected_plan_version(if_match)
+    
+    try:
+        parsed_plans = await parse_plans_with_gemini_async(plan_texts)
+        
+        plans = []
+        for plan_text, parsed_plan in zip(plan_texts, parsed_plans):
+            title, due_date, stories = build_stories(parsed_plan, plan_text)
+            plans.append(PlanBatchItem(plan_text=plan_text, title=title, due_date=due_date, stories=stories))
+        total_stories = sum(len(plan.stories) for plan in plans)
+        
+        # Store every plan in one transaction
+        plan_ids = project_db.plans.add_plans([plan.dict() for plan in plans], expected_version=expected_version)
+        response.headers["ETag"] = doc_store.make_etag(str(plan_ids[-1]))
+        
+        # Update project log
+        log_writer.append_entry(f"/plan batch executed – parsed {len(plans)} plans and created {total_stories} stories")
+        
+        return PlanBatchOutput(
+            plans=plans,
+            total_stories=total_stories,
+            message=f"Batch created {len(plans)} plans with {total_stories} stories",
+            timestamp=datetime.now().isoformat()
+        )
+    
+    except doc_store.VersionConflict as e:
+        raise HTTPException(status_code=412, detail=f"Plan has changed (current ETag {doc_store.make_etag(e.current)})")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create plan batch: {str(e)}")
+
+@router.get("/plan/current")
+async def get_current_plan(if_none_match: Optional[str] = Header(None)):
+    """
+    The current plan (the latest plan or batch) with its ETag.
+    Send the ETag back as If-None-Match to get 304 Not Modified while it is unchanged.
+    """
+    version = project_db.plans.current_version()
+    etag = doc_store.make_etag(version)
+    if doc_store.etag_matches(if_none_match, version):
+        return Response(status_code=304, headers={"ETag": etag})
+    try:
+        plan = project_db.plans.load_current_plan(include_tasks=False)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load plan: {str(e)}")
+    return JSONResponse(content=plan, headers={"ETag": doc_store.make_etag(plan["version"])})
+
+@router.get("/plans")
+async def list_plans(offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=500)):
+    """Every stored plan, newest first, with its story count."""
+    try:
+        total, plans = project_db.plans.list_plans(offset, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to list plans: {str(e)}")
+    return {"plans": plans, "total": total, "offset": offset, "limit": limit, "has_more": offset + len(plans) < total}
+
+@router.get("/plans/{plan_id}")
+async def get_plan(plan_id: int):
+    """One plan with its stories as normalized work items (id, owner, due_date, status, ...)."""
+    try:
+        plan = project_db.plans.get_plan(plan_id)
+        if plan is not None:
+            plan["items"] = project_db.work_items.items(plan_id=plan_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load plan: {str(e)}")
+    if plan is None:
+        raise HTTPException(status_code=404, detail=f"Plan {plan_id} not found")
+    return plan
+
+@router.get("/plan/cache/stats")
+async def get_plan_cache_stats():
+    """Report plan cache hit/miss counters and how many Gemini calls it saved."""
+    return plan_cache.default_cache.get_stats()
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 import json
 from datetime import datetime
 import os
+import sys
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Shared project log writer and project database (kebab-case log-writer.py, project-db.py)
+from utils import log_writer
+from utils import project_db
 
 # Create router
 router = APIRouter(tags=["risk"])
@@ -25,6 +33,36 @@ class RiskCheckOutput(BaseModel):
     needs_discussion: List[RiskItem]
     timestamp: str
 
+class RiskHistoryEntry(BaseModel):
+    id: int
+    team_lead: str
+    blockers: List[RiskItem]
+    needs_discussion: List[RiskItem]
+    timestamp: str
+
+class RiskDailyCount(BaseModel):
+    day: str
+    checkins: int
+    blockers: int
+    needs_discussion: int
+
+class RiskHistoryResponse(BaseModel):
+    checkins: List[RiskHistoryEntry]
+    total: int
+    offset: int
+    limit: int
+    has_more: bool
+    daily: List[RiskDailyCount]
+
+def _history_date(name: str, value: Optional[str]) -> Optional[str]:
+    """Validate a YYYY-MM-DD history filter"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {value} (expected YYYY-MM-DD)")
+
 # Routes
 @router.post("/risk", response_model=RiskCheckOutput)
 async def check_risk(risk_input: RiskCheckInput):
@@ -45,35 +83,27 @@ async def check_risk(risk_input: RiskCheckInput):
                 if item.reason and any(reason in item.reason.lower() for reason in ["need discussion", "missing estimated completion"]):
                     needs_discussion.append(item)
         
-        # Log the risk check results
-        os.makedirs("data", exist_ok=True)
-        risk_data = {
-            "team_lead": risk_input.team_lead,
-            "blockers": [blocker.dict() for blocker in blockers],
-            "needs_discussion": [item.dict() for item in needs_discussion],
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        # Save risk check data
-        with open(f"data/risk_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json", "w") as f:
-            json.dump(risk_data, f, indent=2)
+        # Save the check-in with every reported item
+        project_db.risks.add_checkin(
+            risk_input.team_lead,
+            [item.dict() for item in risk_input.items],
+            {item.story_id for item in needs_discussion}
+        )
         
         # Update project log
-        with open("../project_log.md", "a") as log_file:
-            timestamp = datetime.now().strftime("%Y‑%m‑%d %H:%M")
-            log_entry = f"- **{timestamp}**: /risk – {risk_input.team_lead} reported "
+        log_entry = f"/risk – {risk_input.team_lead} reported "
+        
+        if blockers:
+            log_entry += f"{len(blockers)} blocker(s)"
             
-            if blockers:
-                log_entry += f"{len(blockers)} blocker(s)"
-                
-                if needs_discussion:
-                    log_entry += f" and {len(needs_discussion)} item(s) needing discussion"
-            elif needs_discussion:
-                log_entry += f"{len(needs_discussion)} item(s) needing discussion"
-            else:
-                log_entry += "no blockers"
-                
-            log_file.write(log_entry + "\n")
+            if needs_discussion:
+                log_entry += f" and {len(needs_discussion)} item(s) needing discussion"
+        elif needs_discussion:
+            log_entry += f"{len(needs_discussion)} item(s) needing discussion"
+        else:
+            log_entry += "no blockers"
+            
+        log_writer.append_entry(log_entry)
         
         # Create notification content for PM
         notification = f"🚨 Risk check-in from {risk_input.team_lead}:"
@@ -94,6 +124,35 @@ async def check_risk(risk_input: RiskCheckInput):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process risk check-in: {str(e)}")
 
+@router.get("/risk/history", response_model=RiskHistoryResponse)
+async def get_risk_history(
+    team_lead: Optional[str] = Query(None),
+    story_id: Optional[str] = Query(None, description="Only check-ins that reported this story"),
+    date_from: Optional[str] = Query(None, description="First day, YYYY-MM-DD"),
+    date_to: Optional[str] = Query(None, description="Last day, YYYY-MM-DD"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=200)
+):
+    """
+    Past risk check-ins, newest first, with blocker and needs-discussion counts per day.
+    """
+    date_from = _history_date("date_from", date_from)
+    date_to = _history_date("date_to", date_to)
+    try:
+        total, checkins = project_db.risks.history(team_lead, story_id, date_from, date_to, offset, limit)
+        daily = project_db.risks.daily_counts(team_lead, story_id, date_from, date_to)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get risk history: {str(e)}")
+    
+    return RiskHistoryResponse(
+        checkins=checkins,
+        total=total,
+        offset=offset,
+        limit=limit,
+        has_more=offset + len(checkins) < total,
+        daily=daily
+    )
+
 # Route to get active stories for a team lead
 @router.get("/risk/stories/{team_lead}")
 async def get_stories_for_lead(team_lead: str):
@@ -4,7 +4,15 @@ from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import json
 import os
+import sys
 import logging
+
+# Add the parent directory to sys.path to enable imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Shared project log writer and project database (kebab-case log-writer.py, project-db.py)
+from utils import log_writer
+from utils import project_db
 import random
 from googleapiclient.discovery import build
 from google.oauth2.credentials import Credentials
@@ -42,15 +50,10 @@ class MeetingResponse(BaseModel):
 
 # Helper functions
 def load_plan_data():
-    """Load the current plan data to find blocked stories."""
+    """Load the work items (plan stories and tasks) to find blocked stories."""
     try:
-        plan_path = os.path.join("data", "plan.json")
-        if not os.path.exists(plan_path):
-            logger.warning("No plan.json found. Creating empty plan.")
-            return {"tasks": []}
-        
-        with open(plan_path, "r") as f:
-            return json.load(f)
+        # Normalized items from the in-memory index
+        return {"tasks": project_db.work_items.items()}
     except Exception as e:
         logger.error(f"Error loading plan data: {e}")
         return {"tasks": []}
@@ -246,23 +249,8 @@ def send_meeting_invitations(title, start_time, end_time, attendees, meeting_lin
 
 def append_to_project_log(log_entry):
     """Append a new entry to the project_log.md file."""
-    try:
-        log_path = os.path.join("..", "project_log.md")
-        
-        # Read existing content
-        with open(log_path, "r") as f:
-            content = f.read()
-        
-        # Format the timestamp with Unicode hyphens to match style
-        timestamp = datetime.now().strftime('%Y\u2011%m\u2011%d %H:%M')
-        
-        # Append new entry
-        with open(log_path, "w") as f:
-            f.write(f"{content}\n- **{timestamp}**: {log_entry}")
-            
+    if log_writer.append_entry(log_entry):
         logger.info(f"Added entry to project_log.md: {log_entry}")
-    except Exception as e:
-        logger.error(f"Failed to update project log: {e}")
 
 # Routes
 @router.post("/schedule", response_model=MeetingResponse)
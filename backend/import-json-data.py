@@ -0,0 +1,38 @@
+"""
+One-shot import of the JSON files the project database replaces:
+data/plan.json, data/risk_*.json and the root task.json. Re-running it skips
+plans and check-ins already imported and updates tasks in place.
+
+Usage:
+    python backend/import-json-data.py
+    python backend/import-json-data.py --data-dir data --tasks task.json --db backend/data/project.db
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import os
+import sys
+import json
+import argparse
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Import plan, risk and task JSON files into the project database")
+    parser.add_argument("--data-dir", default=os.path.join(BACKEND_DIR, "data"), help="Directory holding plan.json and risk_*.json")
+    parser.add_argument("--tasks", default=os.path.join(os.path.dirname(BACKEND_DIR), "task.json"),
+                        help="Path to task.json")
+    parser.add_argument("--db", default=None, help="Database file (defaults to PROJECT_DB_PATH or backend/data/project.db)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.db:
+        os.environ["PROJECT_DB_PATH"] = args.db
+    sys.path.insert(0, BACKEND_DIR)
+    from utils import project_db
+
+    counts = project_db.import_json_files(args.data_dir, args.tasks)
+    print(json.dumps({"database": project_db.DB_PATH, "imported": counts}, indent=2))
+
+if __name__ == "__main__":
+    main()
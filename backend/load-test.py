@@ -0,0 +1,183 @@
+"""
+Load-test driver for POST /api/plan.
+Runs the FastAPI app in-process against the offline fake model (LLM_BACKEND=fake),
+or against the local llama model or Gemini itself to compare backends,
+pushes N requests through it at a fixed concurrency and reports throughput and
+latency percentiles, along with cache, coalescing and LLM metrics.
+All files the app writes (the project database, project log, plan cache) go to
+a temporary directory, so a run leaves the working tree untouched.
+
+Usage:
+    python backend/load-test.py --requests 500 --concurrency 50 --latency-ms 300 --error-rate 0.05
+    python backend/load-test.py --backend llama --requests 50 --concurrency 8
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+from typing import Any, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Canonical /plan inputs are answered by the local parser; free-form ones go to the model
+CANONICAL_TEMPLATE = "Release {n} by Dec-15; Dev: Alice,Bob; QA: Carol"
+FREE_FORM_TEMPLATE = "We need to ship the onboarding revamp number {n} before the holidays, Alice and Bob are on it"
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test POST /api/plan against the offline fake model")
+    parser.add_argument("--backend", default="fake", choices=["fake", "llama", "gemini"],
+                        help="Model backend (the --latency-ms/--error-* options apply to fake only)")
+    parser.add_argument("--requests", type=int, default=200, help="Total number of requests")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight at once")
+    parser.add_argument("--distinct", type=int, default=0,
+                        help="Number of distinct plan texts (0 = every request unique); repeats exercise the cache")
+    parser.add_argument("--canonical-ratio", type=float, default=0.0,
+                        help="Fraction of plan texts in the canonical /plan grammar")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="Median fake model latency")
+    parser.add_argument("--distribution", default="lognormal", choices=["fixed", "uniform", "normal", "lognormal"])
+    parser.add_argument("--jitter", type=float, default=0.5, help="Latency spread of the distribution")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability that a model call fails")
+    parser.add_argument("--error-kinds", default="network,quota,timeout,bad_json")
+    parser.add_argument("--model-concurrency", type=int, default=None,
+                        help="Override GEMINI_MAX_CONCURRENCY for the run")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for plan texts, latencies and errors")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args()
+
+def prepare_environment(args: argparse.Namespace) -> str:
+    """Point the app at the chosen backend and a scratch directory before it is imported."""
+    scratch = tempfile.mkdtemp(prefix="pm-agent-load-")
+    workdir = os.path.join(scratch, "backend")
+    os.makedirs(os.path.join(workdir, "data"))
+
+    os.environ["LLM_BACKEND"] = args.backend
+    os.environ["GEMINI_WARMUP"] = "false"
+    os.environ["PROJECT_LOG_PATH"] = os.path.join(scratch, "project_log.md")
+    os.environ["PROJECT_DB_PATH"] = os.path.join(workdir, "data", "project.db")
+    os.environ["PLAN_CACHE_DIR"] = os.path.join(scratch, "cache")
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["FAKE_LLM_LATENCY_DISTRIBUTION"] = args.distribution
+    os.environ["FAKE_LLM_LATENCY_JITTER"] = str(args.jitter)
+    os.environ["FAKE_LLM_ERROR_RATE"] = str(args.error_rate)
+    os.environ["FAKE_LLM_ERROR_KINDS"] = args.error_kinds
+    if args.seed is not None:
+        os.environ["FAKE_LLM_SEED"] = str(args.seed)
+    if args.model_concurrency:
+        os.environ["GEMINI_MAX_CONCURRENCY"] = str(args.model_concurrency)
+
+    # /api/plan stores plans in PROJECT_DB_PATH (above); anything else relative to the working directory stays in scratch too
+    os.chdir(workdir)
+    sys.path.insert(0, BACKEND_DIR)
+    return scratch
+
+def build_plan_texts(args: argparse.Namespace) -> List[str]:
+    rng = random.Random(args.seed)
+    distinct = args.distinct or args.requests
+    pool = []
+    for n in range(distinct):
+        template = CANONICAL_TEMPLATE if rng.random() < args.canonical_ratio else FREE_FORM_TEMPLATE
+        pool.append(template.format(n=n))
+    return [pool[i % distinct] for i in range(args.requests)]
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return round(ordered[min(int(fraction * len(ordered)), len(ordered) - 1)], 1)
+
+async def run_load(app, plan_texts: List[str], concurrency: int) -> Dict[str, Any]:
+    import httpx
+
+    latencies = []
+    statuses: Dict[str, int] = {}
+    limiter = asyncio.Semaphore(concurrency)
+
+    async def send(client, plan_text: str):
+        async with limiter:
+            started = time.perf_counter()
+            try:
+                response = await client.post("/api/plan", json={"plan_text": plan_text})
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    async with httpx.AsyncClient(app=app, base_url="http://load-test", timeout=None) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(send(client, plan_text) for plan_text in plan_texts))
+        elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "requests": len(plan_texts),
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(plan_texts) / elapsed, 1) if elapsed else None,
+        "statuses": statuses,
+        "latency_ms": {
+            "min": round(ordered[0], 1) if ordered else 0.0,
+            "p50": percentile(ordered, 0.50),
+            "p95": percentile(ordered, 0.95),
+            "p99": percentile(ordered, 0.99),
+            "max": round(ordered[-1], 1) if ordered else 0.0
+        }
+    }
+
+def print_report(report: Dict[str, Any]):
+    latency = report["latency_ms"]
+    print(f"Requests:     {report['requests']} at concurrency {report['concurrency']}")
+    print(f"Elapsed:      {report['elapsed_seconds']} s")
+    print(f"Throughput:   {report['throughput_rps']} req/s")
+    print(f"Statuses:     {report['statuses']}")
+    print(f"Latency (ms): p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  "
+          f"min {latency['min']}  max {latency['max']}")
+    outcomes = report["plan_parse"].get("counts", {})
+    print(f"Plan parses:  {outcomes} (fallback rate {report['plan_parse'].get('fallback_rate', 0.0)})")
+    if "errors" in report["model"]:
+        print(f"Model calls:  {report['model']['calls']} ({report['model']['errors']} injected errors)")
+    elif "batches" in report["model"]:
+        print(f"Model calls:  {report['model']['requests']} in {report['model']['batches']} batches "
+              f"({report['model']['tokens_per_second']} tokens/s, load {report['model']['load_ms']} ms)")
+    else:
+        print(f"Model calls:  first {report['model']['first_call_ms']} ms, "
+              f"steady-state avg {report['model']['steady_state_avg_ms']} ms")
+    print(f"Cache:        hit rate {report['cache'].get('hit_rate')}")
+    print(f"Coalesced:    {report['coalescing'].get('coalesced', 0)} of {report['coalescing'].get('calls', 0)}")
+    print(f"Circuit:      {report['circuit']['state']}")
+    print(f"Scratch dir:  {report['scratch_dir']}")
+
+def main():
+    args = parse_args()
+    scratch = prepare_environment(args)
+
+    import logging
+    logging.disable(logging.ERROR)
+    from main import app
+    from utils import gemini_client, llm_metrics, plan_cache, single_flight
+
+    if args.backend != "fake":
+        # Load the model / open the connection first so it isn't counted in request latency
+        asyncio.run(gemini_client.warm_up_async())
+
+    report = asyncio.run(run_load(app, build_plan_texts(args), args.concurrency))
+    report["plan_parse"] = llm_metrics.registry.snapshot()["outcomes"].get("plan_parse", {})
+    client_stats = gemini_client.get_stats()
+    report["model"] = client_stats["backend_stats"] or client_stats
+    report["cache"] = plan_cache.default_cache.get_stats()
+    report["coalescing"] = single_flight.plan_flight.get_stats()
+    report["circuit"] = gemini_client.breaker.get_state()
+    report["scratch_dir"] = scratch
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+if __name__ == "__main__":
+    main()
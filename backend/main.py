@@ -19,8 +19,8 @@ app.add_middleware(
     allow_origins=["http://localhost:3000", "http://localhost:8501"],  # Next.js & Streamlit URLs
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type", "Authorization", "Accept"],
-    expose_headers=["Content-Disposition"],
+    allow_headers=["Content-Type", "Authorization", "Accept", "If-Match", "If-None-Match"],
+    expose_headers=["Content-Disposition", "ETag"],
     max_age=600,  # Cache preflight requests for 10 minutes
 )
 
@@ -32,10 +32,21 @@ async def root():
 # Health check endpoint
 @app.get("/health")
 async def health_check():
+    status = "healthy"
+    circuit = None
+    try:
+        from utils import gemini_client
+        circuit = gemini_client.breaker.get_state()
+        # Plans still parse via the local parser and fallback while Gemini is cut off
+        if circuit["state"] != "closed":
+            status = "degraded"
+    except Exception as e:
+        print(f"Could not read Gemini circuit state: {e}")
     return {
-        "status": "healthy",
+        "status": status,
         "timestamp": datetime.now().isoformat(),
-        "version": "0.1.0"
+        "version": "0.1.0",
+        "gemini_circuit": circuit
     }
 
 # Set up sys.path to find modules - following windsurf project structure
@@ -51,9 +62,8 @@ def log_module_load(module_name, success=True):
     # Only log successful loads to avoid cluttering the log
     if success:
         try:
-            with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project_log.md"), "a") as log_file:
-                timestamp = datetime.now().strftime("%Y‑%m‑%d %H:%M")
-                log_file.write(f"- **{timestamp}**: Backend module loaded: {module_name}\n")
+            from utils import log_writer
+            log_writer.append_entry(f"Backend module loaded: {module_name}")
         except Exception as e:
             print(f"Warning: Could not write to project log: {e}")
 
@@ -106,5 +116,59 @@ try:
 except ImportError as e:
     print(f"❌ Schedule API module not found: {str(e)}")
 
+try:
+    from api.changes import router as changes_router
+    app.include_router(changes_router, prefix="/api")
+    print("✅ Changes API module loaded successfully")
+    log_module_load("changes")
+except ImportError as e:
+    print(f"❌ Changes API module not found: {str(e)}")
+
+try:
+    from api.llm import router as llm_router
+    app.include_router(llm_router, prefix="/api")
+    print("✅ LLM API module loaded successfully")
+    log_module_load("llm")
+except ImportError as e:
+    print(f"❌ LLM API module not found: {str(e)}")
+
+try:
+    from api.chat import router as chat_router
+    app.include_router(chat_router, prefix="/api")
+    print("✅ Chat API module loaded successfully")
+    log_module_load("chat")
+except ImportError as e:
+    print(f"❌ Chat API module not found: {str(e)}")
+
+# Optionally open the Gemini connection before the first user request (GEMINI_WARMUP=true)
+@app.on_event("startup")
+async def warm_up_gemini_client():
+    try:
+        from utils import gemini_client
+    except ImportError as e:
+        print(f"❌ Gemini client not available for warm-up: {str(e)}")
+        return
+    if gemini_client.WARM_UP_ON_STARTUP:
+        await gemini_client.warm_up_async()
+
+# Recompute the overdue/upcoming alert snapshot in the background (ALERT_SCHEDULER=true)
+@app.on_event("startup")
+async def start_alert_scheduler():
+    try:
+        from utils import alert_scheduler
+    except ImportError as e:
+        print(f"❌ Alert scheduler not available: {str(e)}")
+        return
+    if alert_scheduler.SCHEDULER_ENABLED:
+        alert_scheduler.default_precomputer.start()
+
+@app.on_event("shutdown")
+async def stop_alert_scheduler():
+    try:
+        from utils import alert_scheduler
+    except ImportError:
+        return
+    alert_scheduler.default_precomputer.shutdown()
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
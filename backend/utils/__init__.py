@@ -20,5 +20,22 @@ def import_kebab_file(kebab_filename, module_name):
 
 # Import all kebab-case modules as camelCase for Python compatibility
 # while still following windsurf conventions
+log_writer = import_kebab_file("log-writer.py", "log_writer")
+log_index = import_kebab_file("log-index.py", "log_index")
+log_reader = import_kebab_file("log-reader.py", "log_reader")
+log_cache = import_kebab_file("log-cache.py", "log_cache")
+log_search = import_kebab_file("log-search.py", "log_search")
+log_segments = import_kebab_file("log-segments.py", "log_segments")
+llm_metrics = import_kebab_file("llm-metrics.py", "llm_metrics")
+circuit_breaker = import_kebab_file("circuit-breaker.py", "circuit_breaker")
+plan_parser = import_kebab_file("plan-parser.py", "plan_parser")
+fake_llm = import_kebab_file("fake-llm.py", "fake_llm")
+llama_llm = import_kebab_file("llama-llm.py", "llama_llm")
+gemini_client = import_kebab_file("gemini-client.py", "gemini_client")
+single_flight = import_kebab_file("single-flight.py", "single_flight")
+plan_cache = import_kebab_file("plan-cache.py", "plan_cache")
 gemini_utils = import_kebab_file("gemini-utils.py", "gemini_utils")
+doc_store = import_kebab_file("doc-store.py", "doc_store")
+project_db = import_kebab_file("project-db.py", "project_db")
 
+alert_scheduler = import_kebab_file("alert-scheduler.py", "alert_scheduler")
@@ -0,0 +1,192 @@
+"""
+Precomputed alert snapshot for GET /api/alerts/check.
+An APScheduler background scheduler, started with the FastAPI app, recomputes
+the overdue and upcoming work items just after midnight and shortly after any
+task or plan change (followed through the project database change feed). Each
+snapshot gets a generation number, an ETag and its response body serialised
+once, so a dashboard poll only hands back bytes that already exist.
+Without the scheduler (e.g. in scripts) the snapshot is brought up to date
+when it is read instead.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import os
+import json
+import uuid
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+# Shared project database (work-item index, change feed) and ETag helpers (kebab-case project-db.py, doc-store.py)
+from utils import project_db
+from utils import doc_store
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Scheduler settings
+SCHEDULER_ENABLED = os.getenv("ALERT_SCHEDULER", "true").lower() in ("1", "true", "yes")
+# How often the scheduler checks the change feed for task and plan changes
+REFRESH_SECONDS = float(os.getenv("ALERT_REFRESH_SECONDS", "2"))
+# Open items due within this many days (from today) are listed as upcoming
+UPCOMING_DAYS = int(os.getenv("ALERT_UPCOMING_DAYS", "7"))
+
+# Changes that can move an item into or out of the alert sets
+WATCHED_KINDS = [
+    project_db.TASK_CREATED,
+    project_db.TASK_UPDATED,
+    project_db.TASK_STATUS_CHANGED,
+    project_db.TASK_DELETED,
+    project_db.PLAN_ADDED
+]
+
+def _alert_item(item: Dict[str, Any], due: datetime) -> Dict[str, Any]:
+    return {
+        "id": item["id"],
+        "title": item.get("title") or "Untitled Task",
+        "owner": item.get("owner") or "Unassigned",
+        "due_date": due.isoformat()
+    }
+
+class AlertPrecomputer:
+    """Keeps the latest alert snapshot and recomputes it on schedule or on change."""
+
+    def __init__(self, upcoming_days: int = UPCOMING_DAYS):
+        self.upcoming_days = upcoming_days
+        # Guards the snapshot and the subscription cursor; re-entered by recompute()
+        self._lock = threading.RLock()
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._generation = 0
+        # ETags must not repeat across restarts, when generations start over
+        self._instance = uuid.uuid4().hex[:8]
+        self._subscription: Optional[project_db.ChangeSubscription] = None
+        self._scheduler = None
+        self._stats = {"recomputes": 0, "last_recompute_ms": None, "last_reason": None}
+
+    @property
+    def running(self) -> bool:
+        return self._scheduler is not None
+
+    def recompute(self, reason: str = "manual") -> Dict[str, Any]:
+        """Build a new snapshot from the work-item index and make it current."""
+        with self._lock:
+            started = datetime.now()
+            today = started.date()
+            if self._subscription is None:
+                self._subscription = project_db.changes.subscribe(kinds=WATCHED_KINDS)
+            else:
+                # Everything up to now is reflected in this snapshot
+                self._subscription.poll()
+
+            overdue = [
+                dict(_alert_item(item, datetime.fromordinal(today.toordinal() - days_overdue)), days_overdue=days_overdue)
+                for item, days_overdue in project_db.work_items.overdue(today)
+            ]
+            upcoming = []
+            last_day = today + timedelta(days=self.upcoming_days)
+            for item in project_db.work_items.due_between(today.isoformat(), last_day.isoformat()):
+                if (item["status"] or "").lower() == "done":
+                    continue
+                due = datetime.fromisoformat(item["due_date"])
+                upcoming.append(dict(_alert_item(item, due), days_until_due=(due.date() - today).days))
+
+            self._generation += 1
+            version = f"{self._instance}-{self._generation}"
+            snapshot = {
+                "generation": self._generation,
+                "version": version,
+                "etag": doc_store.make_etag(version),
+                "day": today,
+                "computed_at": started.isoformat(),
+                "overdue_tasks": overdue,
+                "upcoming_tasks": upcoming
+            }
+            snapshot["body"] = json.dumps({
+                "message": f"Found {len(overdue)} overdue tasks.",
+                "alerts_sent": 0,
+                "overdue_tasks": overdue,
+                "upcoming_tasks": upcoming,
+                "generation": snapshot["generation"],
+                "computed_at": snapshot["computed_at"]
+            }).encode("utf-8")
+            self._snapshot = snapshot
+            self._stats["recomputes"] += 1
+            self._stats["last_recompute_ms"] = round((datetime.now() - started).total_seconds() * 1000, 2)
+            self._stats["last_reason"] = reason
+        logger.info(f"Alert snapshot {snapshot['generation']} ({reason}): "
+                    f"{len(overdue)} overdue, {len(upcoming)} upcoming")
+        return snapshot
+
+    def _refresh_if_changed(self):
+        """Scheduler job: recompute if tasks or plans changed since the last snapshot."""
+        try:
+            with self._lock:
+                if self._subscription is None or self._subscription.poll(limit=1):
+                    self.recompute("change")
+        except Exception as e:
+            logger.error(f"Error refreshing alert snapshot: {e}")
+
+    def _roll_over(self):
+        """Scheduler job: items become overdue when the day changes."""
+        try:
+            self.recompute("day rollover")
+        except Exception as e:
+            logger.error(f"Error recomputing alert snapshot at day rollover: {e}")
+
+    def get_snapshot(self) -> Dict[str, Any]:
+        """
+        The current snapshot. While the scheduler runs this is a lookup; otherwise
+        a missing, stale-day or out-of-date snapshot is recomputed first.
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot["day"] != datetime.now().date():
+                return self.recompute("first use" if snapshot is None else "day rollover")
+            if not self.running and self._subscription.poll(limit=1):
+                return self.recompute("change")
+            return snapshot
+
+    def start(self) -> bool:
+        """Compute the first snapshot and start the background scheduler. Returns False if it can't run."""
+        if self.running:
+            return True
+        try:
+            from apscheduler.schedulers.background import BackgroundScheduler
+            from apscheduler.triggers.cron import CronTrigger
+        except ImportError as e:
+            logger.error(f"apscheduler not available, alert snapshots will be computed on request: {e}")
+            return False
+
+        self.recompute("startup")
+        scheduler = BackgroundScheduler(daemon=True)
+        scheduler.add_job(self._roll_over, CronTrigger(hour=0, minute=0, second=1),
+                          id="alerts-day-rollover", coalesce=True, max_instances=1)
+        scheduler.add_job(self._refresh_if_changed, "interval", seconds=REFRESH_SECONDS,
+                          id="alerts-on-change", coalesce=True, max_instances=1)
+        scheduler.start()
+        self._scheduler = scheduler
+        logger.info(f"Alert scheduler started (change check every {REFRESH_SECONDS}s)")
+        return True
+
+    def shutdown(self):
+        if self._scheduler is not None:
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            snapshot = self._snapshot
+        stats.update({
+            "scheduler_running": self.running,
+            "generation": snapshot["generation"] if snapshot else None,
+            "computed_at": snapshot["computed_at"] if snapshot else None,
+            "overdue": len(snapshot["overdue_tasks"]) if snapshot else None,
+            "upcoming": len(snapshot["upcoming_tasks"]) if snapshot else None
+        })
+        return stats
+
+# Snapshot shared by every request in the process
+default_precomputer = AlertPrecomputer()
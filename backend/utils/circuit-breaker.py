@@ -0,0 +1,122 @@
+"""
+Circuit breaker for external dependencies such as Gemini.
+After a run of consecutive failures the circuit opens and calls are rejected
+immediately, so callers go straight to their fallback instead of waiting on a
+dependency that is down. After a cool-down a limited number of trial calls
+are let through (half-open); a success closes the circuit again.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import time
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its circuit is open."""
+
+class CircuitBreaker:
+    """Closed / open / half-open circuit breaker keyed on consecutive failures."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._half_open_calls = 0
+        self._last_failure: Optional[str] = None
+        self._last_state_change = datetime.now().isoformat()
+        self._stats = {"successes": 0, "failures": 0, "rejected": 0, "times_opened": 0}
+
+    def _set_state(self, state: str):
+        if state != self._state:
+            logger.warning(f"Circuit '{self.name}' changed from {self._state} to {state}")
+            self._state = state
+            self._last_state_change = datetime.now().isoformat()
+
+    def _refresh(self):
+        """Move an open circuit to half-open once the recovery timeout has passed."""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._set_state(HALF_OPEN)
+            self._half_open_calls = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def before_call(self):
+        """
+        Reserve permission for one call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all
+                trial slots taken
+        """
+        with self._lock:
+            self._refresh()
+            if self._state == OPEN or (self._state == HALF_OPEN and self._half_open_calls >= self.half_open_max_calls):
+                self._stats["rejected"] += 1
+                retry_in = max(self.recovery_timeout - (time.monotonic() - self._opened_at), 0)
+                raise CircuitOpenError(f"Circuit '{self.name}' is {self._state}; retry in {retry_in:.0f}s")
+            if self._state == HALF_OPEN:
+                self._half_open_calls += 1
+
+    def record_success(self):
+        with self._lock:
+            self._stats["successes"] += 1
+            self._consecutive_failures = 0
+            if self._state == HALF_OPEN:
+                self._half_open_calls = max(self._half_open_calls - 1, 0)
+                self._set_state(CLOSED)
+
+    def record_failure(self, error: Optional[BaseException] = None):
+        with self._lock:
+            self._stats["failures"] += 1
+            self._consecutive_failures += 1
+            self._last_failure = f"{type(error).__name__}: {error}" if error is not None else None
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._half_open_calls = 0
+                self._stats["times_opened"] += 1
+                self._set_state(OPEN)
+
+    def record_cancelled(self):
+        """Release a trial slot for a call that was cancelled before it finished."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._half_open_calls = max(self._half_open_calls - 1, 0)
+
+    def get_state(self) -> Dict[str, Any]:
+        """Return the current state and counters (used by /health)."""
+        with self._lock:
+            self._refresh()
+            retry_in = None
+            if self._state == OPEN:
+                retry_in = round(max(self.recovery_timeout - (time.monotonic() - self._opened_at), 0), 1)
+            return {
+                "name": self.name,
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "recovery_timeout_seconds": self.recovery_timeout,
+                "retry_in_seconds": retry_in,
+                "last_failure": self._last_failure,
+                "last_state_change": self._last_state_change,
+                **self._stats
+            }
@@ -0,0 +1,53 @@
+"""
+Versions and HTTP ETags for shared documents (the current plan, the alert snapshot).
+A writer that read a document at one version can ask to replace it only if it
+is still at that version; if another writer got there first, the store raises
+VersionConflict and the API answers 412. The version doubles as an HTTP ETag
+(make_etag / etag_matches). Tasks and plans are stored in the project
+database (project-db.py), which uses these helpers for its own versions.
+This module only uses the standard library so the Streamlit frontend can load
+it by path.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import hashlib
+import logging
+from typing import Optional
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Version of a document that doesn't exist yet
+MISSING_VERSION = "0"
+
+class VersionConflict(Exception):
+    """The document changed since the writer read it."""
+
+    def __init__(self, path: str, expected: str, current: str):
+        super().__init__(f"{path} is at version {current}, not {expected}")
+        self.path = path
+        self.expected = expected
+        self.current = current
+
+def content_version(data: bytes) -> str:
+    """Version of a document's bytes"""
+    return hashlib.sha256(data).hexdigest()[:16]
+
+def make_etag(version: str) -> str:
+    """Strong HTTP ETag for a version"""
+    return f'"{version}"'
+
+def etag_matches(header: Optional[str], version: str) -> bool:
+    """Whether an If-Match / If-None-Match header value names this version ("*" matches any)"""
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"') == version:
+            return True
+    return False
@@ -0,0 +1,240 @@
+"""
+Offline stand-in for the Gemini model, used when LLM_BACKEND=fake.
+Answers with canned JSON after a simulated latency drawn from a configurable
+distribution, and can inject errors, so the plan pipeline can be exercised and
+benchmarked in CI or on air-gapped machines without calling Google.
+It exposes the parts of genai.GenerativeModel that gemini_client uses.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import os
+import re
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# Local /plan grammar parser (kebab-case plan-parser.py), reused to build realistic answers
+from utils import plan_parser
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = os.getenv("FAKE_LLM_MODEL", "fake-llm")
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+ERROR_KINDS = ("network", "quota", "timeout", "bad_json")
+
+# Exceptions named after their google.api_core counterparts so llm_metrics classifies them the same way
+class ServiceUnavailable(Exception):
+    """Injected network failure."""
+
+class ResourceExhausted(Exception):
+    """Injected quota failure."""
+
+class DeadlineExceeded(Exception):
+    """Injected server-side timeout."""
+
+class FakeLLMConfig:
+    """Latency, error and response settings for the fake model."""
+
+    def __init__(self, latency_ms: float = 300.0, distribution: str = "lognormal", jitter: float = 0.5,
+                 error_rate: float = 0.0, error_kinds: Optional[List[str]] = None,
+                 responses: Optional[List[Dict[str, Any]]] = None, chunk_chars: int = 40,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            latency_ms: Median simulated latency of a call
+            distribution: One of LATENCY_DISTRIBUTIONS
+            jitter: Spread of the distribution (sigma for lognormal, fraction of
+                latency_ms for uniform and normal)
+            error_rate: Probability (0-1) that a call fails
+            error_kinds: Failure kinds to pick from, a subset of ERROR_KINDS
+            responses: Canned answers, a list of {"match": regex, "response": str or JSON}
+                checked in order against the prompt
+            chunk_chars: Characters per chunk when streaming
+            seed: Seed for reproducible latencies and errors
+        """
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{distribution}'")
+        unknown = set(error_kinds or ERROR_KINDS) - set(ERROR_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown error kinds: {', '.join(sorted(unknown))}")
+        self.latency_ms = latency_ms
+        self.distribution = distribution
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_kinds = list(error_kinds or ERROR_KINDS)
+        self.responses = responses or []
+        self.chunk_chars = chunk_chars
+        self.random = random.Random(seed)
+
+    @classmethod
+    def from_env(cls) -> "FakeLLMConfig":
+        responses = []
+        responses_file = os.getenv("FAKE_LLM_RESPONSES_FILE")
+        if responses_file:
+            with open(responses_file, "r") as f:
+                responses = json.load(f)
+        seed = os.getenv("FAKE_LLM_SEED")
+        return cls(
+            latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "300")),
+            distribution=os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "lognormal"),
+            jitter=float(os.getenv("FAKE_LLM_LATENCY_JITTER", "0.5")),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            error_kinds=[kind.strip() for kind in os.getenv("FAKE_LLM_ERROR_KINDS", ",".join(ERROR_KINDS)).split(",")
+                         if kind.strip()],
+            responses=responses,
+            seed=int(seed) if seed else None
+        )
+
+    def sample_latency(self) -> float:
+        """Draw one call latency in seconds."""
+        if self.distribution == "fixed":
+            value = self.latency_ms
+        elif self.distribution == "uniform":
+            spread = self.latency_ms * self.jitter
+            value = self.random.uniform(self.latency_ms - spread, self.latency_ms + spread)
+        elif self.distribution == "normal":
+            value = self.random.gauss(self.latency_ms, self.latency_ms * self.jitter)
+        else:
+            # Median of a lognormal is exp(mu), so mu = ln(latency_ms)
+            value = self.random.lognormvariate(0, self.jitter) * self.latency_ms
+        return max(value, 0.0) / 1000
+
+    def sample_error(self) -> Optional[str]:
+        """Return the kind of failure to inject, or None for a successful call."""
+        if self.error_rate > 0 and self.random.random() < self.error_rate:
+            return self.random.choice(self.error_kinds)
+        return None
+
+# Active settings, replaceable at runtime (e.g. by the load-test driver)
+config = FakeLLMConfig.from_env()
+
+_lock = threading.Lock()
+_stats = {"calls": 0, "errors": 0}
+
+def configure(**settings) -> FakeLLMConfig:
+    """Replace the active settings; accepts the FakeLLMConfig arguments."""
+    global config
+    config = FakeLLMConfig(**settings)
+    return config
+
+def _extract_text(prompt: str) -> str:
+    match = re.search(r"TEXT:\s*(.*?)\n", prompt, re.DOTALL)
+    return match.group(1).strip() if match else prompt.strip()
+
+def _extract_texts(prompt: str) -> List[str]:
+    block = re.search(r"TEXTS:\s*(.*?)\n\s*\n", prompt, re.DOTALL)
+    if not block:
+        return []
+    return [match.group(1).strip() for match in re.finditer(r"^\s*\d+\.\s*(.+)$", block.group(1), re.MULTILINE)]
+
+def _fake_plan(plan_text: str) -> Dict[str, Any]:
+    """Plausible parse of a plan: the local parser's answer, or a generic plan."""
+    parsed = plan_parser.parse_plan_text(plan_text)
+    if parsed is not None:
+        return parsed
+    return {
+        "title": plan_text[:40].strip() or "Untitled plan",
+        "due_date": (datetime.now() + timedelta(days=14)).strftime("%Y-%m-%d"),
+        "team_members": [{"name": "Alex", "role": "Developer"}, {"name": "Sam", "role": "Designer"}]
+    }
+
+def _answer(prompt: str) -> str:
+    """Canned answer for a prompt."""
+    for canned in config.responses:
+        if re.search(canned.get("match", ""), prompt):
+            response = canned.get("response", "")
+            return response if isinstance(response, str) else json.dumps(response)
+    if "Return a JSON array" in prompt:
+        plans = [dict(_fake_plan(text), index=index) for index, text in enumerate(_extract_texts(prompt))]
+        return json.dumps(plans)
+    if "JSON format" in prompt:
+        return json.dumps(_fake_plan(_extract_text(prompt)))
+    return f"This is a simulated response from {MODEL_NAME} for: {prompt.strip()[:80]}"
+
+def _next_call():
+    """Draw latency and failure for a call and count it."""
+    error_kind = config.sample_error()
+    with _lock:
+        _stats["calls"] += 1
+        if error_kind is not None:
+            _stats["errors"] += 1
+    return config.sample_latency(), error_kind
+
+def _raise_for(error_kind: str):
+    if error_kind == "network":
+        raise ServiceUnavailable("503 Simulated service unavailable")
+    if error_kind == "quota":
+        raise ResourceExhausted("429 Simulated quota exceeded")
+    if error_kind == "timeout":
+        raise DeadlineExceeded("504 Simulated deadline exceeded")
+
+def _text_for(prompt: str, error_kind: Optional[str]) -> str:
+    if error_kind == "bad_json":
+        return "Sure! Here is the plan you asked for: {\"title\": "
+    _raise_for(error_kind)
+    return _answer(prompt)
+
+class FakeResponse:
+    """Minimal GenerateContentResponse: only .text is used by gemini_client."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+class FakeStream:
+    """Async iterator over response chunks, spreading the latency across them."""
+
+    def __init__(self, prompt: str, latency: float, error_kind: Optional[str]):
+        self.prompt = prompt
+        self.latency = latency
+        self.error_kind = error_kind
+
+    async def __aiter__(self):
+        # Most of the latency is time to first chunk, as with the real API
+        await asyncio.sleep(self.latency * 0.6)
+        text = _text_for(self.prompt, self.error_kind)
+        chunks = [text[i:i + config.chunk_chars] for i in range(0, len(text), config.chunk_chars)] or [""]
+        for position, chunk in enumerate(chunks):
+            if position:
+                await asyncio.sleep(self.latency * 0.4 / len(chunks))
+            yield FakeResponse(chunk)
+
+class FakeGenerativeModel:
+    """Drop-in for genai.GenerativeModel covering generate_content(_async)."""
+
+    def __init__(self, model_name: str = MODEL_NAME):
+        self.model_name = model_name
+
+    def generate_content(self, prompt: str) -> FakeResponse:
+        latency, error_kind = _next_call()
+        time.sleep(latency)
+        return FakeResponse(_text_for(prompt, error_kind))
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        latency, error_kind = _next_call()
+        if stream:
+            return FakeStream(prompt, latency, error_kind)
+        await asyncio.sleep(latency)
+        return FakeResponse(_text_for(prompt, error_kind))
+
+def get_model(model_name: Optional[str] = None) -> FakeGenerativeModel:
+    return FakeGenerativeModel(model_name or MODEL_NAME)
+
+def get_stats() -> Dict[str, Any]:
+    """Return call and injected-error counters plus the active settings."""
+    with _lock:
+        stats = dict(_stats)
+    stats.update({
+        "latency_ms": config.latency_ms,
+        "distribution": config.distribution,
+        "error_rate": config.error_rate,
+        "error_kinds": config.error_kinds
+    })
+    return stats
@@ -0,0 +1,392 @@
+"""
+Shared Gemini client for the PM-Agent.
+Every module that talks to Gemini goes through here. The API key is configured
+lazily on first use and one GenerativeModel per model name is reused, so the
+underlying transport survives across requests. An optional warm-up opens the
+connection at startup, and call timings show first-call versus steady-state cost.
+Async calls go through a bounded concurrency limiter and have their own deadline,
+and stream_text_async yields chunks as Gemini produces them. Every call is
+recorded in the llm_metrics registry under an operation label.
+All calls pass through a circuit breaker: while Gemini keeps failing, calls
+raise CircuitOpenError at once so callers use their local fallback.
+Slow async calls can optionally be hedged with a second request.
+LLM_BACKEND=fake or llama swaps Gemini for the offline fake_llm model or the
+local llama_llm model, keeping the limiter, deadlines, breaker and telemetry
+in the path.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, AsyncIterator, Optional
+import google.generativeai as genai
+from google.generativeai import client as genai_transport
+from dotenv import load_dotenv
+
+# Call telemetry, circuit breaker and local models
+# (kebab-case llm-metrics.py, circuit-breaker.py, fake-llm.py, llama-llm.py)
+from utils import llm_metrics
+from utils import circuit_breaker
+from utils import fake_llm
+from utils import llama_llm
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Model backends that run without the Gemini API, by LLM_BACKEND value
+LOCAL_BACKENDS = {"fake": fake_llm, "llama": llama_llm}
+
+# Client settings
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini").lower()
+if LLM_BACKEND != "gemini" and LLM_BACKEND not in LOCAL_BACKENDS:
+    logger.error(f"Unknown LLM_BACKEND '{LLM_BACKEND}', using gemini")
+    LLM_BACKEND = "gemini"
+MODEL_NAME = LOCAL_BACKENDS[LLM_BACKEND].MODEL_NAME if LLM_BACKEND in LOCAL_BACKENDS else os.getenv("GEMINI_MODEL", "gemini-pro")
+MAX_CONCURRENT_CALLS = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+CALL_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "30"))
+WARM_UP_ON_STARTUP = os.getenv("GEMINI_WARMUP", "false").lower() in ("1", "true", "yes")
+# Send a second, hedged request if the first hasn't answered after this many seconds (0 disables)
+HEDGE_AFTER_SECONDS = float(os.getenv("GEMINI_HEDGE_AFTER_SECONDS", "0"))
+
+class GeminiTimeoutError(Exception):
+    """Raised when a Gemini call does not finish before its deadline."""
+
+# Re-exported so callers can tell a rejected call from a failed one
+CircuitOpenError = circuit_breaker.CircuitOpenError
+
+# Breaker shared by every Gemini call in the process
+breaker = circuit_breaker.CircuitBreaker(
+    "gemini",
+    failure_threshold=int(os.getenv("GEMINI_BREAKER_FAILURE_THRESHOLD", "5")),
+    recovery_timeout=float(os.getenv("GEMINI_BREAKER_RECOVERY_SECONDS", "30"))
+)
+
+# Worker threads that let blocking calls honour a deadline
+_sync_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CALLS, thread_name_prefix="gemini")
+
+_configured = False
+_models = {}  # model name -> GenerativeModel
+_lock = threading.Lock()
+
+# One limiter per event loop (asyncio primitives are bound to the loop that uses them)
+_limiters = weakref.WeakKeyDictionary()
+
+# Timing data used to compare cold and steady-state requests
+_stats = {
+    "warm_up_ms": None,
+    "first_call_ms": None,
+    "steady_calls": 0,
+    "steady_total_ms": 0.0,
+    "last_call_ms": None
+}
+
+def _configure():
+    """Configure the Gemini SDK once, on first use."""
+    global _configured
+    if _configured:
+        return
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        logger.warning("GEMINI_API_KEY not found in environment variables")
+        # Use a placeholder instead of hardcoding a real key
+        api_key = "PLACEHOLDER_API_KEY_MISSING_FROM_ENV"
+        logger.error("No GEMINI_API_KEY provided. Please add it to your .env file")
+    genai.configure(api_key=api_key)
+    _configured = True
+
+def get_model(model_name: Optional[str] = None) -> genai.GenerativeModel:
+    """
+    Return the shared GenerativeModel for a model name, creating it on first use.
+    With a local LLM_BACKEND this is that backend's model, which has the same
+    generate_content / generate_content_async interface.
+    """
+    name = model_name or MODEL_NAME
+    model = _models.get(name)
+    if model is None:
+        with _lock:
+            model = _models.get(name)
+            if model is None:
+                if LLM_BACKEND in LOCAL_BACKENDS:
+                    model = LOCAL_BACKENDS[LLM_BACKEND].get_model(name)
+                else:
+                    _configure()
+                    model = genai.GenerativeModel(model_name=name)
+                _models[name] = model
+    return model
+
+def _record_call(elapsed_ms: float):
+    """Record a call duration, keeping the first (cold) call separate."""
+    with _lock:
+        _stats["last_call_ms"] = round(elapsed_ms, 1)
+        if _stats["first_call_ms"] is None:
+            _stats["first_call_ms"] = round(elapsed_ms, 1)
+        else:
+            _stats["steady_calls"] += 1
+            _stats["steady_total_ms"] += elapsed_ms
+
+def _generate_sync(prompt: str):
+    model = get_model()
+    started = time.perf_counter()
+    response = model.generate_content(prompt)
+    text = response.text
+    _record_call((time.perf_counter() - started) * 1000)
+    return response, text
+
+def generate_text(prompt: str, operation: str = "completion", timeout: Optional[float] = None) -> str:
+    """
+    Generate text for a prompt with the shared model (blocking).
+
+    Args:
+        prompt: String containing the prompt
+        operation: Label the call is recorded under in llm_metrics
+        timeout: Deadline in seconds. Defaults to GEMINI_TIMEOUT_SECONDS.
+
+    Returns:
+        Generated text response
+
+    Raises:
+        CircuitOpenError: If the Gemini circuit is open
+        GeminiTimeoutError: If the deadline passes before the call completes
+    """
+    deadline = CALL_TIMEOUT_SECONDS if timeout is None else timeout
+    breaker.before_call()
+    started = time.perf_counter()
+    try:
+        response, text = _sync_executor.submit(_generate_sync, prompt).result(timeout=deadline)
+    except FutureTimeoutError:
+        logger.warning(f"Gemini call exceeded its {deadline}s deadline")
+        error = GeminiTimeoutError(f"Gemini call timed out after {deadline}s")
+        breaker.record_failure(error)
+        llm_metrics.registry.record_call(operation, (time.perf_counter() - started) * 1000, prompt, error=error)
+        raise error
+    except Exception as e:
+        breaker.record_failure(e)
+        llm_metrics.registry.record_call(operation, (time.perf_counter() - started) * 1000, prompt, error=e)
+        raise
+    breaker.record_success()
+    llm_metrics.registry.record_call(operation, (time.perf_counter() - started) * 1000, prompt, text,
+                                     usage=getattr(response, "usage_metadata", None))
+    return text
+
+def _get_limiter() -> asyncio.Semaphore:
+    """Return the concurrency limiter for the running event loop."""
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limiter = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+        _limiters[loop] = limiter
+    return limiter
+
+async def _generate(prompt: str):
+    """Wait for a free slot, then run a single Gemini request."""
+    async with _get_limiter():
+        model = get_model()
+        started = time.perf_counter()
+        response = await model.generate_content_async(prompt)
+        _record_call((time.perf_counter() - started) * 1000)
+        return response
+
+async def _generate_hedged(prompt: str, hedge_after: float):
+    """
+    Run a request and, if it is still pending after hedge_after seconds, race
+    a second identical request against it. The first success wins and the
+    other request is cancelled.
+    """
+    if hedge_after <= 0:
+        return await _generate(prompt)
+
+    primary = asyncio.ensure_future(_generate(prompt))
+    tasks = [primary]
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        logger.info(f"Gemini call slower than {hedge_after}s; sending hedged request")
+        tasks.append(asyncio.ensure_future(_generate(prompt)))
+        pending = set(tasks)
+        last_error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+        raise last_error
+    finally:
+        # Also reached when the caller is cancelled or its deadline passes first
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+async def generate_text_async(prompt: str, timeout: Optional[float] = None, operation: str = "completion",
+                              hedge_after: Optional[float] = None) -> str:
+    """
+    Generate text for a prompt without blocking the event loop.
+
+    Args:
+        prompt: String containing the prompt
+        timeout: Deadline in seconds, covering both the wait for a free slot
+            and the request itself. Defaults to GEMINI_TIMEOUT_SECONDS.
+        operation: Label the call is recorded under in llm_metrics
+        hedge_after: Seconds before a hedged second request is sent.
+            Defaults to GEMINI_HEDGE_AFTER_SECONDS (0 disables hedging).
+
+    Returns:
+        Generated text response
+
+    Raises:
+        CircuitOpenError: If the Gemini circuit is open
+        GeminiTimeoutError: If the deadline passes before the call completes
+    """
+    deadline = CALL_TIMEOUT_SECONDS if timeout is None else timeout
+    hedge_after = HEDGE_AFTER_SECONDS if hedge_after is None else hedge_after
+    breaker.before_call()
+    started = time.perf_counter()
+    try:
+        response = await asyncio.wait_for(_generate_hedged(prompt, hedge_after), timeout=deadline)
+        text = response.text
+    except asyncio.TimeoutError:
+        logger.warning(f"Gemini call exceeded its {deadline}s deadline")
+        error = GeminiTimeoutError(f"Gemini call timed out after {deadline}s")
+        breaker.record_failure(error)
+        llm_metrics.registry.record_call(operation, (time.perf_counter() - started) * 1000, prompt, error=error)
+        raise error
+    except Exception as e:
+        breaker.record_failure(e)
+        llm_metrics.registry.record_call(operation, (time.perf_counter() - started) * 1000, prompt, error=e)
+        raise
+    except BaseException:
+        breaker.record_cancelled()
+        raise
+    breaker.record_success()
+    llm_metrics.registry.record_call(operation, (time.perf_counter() - started) * 1000, prompt, text,
+                                     usage=getattr(response, "usage_metadata", None))
+    return text
+
+# Marks the end of a stream in the chunk queue
+_STREAM_DONE = object()
+
+async def _pump_stream(prompt: str, queue: asyncio.Queue):
+    """Read Gemini's streamed chunks into a queue (runs as its own task)."""
+    started = time.perf_counter()
+    parts = []
+    try:
+        model = get_model()
+        response = await model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                if not parts:
+                    llm_metrics.registry.record_call("stream_first_chunk", (time.perf_counter() - started) * 1000,
+                                                     prompt, chunk.text)
+                parts.append(chunk.text)
+                await queue.put(chunk.text)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        _record_call(elapsed_ms)
+        breaker.record_success()
+        llm_metrics.registry.record_call("stream", elapsed_ms, prompt, "".join(parts),
+                                         usage=getattr(response, "usage_metadata", None))
+        await queue.put(_STREAM_DONE)
+    except asyncio.CancelledError:
+        breaker.record_cancelled()
+        raise
+    except Exception as e:
+        breaker.record_failure(e)
+        llm_metrics.registry.record_call("stream", (time.perf_counter() - started) * 1000, prompt, error=e)
+        await queue.put(e)
+
+async def stream_text_async(prompt: str, timeout: Optional[float] = None) -> AsyncIterator[str]:
+    """
+    Yield the generated text for a prompt chunk by chunk as Gemini streams it.
+
+    The deadline applies to each wait for the next chunk (including the first),
+    so a stalled stream fails fast without capping total generation time.
+    Closing or cancelling the generator (e.g. when an HTTP client disconnects)
+    cancels the reading task, which cancels the underlying RPC and releases
+    the concurrency slot.
+
+    Raises:
+        CircuitOpenError: If the Gemini circuit is open
+        GeminiTimeoutError: If no chunk arrives before the deadline
+    """
+    deadline = CALL_TIMEOUT_SECONDS if timeout is None else timeout
+    breaker.before_call()
+    async with _get_limiter():
+        queue = asyncio.Queue(maxsize=16)
+        reader = asyncio.create_task(_pump_stream(prompt, queue))
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=deadline)
+                except asyncio.TimeoutError:
+                    logger.warning(f"Gemini stream stalled for more than {deadline}s")
+                    breaker.record_failure(GeminiTimeoutError(f"stalled for {deadline}s"))
+                    raise GeminiTimeoutError(f"Gemini stream timed out after {deadline}s without a chunk")
+                if item is _STREAM_DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if not reader.done():
+                reader.cancel()
+                logger.info("Gemini stream closed early; cancelled the request")
+
+async def warm_up_async(timeout: Optional[float] = None) -> bool:
+    """
+    Configure the SDK and open the model's connection before real traffic.
+
+    Uses a token count request, which is cheap and needs no generation quota.
+    The SDK keeps one transport per process, so the shared model picks up the
+    warmed connection on its first real call. Local backends load their model
+    instead (the llama backend reads the GGUF file here).
+    Returns True if the warm-up request succeeded.
+    """
+    deadline = CALL_TIMEOUT_SECONDS if timeout is None else timeout
+    started = time.perf_counter()
+    try:
+        model = get_model()
+        if LLM_BACKEND in LOCAL_BACKENDS:
+            # Local backends are ready once the model is loaded
+            load = getattr(LOCAL_BACKENDS[LLM_BACKEND], "warm_up", None)
+            if load is not None and not await asyncio.get_running_loop().run_in_executor(None, load):
+                raise RuntimeError(f"{LLM_BACKEND} model failed to load")
+        else:
+            async_client = genai_transport.get_default_generative_async_client()
+            request = {"model": model.model_name, "contents": [{"parts": [{"text": "ping"}]}]}
+            await asyncio.wait_for(async_client.count_tokens(request=request), timeout=deadline)
+    except Exception as e:
+        logger.warning(f"Gemini warm-up failed: {type(e).__name__}: {e}")
+        return False
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    with _lock:
+        _stats["warm_up_ms"] = round(elapsed_ms, 1)
+    logger.info(f"Gemini client warmed up in {elapsed_ms:.0f} ms")
+    return True
+
+def get_stats() -> Dict[str, Any]:
+    """Return client state and first-call versus steady-state timings."""
+    with _lock:
+        steady_calls = _stats["steady_calls"]
+        return {
+            "backend": LLM_BACKEND,
+            "model_name": MODEL_NAME,
+            "configured": _configured,
+            "cached_models": sorted(_models),
+            "warm_up_ms": _stats["warm_up_ms"],
+            "first_call_ms": _stats["first_call_ms"],
+            "last_call_ms": _stats["last_call_ms"],
+            "steady_state_calls": steady_calls,
+            "steady_state_avg_ms": round(_stats["steady_total_ms"] / steady_calls, 1) if steady_calls else None,
+            "circuit": breaker.get_state(),
+            "backend_stats": LOCAL_BACKENDS[LLM_BACKEND].get_stats() if LLM_BACKEND in LOCAL_BACKENDS else None
+        }
@@ -5,11 +5,12 @@ Following windsurf conventions: kebab-case filename, camelCase module usage.
 """
 
 import os
+import re
+import asyncio
 import logging
 import json
 from datetime import datetime
-import google.generativeai as genai
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional
 from dotenv import load_dotenv
 
 # Setup logging
@@ -19,28 +20,24 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini API
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    logger.warning("GEMINI_API_KEY not found in environment variables")
-    # Use a placeholder instead of hardcoding a real key
-    GEMINI_API_KEY = "PLACEHOLDER_API_KEY_MISSING_FROM_ENV"
-    logger.error("No GEMINI_API_KEY provided. Please add it to your .env file")
+# Import the shared Gemini client, request coalescing, telemetry, local parser, plan cache and log writer
+# (kebab-case files, Python-compatible imports)
+from utils import gemini_client
+from utils import single_flight
+from utils import llm_metrics
+from utils import plan_parser
+from utils import plan_cache
+from utils import log_writer
 
-# Configure the Gemini model
-genai.configure(api_key=GEMINI_API_KEY)
+# Bump whenever build_plan_prompt changes so cached parses are not reused
+PLAN_PROMPT_VERSION = "1"
 
-def parse_plan_with_gemini(plan_text: str) -> Dict[str, Any]:
-    """
-    Use Gemini to parse a natural language plan description into structured data.
-    
-    Example input: "Redesign landing page by Sep-05; Dev: Alice,Bob; Mktg: Carol"
-    
-    Returns a structured plan with title, due date, and assigned team members.
-    """
-    try:
-        # Create a prompt for Gemini
-        prompt = f"""
+# Number of plans packed into one Gemini request by the batch parser
+PLAN_BATCH_SIZE = int(os.getenv("PLAN_BATCH_SIZE", "10"))
+
+def build_plan_prompt(plan_text: str) -> str:
+    """Build the Gemini prompt used to parse a plan description."""
+    return f"""
         Parse the following project plan text into a structured format.
         
         TEXT: {plan_text}
@@ -62,42 +59,286 @@ def parse_plan_with_gemini(plan_text: str) -> Dict[str, Any]:
         
         Only return the JSON, no other text.
         """
+
+def fallback_plan(plan_text: str) -> Dict[str, Any]:
+    """Structure returned when Gemini cannot parse the plan."""
+    return {
+        "title": plan_text[:30] + "..." if len(plan_text) > 30 else plan_text,
+        "due_date": "2025-12-31",
+        "team_members": [{"name": "Unassigned", "role": "Developer"}]
+    }
+
+def plan_cache_key(plan_text: str) -> str:
+    """Cache key for a plan parse with the current model and prompt."""
+    return plan_cache.make_key(plan_text, gemini_client.MODEL_NAME, PLAN_PROMPT_VERSION)
+
+def _strip_code_fence(result: str) -> str:
+    """Tolerate answers wrapped in a markdown code fence."""
+    return re.sub(r"^```(?:json)?\s*|\s*```$", "", result.strip())
+
+def _record_parsed_plan(result: str, log_to_project: bool = True) -> Dict[str, Any]:
+    """Decode Gemini's JSON answer and log the parsed plan."""
+    parsed_data = json.loads(_strip_code_fence(result))
+    
+    # Log the successful parsing
+    logger.info(f"Successfully parsed plan: {parsed_data['title']}")
+    
+    # Update project log
+    if log_to_project:
+        log_writer.append_entry(f"Gemini AI parsed plan: {parsed_data['title']}")
+    
+    return parsed_data
+
+def parse_plan_with_gemini(plan_text: str, log_to_project: bool = True) -> Dict[str, Any]:
+    """
+    Use Gemini to parse a natural language plan description into structured data.
+    
+    Example input: "Redesign landing page by Sep-05; Dev: Alice,Bob; Mktg: Carol"
+    
+    Returns a structured plan with title, due date, and assigned team members.
+    Text matching the canonical grammar is parsed locally, and parses seen
+    before are served from the plan cache; only the rest calls Gemini.
+    Identical parses already in flight are joined instead of repeated.
+    A fresh Gemini parse is noted in the project log unless log_to_project is False.
+    """
+    local_plan = plan_parser.parse_plan_text(plan_text)
+    if local_plan is not None:
+        logger.info(f"Parsed plan locally: {local_plan['title']}")
+        llm_metrics.registry.record_outcome("plan_parse", "local")
+        return local_plan
+    
+    cache_key = plan_cache_key(plan_text)
+    cached = plan_cache.default_cache.get(cache_key)
+    if cached is not None:
+        llm_metrics.registry.record_outcome("plan_parse", "cache")
+        return cached
+    
+    def parse():
+        try:
+            # Call Gemini through the shared client
+            result = gemini_client.generate_text(build_plan_prompt(plan_text), operation="plan_parse")
+            parsed_data = _record_parsed_plan(result, log_to_project)
+            plan_cache.default_cache.set(cache_key, parsed_data)
+            llm_metrics.registry.record_outcome("plan_parse", "gemini")
+            return parsed_data
+            
+        except Exception as e:
+            logger.error(f"Error parsing plan with Gemini: {e}")
+            llm_metrics.registry.record_outcome("plan_parse", "fallback", error=e)
+            # Return a fallback structure
+            return fallback_plan(plan_text)
+    
+    return single_flight.plan_flight.do(cache_key, parse)
+
+async def parse_plan_with_gemini_async(plan_text: str, log_to_project: bool = True) -> Dict[str, Any]:
+    """
+    Async variant of parse_plan_with_gemini for FastAPI routes.
+    
+    The Gemini call runs through the async client, so it neither blocks the
+    event loop nor exceeds the client's concurrency limit and deadline.
+    """
+    local_plan = plan_parser.parse_plan_text(plan_text)
+    if local_plan is not None:
+        logger.info(f"Parsed plan locally: {local_plan['title']}")
+        llm_metrics.registry.record_outcome("plan_parse", "local")
+        return local_plan
+    
+    cache_key = plan_cache_key(plan_text)
+    cached = plan_cache.default_cache.get(cache_key)
+    if cached is not None:
+        llm_metrics.registry.record_outcome("plan_parse", "cache")
+        return cached
+    
+    async def parse():
+        try:
+            result = await gemini_client.generate_text_async(build_plan_prompt(plan_text), operation="plan_parse")
+            parsed_data = _record_parsed_plan(result, log_to_project)
+            plan_cache.default_cache.set(cache_key, parsed_data)
+            llm_metrics.registry.record_outcome("plan_parse", "gemini")
+            return parsed_data
+            
+        except Exception as e:
+            logger.error(f"Error parsing plan with Gemini: {e}")
+            llm_metrics.registry.record_outcome("plan_parse", "fallback", error=e)
+            # Return a fallback structure
+            return fallback_plan(plan_text)
+    
+    return await single_flight.plan_flight.do_async(cache_key, parse)
+
+def build_batch_plan_prompt(plan_texts: List[str]) -> str:
+    """Build a single Gemini prompt that parses several plan descriptions."""
+    items = "\n".join(f"{index}. {text}" for index, text in enumerate(plan_texts))
+    return f"""
+        Parse each of the following numbered project plan texts into a structured format.
         
-        # Call Gemini API directly
-        model = genai.GenerativeModel(model_name="gemini-pro")
-        response = model.generate_content(prompt)
-        result = response.text
-        
-        # Parse the result
-        parsed_data = json.loads(result)
+        TEXTS:
+        {items}
         
-        # Log the successful parsing
-        logger.info(f"Successfully parsed plan: {parsed_data['title']}")
+        For every text extract:
+        1. Title of the project/task
+        2. Due date (convert any date format to YYYY-MM-DD)
+        3. Team members and their roles
         
-        # Update project log
-        with open(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "project_log.md"), "a") as log_file:
-            timestamp = datetime.now().strftime("%Y‑%m‑%d %H:%M")
-            log_file.write(f"- **{timestamp}**: Gemini AI parsed plan: {parsed_data['title']}\n")
-            
-        return parsed_data
+        Return a JSON array with exactly one object per text, in the following format:
+        [
+            {{
+                "index": 0,
+                "title": "The project title",
+                "due_date": "YYYY-MM-DD",
+                "team_members": [
+                    {{ "name": "Name1", "role": "Role1" }}
+                ]
+            }}
+        ]
         
+        "index" must be the number of the text the object was parsed from.
+        Only return the JSON array, no other text.
+        """
+
+def _validate_plan(item: Any) -> Optional[Dict[str, Any]]:
+    """Return a clean plan dict if an item from a batch answer is well-formed."""
+    if not isinstance(item, dict) or not isinstance(item.get("title"), str) or not item["title"].strip():
+        return None
+    try:
+        datetime.strptime(str(item.get("due_date")), "%Y-%m-%d")
+    except ValueError:
+        return None
+    members = item.get("team_members")
+    if not isinstance(members, list):
+        return None
+    team_members = []
+    for member in members:
+        if not isinstance(member, dict) or not member.get("name"):
+            return None
+        team_members.append({"name": str(member["name"]), "role": str(member.get("role", ""))})
+    return {"title": item["title"].strip(), "due_date": item["due_date"], "team_members": team_members}
+
+def _split_batch_result(result: str, count: int) -> List[Optional[Dict[str, Any]]]:
+    """Split Gemini's JSON array answer into per-item plans (None where invalid)."""
+    plans = [None] * count
+    try:
+        items = json.loads(_strip_code_fence(result))
+    except json.JSONDecodeError as e:
+        logger.error(f"Batch plan answer was not valid JSON: {e}")
+        llm_metrics.registry.record_outcome("plan_batch_answer", "bad_json")
+        return plans
+    if not isinstance(items, list):
+        llm_metrics.registry.record_outcome("plan_batch_answer", "bad_json")
+        return plans
+    llm_metrics.registry.record_outcome("plan_batch_answer", "valid")
+
+    for position, item in enumerate(items):
+        index = item.get("index", position) if isinstance(item, dict) else position
+        if isinstance(index, int) and 0 <= index < count and plans[index] is None:
+            plans[index] = _validate_plan(item)
+    return plans
+
+async def _parse_plan_chunk(plan_texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """Parse one chunk of plan texts with a single Gemini request."""
+    try:
+        result = await gemini_client.generate_text_async(build_batch_plan_prompt(plan_texts), operation="plan_batch")
+        return _split_batch_result(result, len(plan_texts))
     except Exception as e:
-        logger.error(f"Error parsing plan with Gemini: {e}")
-        # Return a fallback structure
-        return {
-            "title": plan_text[:30] + "..." if len(plan_text) > 30 else plan_text,
-            "due_date": "2025-12-31",
-            "team_members": [{"name": "Unassigned", "role": "Developer"}]
-        }
+        logger.error(f"Error parsing plan batch with Gemini: {e}")
+        llm_metrics.registry.record_outcome("plan_batch_answer", "error", error=e)
+        return [None] * len(plan_texts)
+
+async def parse_plans_with_gemini_async(plan_texts: List[str], batch_size: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Parse many plan descriptions using as few Gemini requests as possible.
+    
+    Plans matching the canonical grammar or already in the plan cache are
+    resolved without Gemini. The rest are deduplicated and packed into
+    multi-item prompts of up to batch_size texts, sent concurrently. Items
+    missing or invalid in an answer are retried once in a batch of their own;
+    anything still unparsed gets the usual fallback structure.
+    
+    Returns one plan per input text, in input order.
+    """
+    batch_size = batch_size or PLAN_BATCH_SIZE
+    plans: List[Optional[Dict[str, Any]]] = [None] * len(plan_texts)
+    pending: Dict[str, List[int]] = {}  # cache key -> input positions
+    
+    for position, plan_text in enumerate(plan_texts):
+        local_plan = plan_parser.parse_plan_text(plan_text)
+        if local_plan is not None:
+            plans[position] = local_plan
+            llm_metrics.registry.record_outcome("plan_batch", "local")
+            continue
+        cache_key = plan_cache_key(plan_text)
+        cached = plan_cache.default_cache.get(cache_key)
+        if cached is not None:
+            plans[position] = cached
+            llm_metrics.registry.record_outcome("plan_batch", "cache")
+            continue
+        pending.setdefault(cache_key, []).append(position)
+    
+    keys = list(pending)
+    gemini_calls = 0
+    for attempt in range(2):
+        if not keys:
+            break
+        chunks = [keys[start:start + batch_size] for start in range(0, len(keys), batch_size)]
+        gemini_calls += len(chunks)
+        answers = await asyncio.gather(*(
+            _parse_plan_chunk([plan_texts[pending[key][0]] for key in chunk]) for chunk in chunks
+        ))
+        
+        failed = []
+        for chunk, chunk_plans in zip(chunks, answers):
+            for key, parsed in zip(chunk, chunk_plans):
+                if parsed is None:
+                    failed.append(key)
+                    continue
+                plan_cache.default_cache.set(key, parsed)
+                for position in pending[key]:
+                    plans[position] = dict(parsed)
+                    llm_metrics.registry.record_outcome("plan_batch", "gemini")
+        keys = failed
+    
+    for key in keys:
+        logger.error(f"Falling back for unparsed plan: {plan_texts[pending[key][0]][:50]}")
+        for position in pending[key]:
+            plans[position] = fallback_plan(plan_texts[position])
+            llm_metrics.registry.record_outcome("plan_batch", "fallback")
+    
+    if gemini_calls:
+        logger.info(f"Parsed {len(pending) - len(keys)} of {len(pending)} uncached plans in {gemini_calls} Gemini call(s)")
+    return plans
 
 def get_completion(prompt: str) -> str:
     """
     Get a simple completion from Gemini for a given prompt.
+    Concurrent identical prompts share one Gemini call.
     """
     try:
-        model = genai.GenerativeModel(model_name="gemini-pro")
-        response = model.generate_content(prompt)
-        return response.text
+        return single_flight.completion_flight.do(
+            single_flight.prompt_key(prompt),
+            lambda: gemini_client.generate_text(prompt)
+        )
     except Exception as e:
         logger.error(f"Error getting completion from Gemini: {e}")
+        llm_metrics.registry.record_outcome("completion", "fallback", error=e)
         return f"Error generating response: {str(e)}"
+
+async def get_completion_async(prompt: str) -> str:
+    """
+    Async variant of get_completion for FastAPI routes.
+    """
+    try:
+        return await single_flight.completion_flight.do_async(
+            single_flight.prompt_key(prompt),
+            lambda: gemini_client.generate_text_async(prompt)
+        )
+    except Exception as e:
+        logger.error(f"Error getting completion from Gemini: {e}")
+        llm_metrics.registry.record_outcome("completion", "fallback", error=e)
+        return f"Error generating response: {str(e)}"
+
+async def stream_completion_async(prompt: str) -> AsyncIterator[str]:
+    """
+    Stream a completion from Gemini, yielding text chunks as they arrive.
+    Errors propagate to the caller, which knows how to report them mid-stream.
+    """
+    async for chunk in gemini_client.stream_text_async(prompt):
+        yield chunk
@@ -0,0 +1,311 @@
+"""
+Local CPU model backend built on llama-cpp-python, used when LLM_BACKEND=llama.
+The GGUF model at LLAMA_MODEL_PATH is loaded once per process by a dedicated
+worker thread, which owns it exclusively. Requests reach the worker through a
+queue and are drained in batches: identical prompts in a batch are generated
+once, and the rest run back to back on the loaded model, which reuses its KV
+cache for any prompt prefix shared with the previous request. llama.cpp
+releases the GIL while it evaluates, so the event loop keeps serving requests.
+Runs on CPU-only Linux with no network.
+It exposes the parts of genai.GenerativeModel that gemini_client uses.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import os
+import time
+import queue
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Dict, List, Optional
+from dotenv import load_dotenv
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Model settings
+MODEL_PATH = os.getenv("LLAMA_MODEL_PATH", "")
+MODEL_NAME = os.path.splitext(os.path.basename(MODEL_PATH))[0] if MODEL_PATH else "llama-cpp"
+CONTEXT_SIZE = int(os.getenv("LLAMA_CONTEXT_SIZE", "2048"))
+THREADS = int(os.getenv("LLAMA_THREADS", str(max((os.cpu_count() or 2) // 2, 1))))
+MAX_TOKENS = int(os.getenv("LLAMA_MAX_TOKENS", "512"))
+TEMPERATURE = float(os.getenv("LLAMA_TEMPERATURE", "0.1"))
+CHAT_FORMAT = os.getenv("LLAMA_CHAT_FORMAT", "llama-2")
+# Most requests the worker drains from the queue per batch
+BATCH_SIZE = int(os.getenv("LLAMA_BATCH_SIZE", "8"))
+
+class LlamaUnavailableError(Exception):
+    """Raised when the local model cannot be loaded (missing package or GGUF file)."""
+
+class _Request:
+    """A prompt waiting for the worker; answers arrive on a Future or, when streaming, a queue."""
+
+    def __init__(self, prompt: str, stream_queue: Optional[asyncio.Queue] = None,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.prompt = prompt
+        self.future = Future()
+        self.stream_queue = stream_queue
+        self.loop = loop
+        self.cancelled = False
+
+    def push(self, item: Any):
+        """Hand a stream chunk (or end marker / exception) to the waiting event loop."""
+        try:
+            self.loop.call_soon_threadsafe(self.stream_queue.put_nowait, item)
+        except RuntimeError:
+            # The loop closed while we generated; nobody is listening any more
+            self.cancelled = True
+
+    def resolve(self, result: Any = None, error: Optional[Exception] = None):
+        """Set the future's result or exception, unless it was cancelled or already answered."""
+        if self.future.done():
+            return
+        try:
+            if error is not None:
+                self.future.set_exception(error)
+            else:
+                self.future.set_result(result)
+        except InvalidStateError:
+            # Cancelled by asyncio.wrap_future between the check and the set
+            pass
+
+class LlamaWorker:
+    """Owns the Llama instance and serves queued requests on one thread."""
+
+    def __init__(self):
+        self._requests = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._llm = None
+        self._load_error: Optional[Exception] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "load_ms": None,
+            "requests": 0,
+            "batches": 0,
+            "deduplicated": 0,
+            "max_batch": 0,
+            "generation_ms": 0.0,
+            "completion_tokens": 0
+        }
+
+    def start(self):
+        """Start the worker thread (and model load) if it isn't running yet."""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="llama-worker", daemon=True)
+                self._thread.start()
+
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Start the worker and block until the model has loaded. Returns False on failure."""
+        self.start()
+        self._loaded.wait(timeout)
+        return self._llm is not None
+
+    def _load(self):
+        try:
+            from llama_cpp import Llama
+        except ImportError as e:
+            raise LlamaUnavailableError("llama-cpp-python is not installed") from e
+        if not MODEL_PATH or not os.path.exists(MODEL_PATH):
+            raise LlamaUnavailableError(f"GGUF model not found at LLAMA_MODEL_PATH='{MODEL_PATH}'")
+        started = time.perf_counter()
+        self._llm = Llama(model_path=MODEL_PATH, n_ctx=CONTEXT_SIZE, n_threads=THREADS,
+                          chat_format=CHAT_FORMAT, verbose=False)
+        load_ms = (time.perf_counter() - started) * 1000
+        with self._stats_lock:
+            self._stats["load_ms"] = round(load_ms, 1)
+        logger.info(f"Loaded {MODEL_NAME} in {load_ms:.0f} ms ({THREADS} threads, context {CONTEXT_SIZE})")
+
+    def _run(self):
+        try:
+            self._load()
+        except Exception as e:
+            self._load_error = e
+            logger.error(f"Could not load local model: {e}")
+        finally:
+            self._loaded.set()
+
+        while True:
+            batch = [self._requests.get()]
+            while len(batch) < BATCH_SIZE:
+                try:
+                    batch.append(self._requests.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._serve(batch)
+            except Exception as e:
+                # Never let one batch stop the only thread that serves requests
+                logger.error(f"Local model worker failed serving a batch: {e}")
+                for request in batch:
+                    self._fail(request, e)
+
+    def _serve(self, batch: List[_Request]):
+        """Answer one batch, generating each distinct non-streaming prompt once."""
+        with self._stats_lock:
+            self._stats["batches"] += 1
+            self._stats["requests"] += len(batch)
+            self._stats["max_batch"] = max(self._stats["max_batch"], len(batch))
+
+        pending: Dict[str, List[_Request]] = {}
+        for request in batch:
+            if request.cancelled or request.future.cancelled():
+                continue
+            try:
+                if self._load_error is not None:
+                    self._fail(request, LlamaUnavailableError(str(self._load_error)))
+                elif request.stream_queue is not None:
+                    self._stream(request)
+                else:
+                    pending.setdefault(request.prompt, []).append(request)
+            except Exception as e:
+                logger.error(f"Local model request failed: {e}")
+                self._fail(request, e)
+
+        for prompt, waiting in pending.items():
+            if len(waiting) > 1:
+                with self._stats_lock:
+                    self._stats["deduplicated"] += len(waiting) - 1
+            try:
+                text = self._complete(prompt)
+            except Exception as e:
+                for request in waiting:
+                    self._fail(request, e)
+                continue
+            for request in waiting:
+                request.resolve(text)
+
+    def _fail(self, request: _Request, error: Exception):
+        try:
+            if request.stream_queue is not None:
+                request.push(error)
+            else:
+                request.resolve(error=error)
+        except Exception as e:
+            logger.error(f"Could not report a local model failure: {e}")
+
+    def _messages(self, prompt: str) -> List[Dict[str, str]]:
+        return [{"role": "user", "content": prompt}]
+
+    def _record_generation(self, started: float, tokens: int):
+        with self._stats_lock:
+            self._stats["generation_ms"] += (time.perf_counter() - started) * 1000
+            self._stats["completion_tokens"] += tokens
+
+    def _complete(self, prompt: str) -> str:
+        started = time.perf_counter()
+        result = self._llm.create_chat_completion(messages=self._messages(prompt), max_tokens=MAX_TOKENS,
+                                                  temperature=TEMPERATURE)
+        self._record_generation(started, result.get("usage", {}).get("completion_tokens", 0))
+        return result["choices"][0]["message"].get("content", "")
+
+    def _stream(self, request: _Request):
+        started = time.perf_counter()
+        tokens = 0
+        try:
+            for chunk in self._llm.create_chat_completion(messages=self._messages(request.prompt),
+                                                          max_tokens=MAX_TOKENS, temperature=TEMPERATURE,
+                                                          stream=True):
+                if request.cancelled:
+                    # The client went away; stop generating and free the model for the next request
+                    break
+                text = chunk["choices"][0]["delta"].get("content")
+                if text:
+                    tokens += 1
+                    request.push(text)
+            request.push(_STREAM_DONE)
+        except Exception as e:
+            request.push(e)
+        finally:
+            self._record_generation(started, tokens)
+
+    def submit(self, request: _Request) -> _Request:
+        self.start()
+        self._requests.put(request)
+        return request
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        seconds = stats["generation_ms"] / 1000
+        stats.update({
+            "model_name": MODEL_NAME,
+            "model_path": MODEL_PATH,
+            "loaded": self._llm is not None,
+            "load_error": str(self._load_error) if self._load_error else None,
+            "queued": self._requests.qsize(),
+            "avg_batch": round(stats["requests"] / stats["batches"], 2) if stats["batches"] else None,
+            "tokens_per_second": round(stats["completion_tokens"] / seconds, 1) if seconds else None,
+            "generation_ms": round(stats["generation_ms"], 1)
+        })
+        return stats
+
+# One worker (and one loaded model) per process
+worker = LlamaWorker()
+
+# Marks the end of a stream in a request's chunk queue
+_STREAM_DONE = object()
+
+class LlamaResponse:
+    """Minimal GenerateContentResponse: only .text is used by gemini_client."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+class LlamaStream:
+    """Async iterator over chunks produced by the worker thread."""
+
+    def __init__(self, request: _Request):
+        self.request = request
+
+    async def __aiter__(self):
+        try:
+            while True:
+                item = await self.request.stream_queue.get()
+                if item is _STREAM_DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield LlamaResponse(item)
+        finally:
+            self.request.cancelled = True
+
+class LlamaGenerativeModel:
+    """Drop-in for genai.GenerativeModel backed by the process-wide worker."""
+
+    def __init__(self, model_name: str = MODEL_NAME):
+        self.model_name = model_name
+
+    def generate_content(self, prompt: str) -> LlamaResponse:
+        request = worker.submit(_Request(prompt))
+        return LlamaResponse(request.future.result())
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        loop = asyncio.get_running_loop()
+        if stream:
+            return LlamaStream(worker.submit(_Request(prompt, asyncio.Queue(), loop)))
+        request = worker.submit(_Request(prompt))
+        try:
+            return LlamaResponse(await asyncio.wrap_future(request.future, loop=loop))
+        except asyncio.CancelledError:
+            # Skip the prompt if the worker hasn't reached it yet
+            request.cancelled = True
+            raise
+
+def get_model(model_name: Optional[str] = None) -> LlamaGenerativeModel:
+    return LlamaGenerativeModel(model_name or MODEL_NAME)
+
+def warm_up() -> bool:
+    """Load the GGUF model before real traffic (blocking). Returns True once it is ready."""
+    return worker.wait_until_loaded()
+
+def get_stats() -> Dict[str, Any]:
+    """Return load time, batching and throughput counters for the local model."""
+    return worker.get_stats()
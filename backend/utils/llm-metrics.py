@@ -0,0 +1,186 @@
+"""
+In-process telemetry for LLM calls.
+Records latency histograms and percentiles, prompt and response sizes
+(characters and tokens), an error taxonomy and plan-parse outcomes, including
+how often callers fell back to the placeholder plan.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import json
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Dict, Optional
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Recent samples kept per operation for percentile estimates
+RESERVOIR_SIZE = 2048
+
+# Error classes reported by classify_error
+ERROR_CLASSES = ("timeout", "quota", "bad_json", "network", "circuit_open", "other")
+
+# Exception class names from the Google SDKs, matched by name so this module stays dependency-free
+_TIMEOUT_ERRORS = {"GeminiTimeoutError", "TimeoutError", "DeadlineExceeded", "ReadTimeout", "ConnectTimeout"}
+_QUOTA_ERRORS = {"ResourceExhausted", "TooManyRequests"}
+_NETWORK_ERRORS = {"ServiceUnavailable", "ConnectionError", "ConnectError", "RetryError", "InternalServerError",
+                   "BadGateway", "GatewayTimeout", "AioRpcError", "RpcError"}
+
+def classify_error(error: BaseException) -> str:
+    """Map an exception raised around a model call to an error class."""
+    names = {cls.__name__ for cls in type(error).__mro__}
+    if "CircuitOpenError" in names:
+        return "circuit_open"
+    if isinstance(error, asyncio.TimeoutError) or names & _TIMEOUT_ERRORS:
+        return "timeout"
+    if names & _QUOTA_ERRORS or "quota" in str(error).lower():
+        return "quota"
+    if isinstance(error, (json.JSONDecodeError, KeyError)):
+        return "bad_json"
+    if names & _NETWORK_ERRORS or isinstance(error, (ConnectionError, OSError)):
+        return "network"
+    return "other"
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token count (about four characters per token) when the API doesn't report one."""
+    return (len(text) + 3) // 4 if text else 0
+
+class Histogram:
+    """Bucketed latency histogram plus a reservoir of recent samples for percentiles."""
+
+    def __init__(self):
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, value: float):
+        index = len(LATENCY_BUCKETS_MS)
+        for position, bound in enumerate(LATENCY_BUCKETS_MS):
+            if value <= bound:
+                index = position
+                break
+        self.bucket_counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return round(ordered[min(int(fraction * len(ordered)), len(ordered) - 1)], 1)
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{bound}" for bound in LATENCY_BUCKETS_MS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 1) if self.count else None,
+            "max_ms": round(self.max, 1) if self.count else None,
+            "p50_ms": self.percentile(0.50),
+            "p90_ms": self.percentile(0.90),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": dict(zip(labels, self.bucket_counts))
+        }
+
+class _OperationMetrics:
+    """Counters for one kind of model call (plan parse, completion, stream, ...)."""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.calls = 0
+        self.errors = {error_class: 0 for error_class in ERROR_CLASSES}
+        self.prompt_chars = 0
+        self.response_chars = 0
+        self.prompt_tokens = 0
+        self.response_tokens = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        failed = sum(self.errors.values())
+        succeeded = self.calls - failed
+        return {
+            "calls": self.calls,
+            "errors": dict(self.errors),
+            "error_rate": round(failed / self.calls, 4) if self.calls else 0.0,
+            "latency": self.latency.snapshot(),
+            "prompt_chars": self.prompt_chars,
+            "response_chars": self.response_chars,
+            "prompt_tokens": self.prompt_tokens,
+            "response_tokens": self.response_tokens,
+            "avg_prompt_chars": round(self.prompt_chars / self.calls, 1) if self.calls else None,
+            "avg_response_chars": round(self.response_chars / succeeded, 1) if succeeded else None
+        }
+
+class MetricsRegistry:
+    """Thread-safe registry of LLM call and plan-parse metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._operations: Dict[str, _OperationMetrics] = {}
+        self._outcomes: Dict[str, Dict[str, int]] = {}
+        self._fallback_reasons: Dict[str, Dict[str, int]] = {}
+
+    def record_call(self, operation: str, latency_ms: float, prompt: str, response_text: Optional[str] = None,
+                    error: Optional[BaseException] = None, usage: Any = None):
+        """
+        Record one model call.
+
+        Token counts come from the response's usage metadata when the SDK
+        provides it, otherwise they are estimated from character counts.
+        """
+        prompt_tokens = getattr(usage, "prompt_token_count", None) or estimate_tokens(prompt)
+        response_tokens = getattr(usage, "candidates_token_count", None) or estimate_tokens(response_text)
+        with self._lock:
+            metrics = self._operations.setdefault(operation, _OperationMetrics())
+            metrics.calls += 1
+            metrics.latency.observe(latency_ms)
+            metrics.prompt_chars += len(prompt)
+            metrics.prompt_tokens += prompt_tokens
+            if error is not None:
+                metrics.errors[classify_error(error)] += 1
+            else:
+                metrics.response_chars += len(response_text or "")
+                metrics.response_tokens += response_tokens
+
+    def record_outcome(self, operation: str, outcome: str, error: Optional[BaseException] = None):
+        """
+        Record how a higher-level request was answered, e.g. a plan parse
+        served by "local", "cache", "gemini" or "fallback". Fallbacks also
+        count the error class that caused them.
+        """
+        with self._lock:
+            outcomes = self._outcomes.setdefault(operation, {})
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+            if outcome == "fallback":
+                reasons = self._fallback_reasons.setdefault(operation, {})
+                reason = classify_error(error) if error is not None else "other"
+                reasons[reason] = reasons.get(reason, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every metric as a JSON-serialisable dict."""
+        with self._lock:
+            calls = {name: metrics.snapshot() for name, metrics in self._operations.items()}
+            outcomes = {}
+            for name, counts in self._outcomes.items():
+                total = sum(counts.values())
+                outcomes[name] = {
+                    "counts": dict(counts),
+                    "total": total,
+                    "fallback_rate": round(counts.get("fallback", 0) / total, 4) if total else 0.0,
+                    "fallback_reasons": dict(self._fallback_reasons.get(name, {}))
+                }
+        return {"calls": calls, "outcomes": outcomes}
+
+    def reset(self):
+        """Clear all metrics."""
+        with self._lock:
+            self._operations.clear()
+            self._outcomes.clear()
+            self._fallback_reasons.clear()
+
+# Process-wide registry used by the Gemini client and plan parsers
+registry = MetricsRegistry()
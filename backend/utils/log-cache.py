@@ -0,0 +1,178 @@
+"""
+Process-wide cache of parsed project_log.md entries.
+The cache remembers how many bytes of the log it has parsed. When the file
+grows (a new size or mtime), only the appended bytes are read and parsed. It
+rebuilds from scratch only when the log is truncated, replaced, or rewritten
+under the bytes already parsed. Each caller turns raw (timestamp, message)
+pairs into its own entry type through a factory, and the converted entries are
+cached per factory too, so repeated reads cost a list copy.
+This module only uses the standard library so the Streamlit frontend can load
+it by path.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import os
+import re
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Log entry line, with ASCII or U+2011 hyphens in the timestamp
+ENTRY_PATTERN = re.compile(r'\- \*\*([\d‑\-\s:]+)\*\*: (.+)')
+
+# Bytes kept from the end of the parsed region to notice in-place rewrites
+FINGERPRINT_SIZE = 256
+
+RawEntry = Tuple[str, str]
+
+def parse_raw_entries(content: str) -> List[RawEntry]:
+    """Return (timestamp, message) pairs for every entry in log text."""
+    return [(match.group(1), match.group(2)) for match in ENTRY_PATTERN.finditer(content)]
+
+class ParsedLogCache:
+    """Parsed entries of one log file, kept current by parsing only what was appended."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature = None  # (inode, size, mtime) when last refreshed
+        self._consumed = 0  # bytes parsed, always ending on a newline
+        self._fingerprint = b""  # last bytes of the parsed region
+        self._entries: List[RawEntry] = []
+        # Entries on a trailing line without its newline yet; re-parsed until the line is finished
+        self._tail: List[RawEntry] = []
+        # Per factory: (number of committed entries converted so far, converted entries)
+        self._built: Dict[Callable, Tuple[int, List[Any]]] = {}
+        self._stats = {"hits": 0, "appends": 0, "rebuilds": 0, "bytes_parsed": 0}
+        # Bumped on every rebuild, so derived structures (e.g. the search index) know to start over
+        self.generation = 0
+
+    def _reset(self):
+        self._consumed = 0
+        self._fingerprint = b""
+        self._entries = []
+        self._tail = []
+        self._built = {}
+        self.generation += 1
+
+    def refresh(self):
+        """Bring the cache up to date with the file: no-op, parse the appended bytes, or rebuild."""
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._reset()
+            self._signature = None
+            return
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if signature == self._signature:
+            self._stats["hits"] += 1
+            return
+
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if not self._still_valid(f, size, stat.st_ino):
+                if self._signature is not None:
+                    logger.info(f"Project log {self.path} was truncated or rewritten; reparsing it")
+                self._reset()
+                self._stats["rebuilds"] += 1
+            else:
+                self._stats["appends"] += 1
+
+            f.seek(self._consumed)
+            data = f.read(size - self._consumed)
+
+        # Only whole lines are committed; a writer may still be finishing the last one
+        cut = data.rfind(b"\n") + 1
+        if cut:
+            new_entries = parse_raw_entries(data[:cut].decode("utf-8", errors="replace"))
+            self._entries.extend(new_entries)
+            self._consumed += cut
+            window = self._fingerprint + data[:cut]
+            self._fingerprint = window[-FINGERPRINT_SIZE:]
+        self._tail = parse_raw_entries(data[cut:].decode("utf-8", errors="replace"))
+        self._stats["bytes_parsed"] += len(data)
+        self._signature = signature
+
+    def _still_valid(self, f, size: int, inode: int) -> bool:
+        """Check that the bytes already parsed are still at the start of the file."""
+        if self._signature is None or self._signature[0] != inode or size < self._consumed:
+            return False
+        f.seek(self._consumed - len(self._fingerprint))
+        return f.read(len(self._fingerprint)) == self._fingerprint
+
+    def entries(self, factory: Optional[Callable[[str, str], Any]] = None) -> List[Any]:
+        """
+        Return every entry in file order.
+
+        Args:
+            factory: Turns (timestamp, message) into the caller's entry type, or
+                returns None to drop the entry. Conversions are cached per
+                factory, so pass a module-level function rather than a lambda.
+                Without a factory, the raw (timestamp, message) pairs are returned.
+
+        Returns a new list, but the entries in it are shared; don't mutate them.
+        """
+        with self._lock:
+            self._refresh()
+            if factory is None:
+                return self._entries + self._tail
+            # Committed entries only grow between rebuilds, so convert just the new ones
+            converted, built = self._built.get(factory, (0, []))
+            for raw in self._entries[converted:]:
+                entry = factory(*raw)
+                if entry is not None:
+                    built.append(entry)
+            self._built[factory] = (len(self._entries), built)
+            tail = [entry for entry in (factory(*raw) for raw in self._tail) if entry is not None]
+            return built + tail
+
+    def count(self) -> int:
+        """Number of entries in the file, without copying or converting them."""
+        with self._lock:
+            self._refresh()
+            return len(self._entries) + len(self._tail)
+
+    def read_since(self, generation: int, count: int) -> Tuple[int, List[RawEntry]]:
+        """
+        Return (generation, committed raw entries after the first count).
+
+        If the cache was rebuilt since generation, every committed entry is
+        returned with the new generation. Entries on an unfinished last line
+        are left out.
+        """
+        with self._lock:
+            self._refresh()
+            if generation != self.generation:
+                return self.generation, list(self._entries)
+            return generation, self._entries[count:]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "path": self.path,
+                "entries": len(self._entries) + len(self._tail),
+                "consumed_bytes": self._consumed
+            })
+        return stats
+
+# One cache per log file, shared by every caller in the process
+_caches: Dict[str, ParsedLogCache] = {}
+_caches_lock = threading.Lock()
+
+def get_cache(path: str) -> ParsedLogCache:
+    """Return the process-wide cache for a log file."""
+    key = os.path.abspath(path)
+    with _caches_lock:
+        if key not in _caches:
+            _caches[key] = ParsedLogCache(key)
+        return _caches[key]
@@ -0,0 +1,214 @@
+"""
+Day-to-byte-offset index over project_log.md for date-range queries.
+The sidecar file (project_log.md.idx) is written by log-writer.py on every
+append. Here it is validated, caught up with bytes appended by other programs,
+rebuilt when missing or stale, and used to read only the byte ranges of the
+days a query asks for, so query cost follows the size of the result rather
+than the size of the log.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import os
+import re
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+# Shared project log writer, which owns the index format (kebab-case log-writer.py)
+from utils import log_writer
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Start of an entry line, with ASCII or U+2011 hyphens in the date
+_ENTRY_DAY_RE = re.compile(rb"^- \*\*(\d{4})(?:-|\xe2\x80\x91)(\d{2})(?:-|\xe2\x80\x91)(\d{2})", re.MULTILINE)
+
+# Bytes read per step when scanning the log for a rebuild or catch-up
+SCAN_BLOCK_SIZE = 1 << 20
+
+Record = Tuple[str, int, int]
+
+def _line_day(line: bytes) -> Optional[str]:
+    match = _ENTRY_DAY_RE.match(line)
+    return "-".join(part.decode("ascii") for part in match.groups()) if match else None
+
+def _scan(f, start: int, end: int, last_day: Optional[str]) -> List[Tuple[str, int]]:
+    """
+    Split log bytes [start, end) into (day, end offset) spans.
+
+    Lines without a timestamp (headers, blank lines) join the run they follow,
+    or at the top of the file the first entry's run. A trailing partial line
+    is left out, as a writer may still be appending it.
+    """
+    spans: List[Tuple[str, int]] = []
+    day = last_day
+    boundary = start  # end of the last span emitted
+    line_start = start
+    position = start
+    remainder = b""
+    f.seek(start)
+    while position < end:
+        block = f.read(min(SCAN_BLOCK_SIZE, end - position))
+        if not block:
+            break
+        position += len(block)
+        lines = (remainder + block).split(b"\n")
+        remainder = lines.pop()
+        for line in lines:
+            line_day = _line_day(line)
+            if line_day is not None and line_day != day:
+                if day is not None and line_start > boundary:
+                    spans.append((day, line_start))
+                    boundary = line_start
+                day = line_day
+            line_start += len(line) + 1
+    if day is not None and line_start > boundary:
+        spans.append((day, line_start))
+    return spans
+
+def _read_records(path: str) -> Optional[List[Record]]:
+    """Load the sidecar index, or None if it is missing or malformed."""
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    header_size = len(log_writer.INDEX_HEADER)
+    if not data.startswith(log_writer.INDEX_HEADER) or (len(data) - header_size) % log_writer.INDEX_RECORD_SIZE:
+        return None
+    try:
+        return [log_writer.decode_index_record(data[offset:offset + log_writer.INDEX_RECORD_SIZE])
+                for offset in range(header_size, len(data), log_writer.INDEX_RECORD_SIZE)]
+    except ValueError:
+        return None
+
+def _is_consistent(records: List[Record], f, log_size: int) -> bool:
+    """Check that records tile the log and still describe its contents."""
+    expected_start = 0
+    for _, start, end in records:
+        if start != expected_start or end < start:
+            return False
+        expected_start = end
+    if not records:
+        return True
+    day, start, end = records[-1]
+    if end > log_size:
+        # The log was truncated or replaced
+        return False
+    # Runs end on line boundaries, and the last run still begins on its day
+    f.seek(end - 1)
+    if f.read(1) != b"\n":
+        return False
+    f.seek(start)
+    match = _ENTRY_DAY_RE.search(f.read(min(end - start, 4096)))
+    return match is None or "-".join(part.decode("ascii") for part in match.groups()) == day
+
+class LogIndex:
+    """Process-wide view of a project log's day index."""
+
+    def __init__(self, log_path: str = log_writer.PROJECT_LOG_PATH):
+        self.log_path = log_path
+        self.index_path = log_writer.index_path(log_path)
+        self._lock = threading.Lock()
+        self._records: List[Record] = []
+        self._signature = None  # (log size, log mtime, index size, index mtime) of the loaded state
+        self._stats = {"refreshes": 0, "catch_ups": 0, "rebuilds": 0, "queries": 0, "bytes_read": 0}
+
+    def _current_signature(self):
+        try:
+            log_stat = os.stat(self.log_path)
+        except FileNotFoundError:
+            return None
+        try:
+            index_stat = os.stat(self.index_path)
+            index_part = (index_stat.st_size, index_stat.st_mtime_ns)
+        except FileNotFoundError:
+            index_part = None
+        return (log_stat.st_size, log_stat.st_mtime_ns, index_part)
+
+    def refresh(self):
+        """Bring the index up to date with the log: no-op, catch-up or full rebuild."""
+        with self._lock:
+            signature = self._current_signature()
+            if signature is not None and signature == self._signature:
+                return
+            if signature is None:
+                self._records, self._signature = [], None
+                return
+            self._stats["refreshes"] += 1
+
+            # Reopened if rotation replaces the log while we wait for its lock
+            with log_writer.open_locked(self.log_path, "rb") as f:
+                try:
+                    f.seek(0, os.SEEK_END)
+                    log_size = f.tell()
+                    records = _read_records(self.index_path)
+                    if records is None or not _is_consistent(records, f, log_size):
+                        self._rebuild(f, log_size)
+                    elif (records[-1][2] if records else 0) < log_size:
+                        covered = records[-1][2] if records else 0
+                        spans = _scan(f, covered, log_size, records[-1][0] if records else None)
+                        if spans and not log_writer.extend_index(self.index_path, covered, spans):
+                            self._rebuild(f, log_size)
+                        else:
+                            self._stats["catch_ups"] += 1
+                finally:
+                    log_writer.unlock_file(f)
+
+            self._records = _read_records(self.index_path) or []
+            self._signature = self._current_signature()
+
+    def _rebuild(self, f, log_size: int):
+        """Rewrite the index from a full scan of the log (caller holds the log lock)."""
+        spans = _scan(f, 0, log_size, None)
+        temp_path = self.index_path + ".tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        log_writer.extend_index(temp_path, 0, spans)
+        if not os.path.exists(temp_path):
+            with open(temp_path, "wb") as index_file:
+                index_file.write(log_writer.INDEX_HEADER)
+        os.replace(temp_path, self.index_path)
+        self._stats["rebuilds"] += 1
+        logger.info(f"Rebuilt project log index ({len(spans)} day runs over {log_size} bytes)")
+
+    def byte_ranges(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Tuple[int, int]]:
+        """Merged byte ranges of the log holding entries dated within [date_from, date_to] (YYYY-MM-DD)."""
+        self.refresh()
+        ranges: List[Tuple[int, int]] = []
+        for day, start, end in self._records:
+            if (date_from and day < date_from) or (date_to and day > date_to):
+                continue
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
+
+    def read_range(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> str:
+        """Return the log text for entries dated within [date_from, date_to], reading only those bytes."""
+        parts = []
+        with open(self.log_path, "rb") as f:
+            for start, end in self.byte_ranges(date_from, date_to):
+                f.seek(start)
+                parts.append(f.read(end - start))
+        data = b"".join(parts)
+        with self._lock:
+            self._stats["queries"] += 1
+            self._stats["bytes_read"] += len(data)
+        return data.decode("utf-8", errors="replace")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "log_path": self.log_path,
+                "day_runs": len(self._records),
+                "days": len({record[0] for record in self._records}),
+                "covered_bytes": self._records[-1][2] if self._records else 0
+            })
+        return stats
+
+# Index over the shared project log
+default_index = LogIndex()
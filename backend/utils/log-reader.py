@@ -0,0 +1,48 @@
+"""
+Readers over project_log.md that touch only the bytes a request needs.
+read_lines_backwards walks the log from a byte offset towards its start in
+fixed-size blocks, so returning the newest entries costs the same however
+long the log has grown.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import os
+from typing import Iterator, Optional, Tuple
+
+# Bytes read per step when walking the log backwards
+BLOCK_SIZE = 64 * 1024
+
+def read_lines_backwards(path: str, before: Optional[int] = None,
+                         block_size: int = BLOCK_SIZE) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (start offset, line) pairs from newest to oldest.
+
+    Args:
+        path: Log file to read
+        before: Only lines starting before this byte offset are returned
+            (defaults to the end of the file). Offsets yielded here can be
+            passed back as before to continue where a page left off.
+        block_size: Bytes read per step
+
+    Lines are returned without their newline; blank lines are skipped.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell() if before is None else min(before, f.tell())
+        # Bytes of the line that straddles the current block boundary
+        carry = b""
+        while position > 0:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + carry).split(b"\n")
+            # The first piece may continue in the previous block, unless this is the top of the file
+            carry = lines.pop(0) if position > 0 else b""
+            offset = position + (len(carry) + 1 if position > 0 else 0)
+            starts = []
+            for line in lines:
+                starts.append((offset, line))
+                offset += len(line) + 1
+            for start, line in reversed(starts):
+                if line.strip():
+                    yield start, line
@@ -0,0 +1,183 @@
+"""
+Inverted keyword index over project log messages.
+Each message is split into lowercase word tokens, and every token maps to the
+ascending IDs (positions in the parsed-log cache) of the entries that contain
+it. The index follows the parsed-log cache (log-cache.py): new entries are
+indexed as they are appended, and the whole index is rebuilt only when the
+cache is. A query then touches only the posting lists of its terms, so its
+cost follows the number of matches rather than the length of the log.
+
+Query syntax: words are ANDed, an uppercase OR separates alternatives, and a
+trailing * makes a word a prefix match ("deploy* OR release blocker").
+This module only uses the standard library so the Streamlit frontend can load
+it by path.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import re
+import math
+import bisect
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Word characters make up a token; "/plan" and "check-in" index as "plan" and "check", "in"
+TOKEN_RE = re.compile(r"\w+")
+
+# Query operator separating alternatives
+OR_OPERATOR = "OR"
+
+RawEntry = Tuple[str, str]
+# (entry ID, score, timestamp, message)
+Hit = Tuple[int, float, str, str]
+# Query term: (token, is prefix)
+Term = Tuple[str, bool]
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of a message or query word."""
+    return TOKEN_RE.findall(text.lower())
+
+def parse_query(query: str, prefix: bool = False, mode: str = "all") -> List[List[Term]]:
+    """
+    Turn a query string into alternatives, each a list of terms that must all match.
+
+    Args:
+        query: Words, optionally separated by OR and suffixed with *
+        prefix: Treat every word as a prefix match
+        mode: "all" to AND words between OR operators, "any" to OR every word
+    """
+    clauses: List[List[Term]] = [[]]
+    for word in query.split():
+        if word == OR_OPERATOR:
+            clauses.append([])
+            continue
+        is_prefix = prefix or word.endswith("*")
+        tokens = tokenize(word)
+        if not tokens:
+            continue
+        # Words like "check-in" split into several tokens; only the last can be a prefix
+        terms = [(token, False) for token in tokens[:-1]] + [(tokens[-1], is_prefix)]
+        if mode == "any":
+            clauses.append(terms)
+        else:
+            clauses[-1].extend(terms)
+    return [clause for clause in clauses if clause]
+
+class LogSearchIndex:
+    """Token to entry ID postings over one parsed-log cache."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._generation: Optional[int] = None
+        self._entries: List[RawEntry] = []
+        self._postings: Dict[str, List[int]] = {}
+        # Sorted vocabulary for prefix lookups, rebuilt lazily after new tokens arrive
+        self._vocabulary: Optional[List[str]] = None
+        self._stats = {"queries": 0, "rebuilds": 0, "indexed": 0}
+
+    def _sync(self):
+        """Index entries appended since the last query (caller holds the lock)."""
+        generation, new_entries = self.cache.read_since(self._generation, len(self._entries))
+        if generation != self._generation:
+            self._generation = generation
+            self._entries = []
+            self._postings = {}
+            self._vocabulary = None
+            self._stats["rebuilds"] += 1
+        for entry in new_entries:
+            entry_id = len(self._entries)
+            self._entries.append(entry)
+            for token in set(tokenize(entry[1])):
+                postings = self._postings.get(token)
+                if postings is None:
+                    self._postings[token] = [entry_id]
+                    self._vocabulary = None
+                else:
+                    postings.append(entry_id)
+        self._stats["indexed"] += len(new_entries)
+
+    def _term_ids(self, term: Term) -> Set[int]:
+        token, is_prefix = term
+        if not is_prefix:
+            return set(self._postings.get(token, ()))
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        ids: Set[int] = set()
+        position = bisect.bisect_left(self._vocabulary, token)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(token):
+            ids.update(self._postings[self._vocabulary[position]])
+            position += 1
+        return ids
+
+    def _match(self, clauses: List[List[Term]]) -> Dict[int, float]:
+        """Score every entry matching any clause (caller holds the lock)."""
+        term_ids = {term: self._term_ids(term) for clause in clauses for term in clause}
+        total = max(len(self._entries), 1)
+        # Rarer terms count for more
+        weights = {term: math.log(1 + total / len(ids)) for term, ids in term_ids.items() if ids}
+
+        scores: Dict[int, float] = {}
+        for clause in clauses:
+            # Intersect starting from the rarest term so the working set stays small
+            ordered = sorted(clause, key=lambda term: len(term_ids[term]))
+            matched = set(term_ids[ordered[0]])
+            for term in ordered[1:]:
+                if not matched:
+                    break
+                matched &= term_ids[term]
+            for entry_id in matched:
+                if entry_id not in scores:
+                    scores[entry_id] = sum(weight for term, weight in weights.items() if entry_id in term_ids[term])
+        return scores
+
+    def search(self, query: str, prefix: bool = False, mode: str = "all",
+               offset: int = 0, limit: int = 20) -> Tuple[int, List[Hit]]:
+        """
+        Return (total matches, one page of hits) ranked by score, newest first on ties.
+        """
+        clauses = parse_query(query, prefix, mode)
+        with self._lock:
+            self._sync()
+            self._stats["queries"] += 1
+            scores = self._match(clauses) if clauses else {}
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+            page = [(entry_id, round(score, 4)) + self._entries[entry_id]
+                     for entry_id, score in ranked[offset:offset + limit]]
+        return len(ranked), page
+
+    def filter(self, query: str, prefix: bool = False, mode: str = "all") -> List[RawEntry]:
+        """Return the raw (timestamp, message) entries matching a query, in log order."""
+        clauses = parse_query(query, prefix, mode)
+        with self._lock:
+            self._sync()
+            self._stats["queries"] += 1
+            matched = sorted(self._match(clauses)) if clauses else []
+            return [self._entries[entry_id] for entry_id in matched]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "entries": len(self._entries),
+                "tokens": len(self._postings),
+                "postings": sum(len(ids) for ids in self._postings.values())
+            })
+        return stats
+
+# One index per parsed-log cache, shared by every caller in the process
+_indexes: Dict[str, LogSearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_index(cache) -> LogSearchIndex:
+    """Return the process-wide search index over a ParsedLogCache."""
+    with _indexes_lock:
+        index = _indexes.get(cache.path)
+        if index is None or index.cache is not cache:
+            index = _indexes[cache.path] = LogSearchIndex(cache)
+        return index
+
+def drop_index(cache):
+    """Forget the index over a cache that is no longer kept (e.g. an evicted log segment)."""
+    with _indexes_lock:
+        if _indexes.get(cache.path) is not None and _indexes[cache.path].cache is cache:
+            del _indexes[cache.path]
@@ -0,0 +1,185 @@
+"""
+Reader over the whole project log history: the compressed monthly segments
+rotated out by log-writer.py (logs/YYYY-MM.md.gz) plus the active head file.
+A query names a date window and only the segments for months overlapping it
+are opened. Parsed segments are kept in a small LRU cache and re-read only
+when rotation rewrites them, so repeated reads of a month cost no I/O.
+Each source (segment or head) offers the ParsedLogCache interface, so entry
+factories and the keyword index (log-search.py) work on either.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import os
+import gzip
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Shared project log writer (segment layout), parsed-entry cache and keyword index
+# (kebab-case log-writer.py, log-cache.py, log-search.py)
+try:
+    from utils import log_writer
+    from utils import log_cache
+    from utils import log_search
+except ImportError:
+    # Loaded by path from the Streamlit frontend, which loads these first (see log_service.py)
+    import log_writer
+    import log_cache
+    import log_search
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Parsed segments kept in memory
+SEGMENT_CACHE_SIZE = int(os.getenv("PROJECT_LOG_SEGMENT_CACHE", "12"))
+
+class SegmentLogCache(log_cache.ParsedLogCache):
+    """Parsed entries of one compressed segment, re-read whole whenever the file changes."""
+
+    def __init__(self, path: str, month: str):
+        super().__init__(path)
+        self.month = month
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._signature is not None:
+                self._reset()
+            self._signature = None
+            return
+        signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if signature == self._signature:
+            self._stats["hits"] += 1
+            return
+        # Segments are only ever replaced whole by rotation
+        with gzip.open(self.path, "rb") as f:
+            data = f.read()
+        self._reset()
+        self._entries = log_cache.parse_raw_entries(data.decode("utf-8", errors="replace"))
+        self._consumed = len(data)
+        self._stats["rebuilds"] += 1
+        self._stats["bytes_parsed"] += len(data)
+        self._signature = signature
+
+class LogHistory:
+    """Monthly segments and the head of one project log, read by date window."""
+
+    def __init__(self, log_path: str = log_writer.PROJECT_LOG_PATH):
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        self._segments: "OrderedDict[str, SegmentLogCache]" = OrderedDict()
+        # Per month: (segment file signature, entry count), kept after the segment is evicted
+        self._segment_counts: Dict[str, Tuple[Tuple[int, int, int], int]] = {}
+        self._stats = {"segment_opens": 0, "segment_evictions": 0}
+
+    def months(self) -> List[str]:
+        """Months (YYYY-MM) with a segment on disk, oldest first."""
+        try:
+            names = os.listdir(log_writer.segment_dir(self.log_path))
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(log_writer.SEGMENT_SUFFIX)] for name in names
+                      if name.endswith(log_writer.SEGMENT_SUFFIX))
+
+    def head(self) -> log_cache.ParsedLogCache:
+        """Cache over the active log file."""
+        return log_cache.get_cache(self.log_path)
+
+    def segment(self, month: str) -> SegmentLogCache:
+        """Cache over one month's segment, opened on first use and evicted least recently used."""
+        with self._lock:
+            cache = self._segments.get(month)
+            if cache is not None:
+                self._segments.move_to_end(month)
+                return cache
+            cache = SegmentLogCache(log_writer.segment_path(self.log_path, month), month)
+            self._segments[month] = cache
+            self._stats["segment_opens"] += 1
+            while len(self._segments) > SEGMENT_CACHE_SIZE:
+                _, evicted = self._segments.popitem(last=False)
+                log_search.drop_index(evicted)
+                self._stats["segment_evictions"] += 1
+            return cache
+
+    def segments(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[SegmentLogCache]:
+        """Segments for months overlapping [date_from, date_to] (YYYY-MM-DD), oldest first; others aren't opened."""
+        month_from = date_from[:7] if date_from else None
+        month_to = date_to[:7] if date_to else None
+        return [
+            self.segment(month) for month in self.months()
+            if (not month_from or month >= month_from) and (not month_to or month <= month_to)
+        ]
+
+    def sources(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[log_cache.ParsedLogCache]:
+        """
+        Caches holding entries that may fall within [date_from, date_to], oldest first.
+        The head is always included: it holds the current month, and earlier
+        ones until it is next rotated.
+        """
+        return self.segments(date_from, date_to) + [self.head()]
+
+    def entries(self, factory: Callable[[str, str], Any], date_from: Optional[str] = None,
+                date_to: Optional[str] = None) -> List[Any]:
+        """Entries from every source overlapping the window, in log order (not filtered by day)."""
+        entries: List[Any] = []
+        for source in self.sources(date_from, date_to):
+            entries.extend(source.entries(factory))
+        return entries
+
+    def filter(self, query: str, prefix: bool = False, date_from: Optional[str] = None,
+               date_to: Optional[str] = None) -> List[Tuple[str, str]]:
+        """Raw (timestamp, message) entries matching a keyword query, in log order."""
+        matches: List[Tuple[str, str]] = []
+        for source in self.sources(date_from, date_to):
+            matches.extend(log_search.get_index(source).filter(query, prefix))
+        return matches
+
+    def count(self) -> int:
+        """
+        Number of entries across the whole history. A segment is parsed only the
+        first time it is counted, and again only when rotation rewrites it.
+        """
+        total = self.head().count()
+        for month in self.months():
+            try:
+                stat = os.stat(log_writer.segment_path(self.log_path, month))
+            except FileNotFoundError:
+                continue
+            signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            with self._lock:
+                known = self._segment_counts.get(month)
+            if known is None or known[0] != signature:
+                known = (signature, self.segment(month).count())
+                with self._lock:
+                    self._segment_counts[month] = known
+            total += known[1]
+        return total
+
+    def search(self, query: str, prefix: bool = False, mode: str = "all",
+               offset: int = 0, limit: int = 20) -> Tuple[int, List[Tuple[float, str, str]]]:
+        """
+        Rank keyword matches across the whole history.
+        Returns (total matches, page of (score, timestamp, message)), newest first on ties.
+        """
+        total = 0
+        ranked = []
+        for rank, source in enumerate(self.sources()):
+            source_total, hits = log_search.get_index(source).search(query, prefix, mode, 0, offset + limit)
+            total += source_total
+            ranked.extend((score, rank, entry_id, timestamp_str, message)
+                          for entry_id, score, timestamp_str, message in hits)
+        ranked.sort(key=lambda hit: (-hit[0], -hit[1], -hit[2]))
+        return total, [(score, timestamp_str, message) for score, _, _, timestamp_str, message in ranked[offset:offset + limit]]
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["open_segments"] = list(self._segments)
+        stats.update({"log_path": self.log_path, "segments": self.months()})
+        return stats
+
+# History of the shared project log
+default_history = LogHistory()
@@ -0,0 +1,422 @@
+"""
+Shared append-only writer for project_log.md.
+Every backend and Streamlit module records log entries through here. Entries
+are written with a true append under an advisory file lock, so the cost of an
+entry no longer grows with the log and concurrent writers (threads or
+processes) don't lose each other's lines. Optional group commit batches entries
+from a background thread and fsyncs once per batch.
+All entries use the windsurf timestamp format: "- **YYYY‑MM‑DD HH:MM**: message"
+with U+2011 non-breaking hyphens.
+The writer also keeps a sidecar day index (project_log.md.idx) up to date, so
+readers can seek to a date range instead of scanning the whole log (see log-index.py).
+With PROJECT_LOG_ROTATE=true, entries from earlier months are rotated out of the
+log into gzip-compressed monthly segments (logs/YYYY-MM.md.gz) on the first write
+of each month, so the active file stays small while the full history is kept
+(see log-segments.py for reading them). It is off by default because any
+write, even one made while the app is imported, rewrites the log.
+This module only uses the standard library so the Streamlit frontend can load
+it by path.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import os
+import re
+import gzip
+import stat
+import time
+import tempfile
+import atexit
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Project log in the repository root (overridable so load tests don't touch the real one)
+PROJECT_LOG_PATH = os.getenv(
+    "PROJECT_LOG_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "project_log.md")
+)
+
+# Windsurf timestamp format, with U+2011 non-breaking hyphens
+TIMESTAMP_FORMAT = "%Y‑%m‑%d %H:%M"
+
+LOG_HEADER = "# Project Log\n\n"
+
+# Sidecar day index: a header, then fixed-width records "YYYY-MM-DD <start> <end>\n",
+# one per run of bytes whose entries share a day. Records tile the log from offset 0,
+# so the last record's end is how far the index covers, and a run that continues
+# the current day is extended in place rather than adding a record.
+INDEX_SUFFIX = ".idx"
+INDEX_HEADER = b"# project-log-index v1\n"
+INDEX_RECORD_SIZE = 37
+_OFFSET_WIDTH = 12
+
+# Monthly rotation into compressed segments
+ROTATE = os.getenv("PROJECT_LOG_ROTATE", "false").lower() in ("1", "true", "yes")
+SEGMENT_DIR = os.getenv("PROJECT_LOG_SEGMENT_DIR", "")
+SEGMENT_SUFFIX = ".md.gz"
+
+# Start of an entry line, with ASCII or U+2011 hyphens in the date
+_ENTRY_MONTH_RE = re.compile(rb"^- \*\*(\d{4})(?:-|\xe2\x80\x91)(\d{2})(?:-|\xe2\x80\x91)\d{2}")
+
+# Group commit settings
+GROUP_COMMIT = os.getenv("PROJECT_LOG_GROUP_COMMIT", "false").lower() in ("1", "true", "yes")
+FLUSH_INTERVAL_SECONDS = float(os.getenv("PROJECT_LOG_FLUSH_MS", "50")) / 1000
+FSYNC = os.getenv("PROJECT_LOG_FSYNC", "false").lower() in ("1", "true", "yes")
+
+def format_timestamp(when: Optional[datetime] = None) -> str:
+    """Format a log timestamp the windsurf way."""
+    return (when or datetime.now()).strftime(TIMESTAMP_FORMAT)
+
+def format_entry(message: str, when: Optional[datetime] = None) -> str:
+    """Format one log line, newline included."""
+    # Entries are single lines; embedded newlines would split them when the log is parsed
+    message = " ".join(message.strip().splitlines())
+    return f"- **{format_timestamp(when)}**: {message}\n"
+
+def entry_day(line: str) -> str:
+    """ISO day (YYYY-MM-DD) of a line produced by format_entry."""
+    return line[4:14].replace("‑", "-")
+
+def index_path(log_path: str) -> str:
+    return log_path + INDEX_SUFFIX
+
+def encode_index_record(day: str, start: int, end: int) -> bytes:
+    return f"{day} {start:0{_OFFSET_WIDTH}d} {end:0{_OFFSET_WIDTH}d}\n".encode("ascii")
+
+def decode_index_record(raw: bytes) -> Tuple[str, int, int]:
+    day, start, end = raw.decode("ascii").split()
+    return day, int(start), int(end)
+
+def extend_index(path: str, covered_from: int, spans: List[Tuple[str, int]]) -> bool:
+    """
+    Record that the log continues from covered_from with spans of (day, end offset).
+
+    The caller must hold the log's lock. Returns False, leaving the index for a
+    reader to repair, when the index is missing or doesn't end at covered_from
+    (e.g. another program appended to the log without updating it).
+    """
+    if not os.path.exists(path):
+        if covered_from != 0:
+            return False
+        with open(path, "wb") as f:
+            f.write(INDEX_HEADER)
+    with open(path, "r+b") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        records_size = size - len(INDEX_HEADER)
+        if records_size < 0 or records_size % INDEX_RECORD_SIZE:
+            return False
+        last = None
+        if records_size:
+            f.seek(size - INDEX_RECORD_SIZE)
+            last = decode_index_record(f.read(INDEX_RECORD_SIZE))
+        if (last[2] if last else 0) != covered_from:
+            return False
+
+        for day, end in spans:
+            if last is not None and last[0] == day:
+                # Same day as the last run: move its end offset forward
+                f.seek(size - _OFFSET_WIDTH - 1)
+                f.write(f"{end:0{_OFFSET_WIDTH}d}".encode("ascii"))
+                last = (day, last[1], end)
+            else:
+                start = last[2] if last else 0
+                f.seek(size)
+                f.write(encode_index_record(day, start, end))
+                size += INDEX_RECORD_SIZE
+                last = (day, start, end)
+    return True
+
+def segment_dir(log_path: str) -> str:
+    """Directory holding a log's monthly segments (PROJECT_LOG_SEGMENT_DIR, or logs/ beside the log)."""
+    return SEGMENT_DIR or os.path.join(os.path.dirname(os.path.abspath(log_path)), "logs")
+
+def segment_path(log_path: str, month: str) -> str:
+    """Compressed segment holding a log's entries for month (YYYY-MM)."""
+    return os.path.join(segment_dir(log_path), month + SEGMENT_SUFFIX)
+
+def _split_months(data: bytes) -> Tuple[List[bytes], List[Tuple[str, List[bytes]]]]:
+    """
+    Split log bytes into (lines before the first entry, [(month, lines)] runs in order).
+
+    Lines without a timestamp stay with the entry they follow.
+    """
+    header: List[bytes] = []
+    runs: List[Tuple[str, List[bytes]]] = []
+    parts = data.split(b"\n")
+    last = parts.pop()
+    lines = [part + b"\n" for part in parts] + ([last] if last else [])
+    for line in lines:
+        match = _ENTRY_MONTH_RE.match(line)
+        month = f"{match.group(1).decode('ascii')}-{match.group(2).decode('ascii')}" if match else None
+        if month is not None and (not runs or runs[-1][0] != month):
+            runs.append((month, []))
+        if runs:
+            runs[-1][1].append(line)
+        else:
+            header.append(line)
+    return header, runs
+
+def _append_segment(path: str, lines: List[bytes]):
+    """Add lines to the end of a compressed segment, replacing it atomically."""
+    existing = b""
+    if os.path.exists(path):
+        with gzip.open(path, "rb") as f:
+            existing = f.read()
+    if existing and not existing.endswith(b"\n"):
+        existing += b"\n"
+    temp_path = path + ".tmp"
+    with gzip.open(temp_path, "wb") as f:
+        f.write(existing + b"".join(lines))
+    os.replace(temp_path, path)
+
+def rotate_locked(f, log_path: str, current_month: str):
+    """
+    Move entries dated before current_month (YYYY-MM) from the log into monthly segments.
+
+    The caller must hold the log's lock on f, which is open for reading and
+    appending. The remaining entries go to a temp file, locked before it is
+    renamed over the log, so the log is never left truncated; writers waiting
+    on the old file reopen the new one (see open_locked). The day index is
+    dropped for readers to rebuild. Segments are written before the log is
+    replaced, so a crash can at worst leave entries in both. Returns (entries
+    moved, the locked file to continue with: f, or the new log with f closed).
+    """
+    f.seek(0)
+    header, runs = _split_months(f.read())
+    old: Dict[str, List[bytes]] = {}
+    kept: List[bytes] = []
+    for month, lines in runs:
+        if month < current_month:
+            old.setdefault(month, []).extend(lines)
+        else:
+            kept.extend(lines)
+    if not old:
+        return 0, f
+
+    os.makedirs(segment_dir(log_path), exist_ok=True)
+    for month, lines in sorted(old.items()):
+        if not lines[-1].endswith(b"\n"):
+            lines[-1] += b"\n"
+        _append_segment(segment_path(log_path, month), lines)
+
+    fd, temp_path = tempfile.mkstemp(prefix=".project-log-", suffix=".tmp", dir=os.path.dirname(log_path) or ".")
+    new_f = os.fdopen(fd, "a+b")
+    try:
+        os.chmod(temp_path, stat.S_IMODE(os.fstat(f.fileno()).st_mode))
+        lock_file(new_f)
+        new_f.write(b"".join(header) + b"".join(kept))
+        new_f.flush()
+        os.fsync(new_f.fileno())
+        os.replace(temp_path, log_path)
+    except BaseException:
+        new_f.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    unlock_file(f)
+    f.close()
+    try:
+        if os.path.exists(index_path(log_path)):
+            os.remove(index_path(log_path))
+    except OSError as e:
+        # Readers also rebuild an index that doesn't match the log
+        logger.warning(f"Could not remove project log index: {e}")
+    moved = sum(1 for lines in old.values() for line in lines if _ENTRY_MONTH_RE.match(line))
+    logger.info(f"Rotated {moved} project log entries into {len(old)} monthly segment(s): {', '.join(sorted(old))}")
+    return moved, new_f
+
+def lock_file(f):
+    """Take the exclusive advisory lock that serialises writers of a log file."""
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+def unlock_file(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def open_locked(path: str, mode: str = "a+b"):
+    """
+    Open a log file and take its lock. If rotation replaced the file while we
+    waited, the lock is on a file that is no longer the log, so open it again.
+    """
+    while True:
+        f = open(path, mode)
+        lock_file(f)
+        try:
+            if os.fstat(f.fileno()).st_ino == os.stat(path).st_ino:
+                return f
+        except FileNotFoundError:
+            pass
+        unlock_file(f)
+        f.close()
+
+class ProjectLogWriter:
+    """Appends entries to a project log file, optionally group-committing them."""
+
+    def __init__(self, path: str = PROJECT_LOG_PATH, group_commit: bool = GROUP_COMMIT,
+                 flush_interval: float = FLUSH_INTERVAL_SECONDS, fsync: bool = FSYNC, rotate: bool = ROTATE):
+        self.path = path
+        self.group_commit = group_commit
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.rotate = rotate
+        # Month (YYYY-MM) for which earlier entries have been rotated out; checked once per month
+        self._rotated_month: Optional[str] = None
+        self._pending: List[str] = []
+        self._pending_lock = threading.Lock()
+        # Held while a batch is written so batches reach the file in order
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {"entries": 0, "commits": 0, "bytes": 0, "rotated": 0}
+
+    def _write(self, lines: List[str]) -> int:
+        """Append lines and update the day index under the file lock. Returns the log size before the write."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        f = open_locked(self.path)
+        try:
+            f = self._rotate(f)
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            prefix = b""
+            if end == 0:
+                prefix = LOG_HEADER.encode("utf-8")
+            else:
+                # Older writers left the last entry without a newline; don't glue onto it
+                f.seek(end - 1)
+                if f.read(1) != b"\n":
+                    prefix = b"\n"
+            data = prefix + "".join(lines).encode("utf-8")
+            f.seek(0, os.SEEK_END)
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            self._index(end, len(prefix), lines)
+        finally:
+            unlock_file(f)
+            f.close()
+        with self._stats_lock:
+            self._stats["entries"] += len(lines)
+            self._stats["commits"] += 1
+            self._stats["bytes"] += len(data)
+        return end
+
+    def _rotate(self, f):
+        """
+        Rotate earlier months out of the log the first time it is written in a new month (caller holds the lock).
+        Returns the locked log file to write to, which is a new one if the log was replaced.
+        """
+        month = datetime.now().strftime("%Y-%m")
+        if not self.rotate or month == self._rotated_month:
+            return f
+        try:
+            moved, f = rotate_locked(f, self.path, month)
+            with self._stats_lock:
+                self._stats["rotated"] += moved
+        except Exception as e:
+            # Rotation only bounds the log's size; never lose the entry being written over it
+            logger.warning(f"Could not rotate project log: {e}")
+        self._rotated_month = month
+        return f
+
+    def _index(self, end: int, prefix_size: int, lines: List[str]):
+        """Add the lines just written at offset end (after prefix_size header/newline bytes) to the day index."""
+        spans = []
+        position = end + prefix_size
+        for line in lines:
+            position += len(line.encode("utf-8"))
+            spans.append((entry_day(line), position))
+        try:
+            if end == 0 and os.path.exists(index_path(self.path)):
+                # A new log file; drop the index of the one it replaced
+                os.remove(index_path(self.path))
+            extend_index(index_path(self.path), end, spans)
+        except Exception as e:
+            # The index is an accelerator; readers rebuild it when it falls behind
+            logger.warning(f"Could not update project log index: {e}")
+
+    def append(self, message: str, when: Optional[datetime] = None) -> bool:
+        """
+        Append a timestamped entry to the log.
+
+        Returns True once the entry is written, or queued when group commit is on.
+        Failures are logged rather than raised, as a log write should never
+        break the request that triggered it.
+        """
+        line = format_entry(message, when)
+        if self.group_commit:
+            with self._pending_lock:
+                self._pending.append(line)
+                self._start_flusher()
+            self._wakeup.set()
+            return True
+        try:
+            self._write([line])
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update project log: {e}")
+            return False
+
+    def _start_flusher(self):
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name="project-log-writer", daemon=True)
+            self._flusher.start()
+            atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while True:
+            self._wakeup.wait()
+            # Let concurrent entries gather so they share one write and fsync
+            self._wakeup.clear()
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Write any queued entries now."""
+        with self._flush_lock:
+            with self._pending_lock:
+                lines, self._pending = self._pending, []
+            if not lines:
+                return
+            try:
+                self._write(lines)
+            except Exception as e:
+                logger.error(f"Failed to update project log ({len(lines)} entries lost): {e}")
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._pending_lock:
+            stats["pending"] = len(self._pending)
+        stats.update({"path": self.path, "group_commit": self.group_commit, "fsync": self.fsync,
+                      "rotate": self.rotate, "segment_dir": segment_dir(self.path)})
+        return stats
+
+# Process-wide writer for the project log
+default_writer = ProjectLogWriter()
+
+def append_entry(message: str, when: Optional[datetime] = None) -> bool:
+    """Append a timestamped entry to the project log."""
+    return default_writer.append(message, when)
@@ -0,0 +1,183 @@
+"""
+Response cache for Gemini plan parsing.
+Keys are content-addressed: a hash of the normalized plan text, the model name
+and the prompt version. Entries live in an in-memory LRU tier backed by an
+on-disk tier under data/cache/plans, both with TTL and size-based eviction.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import os
+import re
+import copy
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Cache settings
+CACHE_DIR = os.getenv(
+    "PLAN_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "cache", "plans")
+)
+MAX_MEMORY_ENTRIES = int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "256"))
+MAX_DISK_ENTRIES = int(os.getenv("PLAN_CACHE_MAX_DISK_ENTRIES", "4096"))
+TTL_SECONDS = float(os.getenv("PLAN_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+def normalize_plan_text(plan_text: str) -> str:
+    """Collapse whitespace so cosmetically different plan texts share a key."""
+    text = re.sub(r"\s+", " ", plan_text.strip())
+    return re.sub(r"\s*([;,:])\s*", r"\1 ", text).strip()
+
+def make_key(plan_text: str, model_name: str, prompt_version: str) -> str:
+    """Build the content-addressed cache key for a plan parse."""
+    material = "\n".join([model_name, prompt_version, normalize_plan_text(plan_text)])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+class PlanCache:
+    """Two-tier (memory LRU + disk) cache of parsed plans."""
+
+    def __init__(self, cache_dir: str = CACHE_DIR, max_entries: int = MAX_MEMORY_ENTRIES,
+                 max_disk_entries: int = MAX_DISK_ENTRIES, ttl_seconds: float = TTL_SECONDS):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()  # key -> (stored_at, value)
+        self._disk_count = None  # counted lazily on first write
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "expired": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0
+        }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _is_fresh(self, stored_at: float) -> bool:
+        return self.ttl_seconds <= 0 or time.time() - stored_at < self.ttl_seconds
+
+    def _remember(self, key: str, stored_at: float, value: Dict[str, Any]):
+        """Insert into the memory tier, evicting least recently used entries."""
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats["memory_evictions"] += 1
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached plan for a key, or None on a miss."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self._is_fresh(stored_at):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return copy.deepcopy(value)
+                del self._memory[key]
+                self._stats["expired"] += 1
+
+            path = self._path(key)
+            try:
+                with open(path, "r") as f:
+                    record = json.load(f)
+            except FileNotFoundError:
+                self._stats["misses"] += 1
+                return None
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable plan cache entry {key}: {e}")
+                self._stats["misses"] += 1
+                return None
+
+            if not self._is_fresh(record.get("stored_at", 0)):
+                self._remove_file(path)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+
+            self._remember(key, record["stored_at"], record["value"])
+            self._stats["disk_hits"] += 1
+            return copy.deepcopy(record["value"])
+
+    def set(self, key: str, value: Dict[str, Any]):
+        """Store a parsed plan in both tiers."""
+        stored_at = time.time()
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, stored_at, value)
+            self._stats["stores"] += 1
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                path = self._path(key)
+                is_new = not os.path.exists(path)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump({"stored_at": stored_at, "value": value}, f)
+                os.replace(tmp_path, path)
+                if is_new:
+                    self._count_disk_entry()
+            except Exception as e:
+                logger.warning(f"Could not write plan cache entry {key}: {e}")
+
+    def _count_disk_entry(self):
+        """Track the number of files on disk and evict the oldest past the limit."""
+        if self._disk_count is None:
+            self._disk_count = len([n for n in os.listdir(self.cache_dir) if n.endswith(".json")])
+        else:
+            self._disk_count += 1
+
+        if self._disk_count <= self.max_disk_entries:
+            return
+
+        # Evict down to 90% of the limit so eviction doesn't run on every write
+        paths = [os.path.join(self.cache_dir, n) for n in os.listdir(self.cache_dir) if n.endswith(".json")]
+        paths.sort(key=lambda p: os.path.getmtime(p))
+        target = int(self.max_disk_entries * 0.9)
+        for path in paths[:max(len(paths) - target, 0)]:
+            self._remove_file(path)
+            self._stats["disk_evictions"] += 1
+        self._disk_count = min(len(paths), target)
+
+    def _remove_file(self, path: str):
+        try:
+            os.remove(path)
+            if self._disk_count:
+                self._disk_count -= 1
+        except OSError:
+            pass
+
+    def clear(self):
+        """Drop every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if os.path.isdir(self.cache_dir):
+                for name in os.listdir(self.cache_dir):
+                    if name.endswith(".json"):
+                        self._remove_file(os.path.join(self.cache_dir, name))
+            self._disk_count = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters, including how many LLM calls were saved."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["llm_calls_saved"] = hits
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+# Process-wide cache shared by every plan parser
+default_cache = PlanCache()
@@ -0,0 +1,212 @@
+"""
+Deterministic local parser for the canonical /plan grammar.
+Handles inputs such as "Redesign landing page by Sep-05; Dev: Alice,Bob; Mktg: Carol"
+and the "/plan {name} by {date}; Team: {members}; {description}" form sent by the
+Streamlit ApiService, returning the same shape as parse_plan_with_gemini.
+Text that doesn't fit the grammar yields None so callers can fall back to Gemini.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import re
+import calendar
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+MONTHS = {}
+for _number in range(1, 13):
+    MONTHS[calendar.month_name[_number].lower()] = _number
+    MONTHS[calendar.month_abbr[_number].lower()] = _number
+MONTHS["sept"] = 9
+
+WEEKDAYS = {calendar.day_name[i].lower(): i for i in range(7)}
+WEEKDAYS.update({calendar.day_abbr[i].lower(): i for i in range(7)})
+
+# Role used for members listed without one (e.g. "Team: PM,Dev: Alice")
+DEFAULT_ROLE = "Team Member"
+
+_MONTH_PATTERN = "|".join(sorted(MONTHS, key=len, reverse=True))
+_DAY_PATTERN = r"(\d{1,2})(?:st|nd|rd|th)?"
+
+# "Sep-05", "Sep 5th", "September 5, 2025", "Sep-05-2025"
+_MONTH_DAY_RE = re.compile(rf"^({_MONTH_PATTERN})\.?[\s\-/]*{_DAY_PATTERN}(?:,?[\s\-/]*(\d{{4}}))?$")
+# "5 Sep", "05-Sep-2025", "5th of September"
+_DAY_MONTH_RE = re.compile(rf"^{_DAY_PATTERN}(?:\s+of)?[\s\-/]*({_MONTH_PATTERN})\.?(?:,?[\s\-/]*(\d{{4}}))?$")
+# "2025-09-05", "2025/09/05"
+_ISO_RE = re.compile(r"^(\d{4})[\-/.](\d{1,2})[\-/.](\d{1,2})$")
+# "09/05", "9/5/2025" (US month-first)
+_NUMERIC_RE = re.compile(r"^(\d{1,2})/(\d{1,2})(?:/(\d{2}|\d{4}))?$")
+# "in 3 days", "in 2 weeks"
+_RELATIVE_RE = re.compile(r"^in\s+(\d+)\s+(day|week|month)s?$")
+
+# Roles and names are short ("Dev", "Product Owner", "Mary Ann Lee"); longer text is a description
+_ROLE_RE = re.compile(r"^[A-Za-z][\w&/.\-]*(?: [A-Za-z][\w&/.\-]*){0,2}$")
+_NAME_RE = re.compile(r"^[A-Za-z][\w.'\-]*(?: [A-Za-z][\w.'\-]*){0,2}$")
+_TITLE_DATE_RE = re.compile(r"^(?P<title>.+)\s+(?:by|due)\s+(?P<date>[^;]+)$", re.IGNORECASE)
+
+def _next_occurrence(month: int, day: int, today: date) -> Optional[date]:
+    """Resolve a month/day without a year to its next occurrence on or after today."""
+    for year in (today.year, today.year + 1):
+        try:
+            candidate = date(year, month, day)
+        except ValueError:
+            continue
+        if candidate >= today:
+            return candidate
+    return None
+
+def _build_date(year: Optional[str], month: int, day: int, today: date) -> Optional[date]:
+    if year is None:
+        return _next_occurrence(month, day, today)
+    year_number = int(year)
+    if year_number < 100:
+        year_number += 2000
+    try:
+        return date(year_number, month, day)
+    except ValueError:
+        return None
+
+def _end_of_month(day: date) -> date:
+    return day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+def parse_fuzzy_date(text: str, today: Optional[date] = None) -> Optional[date]:
+    """
+    Parse the date formats people type into /plan.
+
+    Supports ISO dates, month names in either order ("Sep-05", "5 September 2025"),
+    US numeric dates ("09/05"), weekdays ("Friday", "next Fri"), and a few
+    relative phrases ("tomorrow", "in 2 weeks", "end of month").
+    Dates without a year resolve to their next occurrence.
+    """
+    today = today or datetime.now().date()
+    value = re.sub(r"\s+", " ", text.strip().lower().rstrip("."))
+    if not value:
+        return None
+
+    if value == "today":
+        return today
+    if value == "tomorrow":
+        return today + timedelta(days=1)
+    if value in ("end of month", "eom"):
+        return _end_of_month(today)
+    if value in ("end of week", "eow"):
+        return today + timedelta(days=(4 - today.weekday()) % 7)
+    if value == "next week":
+        return today + timedelta(days=7)
+    if value == "next month":
+        return _add_months(today, 1)
+
+    match = _RELATIVE_RE.match(value)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        if unit == "day":
+            return today + timedelta(days=amount)
+        if unit == "week":
+            return today + timedelta(weeks=amount)
+        return _add_months(today, amount)
+
+    weekday = value[5:] if value.startswith("next ") else value
+    if weekday in WEEKDAYS:
+        days_ahead = (WEEKDAYS[weekday] - today.weekday()) % 7 or 7
+        return today + timedelta(days=days_ahead)
+
+    match = _ISO_RE.match(value)
+    if match:
+        return _build_date(match.group(1), int(match.group(2)), int(match.group(3)), today)
+
+    match = _MONTH_DAY_RE.match(value)
+    if match:
+        return _build_date(match.group(3), MONTHS[match.group(1)], int(match.group(2)), today)
+
+    match = _DAY_MONTH_RE.match(value)
+    if match:
+        return _build_date(match.group(3), MONTHS[match.group(2)], int(match.group(1)), today)
+
+    match = _NUMERIC_RE.match(value)
+    if match:
+        return _build_date(match.group(3), int(match.group(1)), int(match.group(2)), today)
+
+    return None
+
+def _split_names(names_text: str) -> List[str]:
+    parts = re.split(r"\s*(?:,|&|\band\b)\s*", names_text.strip())
+    return [part.strip() for part in parts if part.strip()]
+
+def _parse_role_segment(segment: str) -> Optional[List[Dict[str, str]]]:
+    """Parse "Role: Name1,Name2" (or "Team: Role: Name,Name") into team members."""
+    role, separator, names_text = segment.partition(":")
+    role = role.strip()
+    if not separator or not _ROLE_RE.match(role):
+        return None
+
+    members = []
+    if role.lower() == "team":
+        # Team form: each item may carry its own "Role: Name"
+        for item in names_text.split(","):
+            item_role, item_separator, item_name = item.partition(":")
+            if item_separator:
+                item_role, item_name = item_role.strip(), item_name.strip()
+                if not _ROLE_RE.match(item_role) or not _NAME_RE.match(item_name):
+                    return None
+                members.append({"name": item_name, "role": item_role})
+            elif item.strip():
+                if not _NAME_RE.match(item.strip()):
+                    return None
+                members.append({"name": item.strip(), "role": DEFAULT_ROLE})
+    else:
+        for name in _split_names(names_text):
+            if not _NAME_RE.match(name):
+                return None
+            members.append({"name": name, "role": role})
+
+    return members or None
+
+def parse_plan_text(plan_text: str, today: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    """
+    Parse plan text that follows the canonical /plan grammar.
+
+    Example input: "Redesign landing page by Sep-05; Dev: Alice,Bob; Mktg: Carol"
+
+    Returns a dict with title, due_date (YYYY-MM-DD) and team_members, or None
+    when the text is free-form and should be sent to Gemini instead.
+    A single trailing segment that isn't a role list is treated as a description.
+    """
+    text = plan_text.strip()
+    if text.lower().startswith("/plan"):
+        text = text[len("/plan"):].strip()
+
+    segments = [segment.strip() for segment in text.split(";")]
+    segments = [segment for segment in segments if segment]
+    if not segments:
+        return None
+
+    match = _TITLE_DATE_RE.match(segments[0])
+    if not match:
+        return None
+    title = match.group("title").strip()
+    due_date = parse_fuzzy_date(match.group("date"), today=today)
+    if not title or due_date is None:
+        return None
+
+    team_members = []
+    for position, segment in enumerate(segments[1:], start=1):
+        members = _parse_role_segment(segment)
+        if members is None:
+            # Only the last segment may be free text (the ApiService description)
+            if position == len(segments) - 1 and team_members:
+                break
+            return None
+        team_members.extend(members)
+
+    if not team_members:
+        return None
+
+    return {
+        "title": title,
+        "due_date": due_date.isoformat(),
+        "team_members": team_members
+    }
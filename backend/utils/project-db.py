@@ -0,0 +1,975 @@
+"""
+SQLite storage for plans, stories, tasks and risk check-ins.
+The database runs in WAL mode, so several uvicorn workers can read while one
+writes, and each write touches only the rows it changes instead of rewriting a
+JSON file. Routers go through the repositories at the bottom of this module
+(plans, tasks, risks) rather than opening files; so does the Streamlit
+dashboard for tasks, which it loads by path with task.json's keys. Readers that need stories and
+tasks together (alerts, schedule, digest) use work_items, an in-memory index
+of both in one normalized shape. Every mutation is also recorded in a
+sequenced change feed (changes), which derived views like work_items follow
+instead of rescanning. import_json_files loads the
+older data/plan.json, data/risk_*.json and task.json files once
+(see backend/import-json-data.py, and import_task_json).
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import os
+import json
+import glob
+import uuid
+import bisect
+import sqlite3
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Integer, cast, event, func, text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Field, Session, SQLModel, create_engine, select
+
+# Version conflict error shared with the JSON document store (kebab-case doc-store.py)
+try:
+    from utils import doc_store
+except ImportError:
+    # Loaded by path from the Streamlit frontend, which loads doc-store.py first (see log_service.py)
+    import doc_store
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Database file; backend/data/project.db wherever the API, Flask server, scripts or Streamlit start from
+DB_PATH = os.getenv("PROJECT_DB_PATH") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "project.db"
+)
+# How long a writer waits for another process's write lock before failing
+BUSY_TIMEOUT_MS = int(os.getenv("PROJECT_DB_BUSY_TIMEOUT_MS", "5000"))
+
+# Tables
+class PlanRecord(SQLModel, table=True):
+    __tablename__ = "plans"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    title: str
+    due_date: str = Field(index=True)
+    plan_text: Optional[str] = None
+    # Plans created by one /plan/batch call share a batch ID
+    batch_id: Optional[str] = Field(default=None, index=True)
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
+
+class StoryRecord(SQLModel, table=True):
+    __tablename__ = "stories"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    plan_id: int = Field(foreign_key="plans.id", index=True)
+    title: str
+    owner: str = Field(index=True)
+    due_date: str = Field(index=True)
+    status: str = Field(default="Backlog", index=True)
+
+class TaskRecord(SQLModel, table=True):
+    __tablename__ = "tasks"
+
+    id: str = Field(primary_key=True)  # e.g. TSK-001
+    title: str
+    status: str = Field(default="Todo", index=True)
+    owner: Optional[str] = Field(default=None, index=True)
+    due_date: Optional[str] = Field(default=None, index=True)
+    priority: Optional[str] = None
+    dependencies: Optional[str] = None
+    description: Optional[str] = None
+    details: Optional[str] = None
+    test_strategy: Optional[str] = None
+    has_blockers: bool = False
+    blocker_description: Optional[str] = None
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+class RiskCheckInRecord(SQLModel, table=True):
+    __tablename__ = "risk_checkins"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    team_lead: str = Field(index=True)
+    created_at: datetime = Field(default_factory=datetime.now, index=True)
+
+class RiskItemRecord(SQLModel, table=True):
+    __tablename__ = "risk_items"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    checkin_id: int = Field(foreign_key="risk_checkins.id", index=True)
+    story_id: str = Field(index=True)
+    title: str
+    on_track: bool
+    reason: Optional[str] = None
+    needs_discussion: bool = False
+
+class RiskDailyRecord(SQLModel, table=True):
+    """Per-day, per-team-lead check-in counts, kept up to date as check-ins are stored."""
+    __tablename__ = "risk_daily"
+
+    day: str = Field(primary_key=True)  # YYYY-MM-DD
+    team_lead: str = Field(primary_key=True)
+    checkins: int = 0
+    blockers: int = 0
+    needs_discussion: int = 0
+
+class ChangeRecord(SQLModel, table=True):
+    """One mutation, written in the same transaction as the change it describes."""
+    __tablename__ = "changes"
+
+    # Assigned under SQLite's single write lock, so sequence order is commit order
+    seq: Optional[int] = Field(default=None, primary_key=True)
+    kind: str = Field(index=True)
+    entity_id: str
+    payload: str  # JSON
+    created_at: datetime = Field(default_factory=datetime.now)
+
+# Change kinds
+TASK_CREATED = "task_created"
+TASK_UPDATED = "task_updated"
+TASK_STATUS_CHANGED = "task_status_changed"
+TASK_DELETED = "task_deleted"
+PLAN_ADDED = "plan_added"
+RISK_REPORTED = "risk_reported"
+
+# Adds one check-in's counts to its day, creating the row on the day's first check-in
+_RISK_DAILY_UPSERT = text(
+    "INSERT INTO risk_daily (day, team_lead, checkins, blockers, needs_discussion) "
+    "VALUES (:day, :team_lead, 1, :blockers, :needs_discussion) "
+    "ON CONFLICT (day, team_lead) DO UPDATE SET checkins = checkins + 1, "
+    "blockers = blockers + excluded.blockers, needs_discussion = needs_discussion + excluded.needs_discussion"
+)
+
+# Rebuilds the daily counts from the stored check-ins (databases created before risk_daily existed)
+_RISK_DAILY_BACKFILL = text(
+    "INSERT INTO risk_daily (day, team_lead, checkins, blockers, needs_discussion) "
+    "SELECT date(c.created_at), c.team_lead, COUNT(DISTINCT c.id), "
+    "COALESCE(SUM(i.on_track = 0), 0), COALESCE(SUM(i.needs_discussion), 0) "
+    "FROM risk_checkins c LEFT JOIN risk_items i ON i.checkin_id = c.id "
+    "GROUP BY date(c.created_at), c.team_lead"
+)
+
+# Engine
+_engine = None
+_engine_lock = threading.Lock()
+
+def _configure_connection(dbapi_connection, connection_record):
+    """Per-connection settings: WAL for concurrent readers, and wait rather than fail on a busy writer."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+def get_engine():
+    """Create the engine and tables on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            directory = os.path.dirname(DB_PATH)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            engine = create_engine(
+                f"sqlite:///{DB_PATH}",
+                connect_args={"check_same_thread": False, "timeout": BUSY_TIMEOUT_MS / 1000}
+            )
+            event.listen(engine, "connect", _configure_connection)
+            try:
+                SQLModel.metadata.create_all(engine)
+            except OperationalError:
+                # Another worker created the tables between the check and the CREATE
+                SQLModel.metadata.create_all(engine)
+            _backfill_risk_daily(engine)
+            _engine = engine
+            logger.info(f"Opened project database {DB_PATH}")
+        return _engine
+
+def _backfill_risk_daily(engine):
+    """Fill the daily risk counts if check-ins exist but the counts were never kept."""
+    with Session(engine) as session:
+        if session.exec(select(RiskDailyRecord).limit(1)).first() is not None:
+            return
+        if session.exec(select(RiskCheckInRecord).limit(1)).first() is None:
+            return
+        session.execute(_RISK_DAILY_BACKFILL)
+        session.commit()
+        logger.info("Backfilled daily risk counts from stored check-ins")
+
+def get_session() -> Session:
+    # Rows are turned into dicts after commit, so keep their loaded values
+    return Session(get_engine(), expire_on_commit=False)
+
+# Conversions to the dict shapes the routers already use
+def _story_dict(story: StoryRecord) -> Dict[str, Any]:
+    return {"title": story.title, "owner": story.owner, "due_date": story.due_date, "status": story.status}
+
+def _task_dict(task: TaskRecord) -> Dict[str, Any]:
+    return {
+        "id": task.id,
+        "title": task.title,
+        "status": task.status,
+        "owner": task.owner or "Unassigned",
+        "due_date": task.due_date,
+        "priority": task.priority,
+        "dependencies": task.dependencies,
+        "description": task.description,
+        "details": task.details,
+        "test_strategy": task.test_strategy,
+        "has_blockers": task.has_blockers,
+        "blocker_description": task.blocker_description
+    }
+
+# task.json keys and the TaskRecord fields they are stored in
+TASK_JSON_FIELDS = {
+    "Task ID": "id",
+    "Title": "title",
+    "Status": "status",
+    "Owner": "owner",
+    "Due Date": "due_date",
+    "Priority": "priority",
+    "Dependencies": "dependencies",
+    "Description": "description",
+    "Details": "details",
+    "Test Strategy": "test_strategy"
+}
+
+def task_from_json(task: Dict[str, Any]) -> Dict[str, Any]:
+    """TaskRecord fields of a task with task.json keys (other keys are dropped)"""
+    return {TASK_JSON_FIELDS[key]: value for key, value in task.items() if key in TASK_JSON_FIELDS}
+
+def _task_json(task: TaskRecord) -> Dict[str, Any]:
+    """A task with task.json keys, leaving out fields that were never set"""
+    return {key: getattr(task, field) for key, field in TASK_JSON_FIELDS.items() if getattr(task, field) is not None}
+
+TASK_ID_PREFIX = "TSK-"
+
+def _task_number(task_id: str) -> int:
+    """Number of a TSK- ID, or 0 for other IDs"""
+    if task_id.startswith(TASK_ID_PREFIX):
+        try:
+            return int(task_id[len(TASK_ID_PREFIX):])
+        except ValueError:
+            pass
+    return 0
+
+# Normalized work items: plan stories and tasks in one shape, read by alerts, schedule and digest
+STORY_ID_PREFIX = "S-"
+
+def _story_id(story_id: int) -> str:
+    return f"{STORY_ID_PREFIX}{story_id:03d}"
+
+def _story_item(story: StoryRecord) -> Dict[str, Any]:
+    return {
+        "id": _story_id(story.id),
+        "title": story.title,
+        "status": story.status,
+        "owner": story.owner or "Unassigned",
+        "due_date": story.due_date,
+        "priority": None,
+        "dependencies": None,
+        "description": None,
+        "details": None,
+        "test_strategy": None,
+        "has_blockers": False,
+        "blocker_description": None,
+        "kind": "story",
+        "plan_id": story.plan_id
+    }
+
+def _task_item(task: TaskRecord) -> Dict[str, Any]:
+    item = _task_dict(task)
+    item.update({"kind": "task", "plan_id": None})
+    return item
+
+def _due_ordinal(value: Optional[str]) -> Optional[int]:
+    """Day number (date.toordinal) of an ISO due date or datetime, or None if it isn't one"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).toordinal()
+    except ValueError:
+        return None
+
+def _is_done(item: Dict[str, Any]) -> bool:
+    return (item["status"] or "").lower() == "done"
+
+def _risk_item_dict(item: RiskItemRecord) -> Dict[str, Any]:
+    return {"story_id": item.story_id, "title": item.title, "on_track": item.on_track, "reason": item.reason}
+
+def _record_change(session: Session, kind: str, entity_id: str, payload: Dict[str, Any]):
+    """Add a change to the feed; the caller commits it together with the change itself."""
+    session.add(ChangeRecord(kind=kind, entity_id=entity_id, payload=json.dumps(payload)))
+
+def _change_dict(change: ChangeRecord) -> Dict[str, Any]:
+    return {
+        "seq": change.seq,
+        "kind": change.kind,
+        "entity_id": change.entity_id,
+        "payload": json.loads(change.payload),
+        "created_at": change.created_at.isoformat()
+    }
+
+# Repositories
+class PlanRepository:
+    """Plans and their stories."""
+
+    def add_plan(self, title: str, due_date: str, stories: List[Dict[str, Any]],
+                 plan_text: Optional[str] = None, created_at: Optional[datetime] = None,
+                 expected_version: Optional[str] = None) -> int:
+        """Store one plan with its stories in a single transaction. Returns the plan ID."""
+        return self.add_plans([{"title": title, "due_date": due_date, "stories": stories, "plan_text": plan_text}],
+                              created_at=created_at, batch=False, expected_version=expected_version)[0]
+
+    def add_plans(self, plans: List[Dict[str, Any]], created_at: Optional[datetime] = None,
+                  batch: bool = True, expected_version: Optional[str] = None) -> List[int]:
+        """
+        Store several plans (dicts of title, due_date, stories and optionally plan_text)
+        in one transaction, as one batch unless batch is False. Returns the plan IDs.
+        With expected_version, this is a compare-and-swap on the current plan: it
+        raises doc_store.VersionConflict unless current_version() still equals it.
+        """
+        created_at = created_at or datetime.now()
+        batch_id = uuid.uuid4().hex if batch else None
+        with get_session() as session:
+            records = []
+            for plan in plans:
+                record = PlanRecord(title=plan["title"], due_date=plan["due_date"], plan_text=plan.get("plan_text"),
+                                    batch_id=batch_id, created_at=created_at)
+                session.add(record)
+                records.append((record, plan["stories"]))
+            # Assign plan IDs before the stories that reference them
+            session.flush()
+            if expected_version is not None:
+                # The insert holds SQLite's write lock, so no other plan can commit between this check and ours
+                previous = session.exec(select(func.max(PlanRecord.id)).where(PlanRecord.id < records[0][0].id)).one()
+                current_version = str(previous or 0)
+                if current_version != expected_version:
+                    session.rollback()
+                    raise doc_store.VersionConflict(f"{DB_PATH}:plans", expected_version, current_version)
+            for record, stories in records:
+                story_records = [
+                    StoryRecord(plan_id=record.id, title=story["title"], owner=story["owner"],
+                                due_date=story["due_date"], status=story.get("status", "Backlog"))
+                    for story in stories
+                ]
+                session.add_all(story_records)
+                # Story IDs go into the change feed with the plan
+                session.flush()
+                _record_change(session, PLAN_ADDED, str(record.id), {
+                    "plan_id": record.id,
+                    "title": record.title,
+                    "due_date": record.due_date,
+                    "batch_id": batch_id,
+                    "items": [_story_item(story) for story in story_records]
+                })
+            session.commit()
+            return [record.id for record, _ in records]
+
+    def list_plans(self, offset: int = 0, limit: int = 50) -> Tuple[int, List[Dict[str, Any]]]:
+        """Return (total, one page of plan summaries newest first)."""
+        with get_session() as session:
+            total = session.exec(select(func.count()).select_from(PlanRecord)).one()
+            page = session.exec(select(PlanRecord).order_by(PlanRecord.id.desc()).offset(offset).limit(limit)).all()
+            story_counts = dict(session.exec(
+                select(StoryRecord.plan_id, func.count()).where(StoryRecord.plan_id.in_([plan.id for plan in page]))
+                .group_by(StoryRecord.plan_id)
+            ).all()) if page else {}
+        return total, [{
+            "id": plan.id,
+            "title": plan.title,
+            "due_date": plan.due_date,
+            "batch_id": plan.batch_id,
+            "created_at": plan.created_at.isoformat(),
+            "story_count": story_counts.get(plan.id, 0)
+        } for plan in page]
+
+    def get_plan(self, plan_id: int) -> Optional[Dict[str, Any]]:
+        with get_session() as session:
+            plan = session.get(PlanRecord, plan_id)
+            return self._plan_dict(session, plan) if plan else None
+
+    def _plan_dict(self, session: Session, plan: PlanRecord) -> Dict[str, Any]:
+        stories = session.exec(select(StoryRecord).where(StoryRecord.plan_id == plan.id).order_by(StoryRecord.id)).all()
+        return {
+            "id": plan.id,
+            "title": plan.title,
+            "due_date": plan.due_date,
+            "stories": [_story_dict(story) for story in stories],
+            "created_at": plan.created_at.isoformat()
+        }
+
+    def current_version(self) -> str:
+        """Version of the current plan: the latest plan ID, or "0" before the first plan."""
+        with get_session() as session:
+            return str(session.exec(select(func.max(PlanRecord.id))).one() or 0)
+
+    def load_current_plan(self, include_tasks: bool = True) -> Dict[str, Any]:
+        """
+        Return the latest plan in the shape data/plan.json had: title, due_date,
+        stories and created_at, or for a batch the combined stories plus the
+        individual plans, with its "version" (see current_version). Open tasks
+        are included under "tasks" unless include_tasks is False.
+        """
+        with get_session() as session:
+            latest = session.exec(select(PlanRecord).order_by(PlanRecord.id.desc()).limit(1)).first()
+            if latest is None:
+                current = {"stories": []}
+            elif latest.batch_id is None:
+                current = self._plan_dict(session, latest)
+            else:
+                batch = session.exec(select(PlanRecord).where(PlanRecord.batch_id == latest.batch_id)
+                                     .order_by(PlanRecord.id)).all()
+                plans = [self._plan_dict(session, plan) for plan in batch]
+                current = {
+                    "title": f"Batch import of {len(plans)} plans",
+                    "due_date": max(plan["due_date"] for plan in plans),
+                    "stories": [story for plan in plans for story in plan["stories"]],
+                    "plans": plans,
+                    "created_at": latest.created_at.isoformat()
+                }
+            current["version"] = str(latest.id if latest else 0)
+        if include_tasks:
+            current["tasks"] = tasks.list_tasks()
+        return current
+
+class TaskRepository:
+    """Tasks (TSK-### items), keyed by ID."""
+
+    def list_tasks(self, status: Optional[str] = None, owner: Optional[str] = None) -> List[Dict[str, Any]]:
+        with get_session() as session:
+            query = select(TaskRecord)
+            if status is not None:
+                query = query.where(TaskRecord.status == status)
+            if owner is not None:
+                query = query.where(TaskRecord.owner == owner)
+            return [_task_dict(task) for task in session.exec(query.order_by(TaskRecord.id)).all()]
+
+    def list_task_json(self) -> List[Dict[str, Any]]:
+        """Every task with task.json keys, by ID"""
+        with get_session() as session:
+            return [_task_json(task) for task in session.exec(select(TaskRecord).order_by(TaskRecord.id)).all()]
+
+    def count(self) -> int:
+        with get_session() as session:
+            return session.exec(select(func.count()).select_from(TaskRecord)).one()
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with get_session() as session:
+            task = session.get(TaskRecord, task_id)
+            return _task_dict(task) if task else None
+
+    def _write_task(self, session: Session, record: Optional[TaskRecord], task: Dict[str, Any]):
+        """Insert (record is None) or update one task and record the change; the caller commits."""
+        old_status = record.status if record is not None else None
+        if record is None:
+            record = TaskRecord(id=task["id"], title=task.get("title") or "Untitled Task")
+        for field, value in task.items():
+            if field in TaskRecord.__fields__ and field != "id":
+                setattr(record, field, value)
+        record.updated_at = datetime.now()
+        session.add(record)
+        if old_status is None:
+            kind = TASK_CREATED
+        else:
+            kind = TASK_STATUS_CHANGED if record.status != old_status else TASK_UPDATED
+        _record_change(session, kind, record.id, {"item": _task_item(record), "old_status": old_status})
+
+    def upsert_task(self, task: Dict[str, Any]) -> str:
+        """Insert or update a task from a dict of TaskRecord fields. Returns its ID."""
+        with get_session() as session:
+            self._write_task(session, session.get(TaskRecord, task["id"]), task)
+            session.commit()
+            return task["id"]
+
+    def save_tasks(self, changed: List[Dict[str, Any]], new_ids: Optional[set] = None,
+                   replace: bool = False) -> Dict[str, str]:
+        """
+        Insert or update several tasks (dicts of TaskRecord fields) in one
+        transaction, recording a change for each. new_ids are the IDs the caller
+        allocated for new tasks: if another writer stored a task under one of
+        them first, the new task is stored under the next free TSK- number
+        instead. With replace, stored tasks missing from changed are deleted.
+        Returns {allocated ID: stored ID} for the renumbered tasks.
+        """
+        new_ids = new_ids or set()
+        renamed: Dict[str, str] = {}
+        with get_session() as session:
+            # Take the write lock before reading, so no other writer can store one of these IDs in between
+            session.execute(text("BEGIN IMMEDIATE"))
+            query = select(TaskRecord)
+            if not replace:
+                query = query.where(TaskRecord.id.in_([task["id"] for task in changed]))
+            stored = {record.id: record for record in session.exec(query).all()}
+            last_number = None
+            saved_ids = set()
+            for task in changed:
+                record = stored.get(task["id"])
+                if record is not None and task["id"] in new_ids:
+                    if last_number is None:
+                        stored_last = session.exec(select(func.max(cast(
+                            func.substr(TaskRecord.id, len(TASK_ID_PREFIX) + 1), Integer
+                        ))).where(TaskRecord.id.like(f"{TASK_ID_PREFIX}%"))).one()
+                        last_number = max([stored_last or 0] + [_task_number(other["id"]) for other in changed])
+                    last_number += 1
+                    renamed[task["id"]] = f"{TASK_ID_PREFIX}{str(last_number).zfill(3)}"
+                    task, record = {**task, "id": renamed[task["id"]]}, None
+                self._write_task(session, record, task)
+                saved_ids.add(task["id"])
+            if replace:
+                for record in stored.values():
+                    if record.id not in saved_ids:
+                        session.delete(record)
+                        _record_change(session, TASK_DELETED, record.id, {"item_id": record.id, "old_status": record.status})
+            session.commit()
+        return renamed
+
+    def update_status(self, task_id: str, status: str) -> bool:
+        with get_session() as session:
+            record = session.get(TaskRecord, task_id)
+            if record is None:
+                return False
+            old_status = record.status
+            record.status = status
+            record.updated_at = datetime.now()
+            session.add(record)
+            _record_change(session, TASK_STATUS_CHANGED, task_id, {"item": _task_item(record), "old_status": old_status})
+            session.commit()
+            return True
+
+class RiskRepository:
+    """Risk check-ins and the items reported in them."""
+
+    def add_checkin(self, team_lead: str, items: List[Dict[str, Any]], needs_discussion_ids: Optional[set] = None,
+                    created_at: Optional[datetime] = None) -> int:
+        """
+        Store a check-in with its reported items (story_id, title, on_track, reason).
+        needs_discussion_ids holds the story IDs flagged for discussion. Returns the check-in ID.
+        """
+        needs_discussion_ids = needs_discussion_ids or set()
+        with get_session() as session:
+            checkin = RiskCheckInRecord(team_lead=team_lead, created_at=created_at or datetime.now())
+            session.add(checkin)
+            session.flush()
+            records = [
+                RiskItemRecord(checkin_id=checkin.id, story_id=item["story_id"], title=item["title"],
+                               on_track=item["on_track"], reason=item.get("reason"),
+                               needs_discussion=item["story_id"] in needs_discussion_ids)
+                for item in items
+            ]
+            session.add_all(records)
+            # Daily counts change in the same transaction, so they always match the check-ins
+            session.execute(_RISK_DAILY_UPSERT, {
+                "day": checkin.created_at.strftime("%Y-%m-%d"),
+                "team_lead": team_lead,
+                "blockers": sum(1 for record in records if not record.on_track),
+                "needs_discussion": sum(1 for record in records if record.needs_discussion)
+            })
+            _record_change(session, RISK_REPORTED, str(checkin.id), {
+                "checkin_id": checkin.id,
+                "team_lead": team_lead,
+                "blocker_story_ids": [record.story_id for record in records if not record.on_track],
+                "needs_discussion_story_ids": [record.story_id for record in records if record.needs_discussion]
+            })
+            session.commit()
+            return checkin.id
+
+    def _checkin_dict(self, checkin: RiskCheckInRecord, items: List[RiskItemRecord]) -> Dict[str, Any]:
+        return {
+            "id": checkin.id,
+            "team_lead": checkin.team_lead,
+            "blockers": [_risk_item_dict(item) for item in items if not item.on_track],
+            "needs_discussion": [_risk_item_dict(item) for item in items if item.needs_discussion],
+            "timestamp": checkin.created_at.isoformat()
+        }
+
+    def get_checkin(self, checkin_id: int) -> Optional[Dict[str, Any]]:
+        """Return a check-in in the shape the data/risk_*.json files had."""
+        with get_session() as session:
+            checkin = session.get(RiskCheckInRecord, checkin_id)
+            if checkin is None:
+                return None
+            items = session.exec(select(RiskItemRecord).where(RiskItemRecord.checkin_id == checkin_id)
+                                 .order_by(RiskItemRecord.id)).all()
+            return self._checkin_dict(checkin, items)
+
+    def history(self, team_lead: Optional[str] = None, story_id: Optional[str] = None,
+                date_from: Optional[str] = None, date_to: Optional[str] = None,
+                offset: int = 0, limit: int = 20) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Return (total, one page of check-ins newest first) matching the filters.
+        Dates are inclusive YYYY-MM-DD days; story_id keeps check-ins that reported that story.
+        """
+        conditions = []
+        if team_lead:
+            conditions.append(RiskCheckInRecord.team_lead == team_lead)
+        if date_from:
+            conditions.append(RiskCheckInRecord.created_at >= datetime.strptime(date_from, "%Y-%m-%d"))
+        if date_to:
+            conditions.append(RiskCheckInRecord.created_at < datetime.strptime(date_to, "%Y-%m-%d") + timedelta(days=1))
+        if story_id:
+            conditions.append(RiskCheckInRecord.id.in_(
+                select(RiskItemRecord.checkin_id).where(RiskItemRecord.story_id == story_id)
+            ))
+
+        with get_session() as session:
+            total = session.exec(select(func.count()).select_from(RiskCheckInRecord).where(*conditions)).one()
+            page = session.exec(select(RiskCheckInRecord).where(*conditions)
+                                .order_by(RiskCheckInRecord.id.desc()).offset(offset).limit(limit)).all()
+            # Items for the whole page in one query
+            items: Dict[int, List[RiskItemRecord]] = {checkin.id: [] for checkin in page}
+            if page:
+                for item in session.exec(select(RiskItemRecord).where(RiskItemRecord.checkin_id.in_(list(items)))
+                                         .order_by(RiskItemRecord.id)).all():
+                    items[item.checkin_id].append(item)
+            return total, [self._checkin_dict(checkin, items[checkin.id]) for checkin in page]
+
+    def daily_counts(self, team_lead: Optional[str] = None, story_id: Optional[str] = None,
+                     date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Check-ins, blockers and needs-discussion items per day, oldest first.
+        Served from the risk_daily counts; only a story filter needs the items themselves.
+        """
+        with get_session() as session:
+            if story_id:
+                day = func.date(RiskCheckInRecord.created_at)
+                query = (select(day, func.count(func.distinct(RiskCheckInRecord.id)),
+                                func.sum(RiskItemRecord.on_track == False),  # noqa: E712 (SQL expression)
+                                func.sum(RiskItemRecord.needs_discussion == True))  # noqa: E712
+                         .join(RiskItemRecord, RiskItemRecord.checkin_id == RiskCheckInRecord.id)
+                         .where(RiskItemRecord.story_id == story_id))
+                if team_lead:
+                    query = query.where(RiskCheckInRecord.team_lead == team_lead)
+                if date_from:
+                    query = query.where(day >= date_from)
+                if date_to:
+                    query = query.where(day <= date_to)
+                rows = session.exec(query.group_by(day).order_by(day)).all()
+            else:
+                query = select(RiskDailyRecord.day, func.sum(RiskDailyRecord.checkins),
+                               func.sum(RiskDailyRecord.blockers), func.sum(RiskDailyRecord.needs_discussion))
+                if team_lead:
+                    query = query.where(RiskDailyRecord.team_lead == team_lead)
+                if date_from:
+                    query = query.where(RiskDailyRecord.day >= date_from)
+                if date_to:
+                    query = query.where(RiskDailyRecord.day <= date_to)
+                rows = session.exec(query.group_by(RiskDailyRecord.day).order_by(RiskDailyRecord.day)).all()
+        return [
+            {"day": day, "checkins": checkins, "blockers": blockers or 0, "needs_discussion": needs_discussion or 0}
+            for day, checkins, blockers, needs_discussion in rows
+        ]
+
+class ChangeSubscription:
+    """A consumer's position in the change feed, optionally following only some kinds."""
+
+    def __init__(self, feed: "ChangeFeed", since: int, kinds: Optional[List[str]] = None):
+        self.feed = feed
+        self.since = since
+        self.kinds = kinds
+
+    def poll(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Changes after the last one returned, oldest first."""
+        changes = self.feed.read(self.since, limit, self.kinds)
+        if changes:
+            self.since = changes[-1]["seq"]
+        return changes
+
+class ChangeFeed:
+    """
+    Sequenced mutations (task created / updated / status changed / deleted,
+    plan added, risk reported), recorded by the repositories in the same transaction as
+    the mutation itself, so the feed never misses or invents a change, whichever
+    process made it.
+    """
+
+    def latest_seq(self) -> int:
+        with get_session() as session:
+            return session.exec(select(func.max(ChangeRecord.seq))).one() or 0
+
+    def read(self, since: int = 0, limit: Optional[int] = None,
+             kinds: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Changes with seq > since, oldest first, optionally only some kinds."""
+        query = select(ChangeRecord).where(ChangeRecord.seq > since)
+        if kinds:
+            query = query.where(ChangeRecord.kind.in_(kinds))
+        query = query.order_by(ChangeRecord.seq)
+        if limit is not None:
+            query = query.limit(limit)
+        with get_session() as session:
+            return [_change_dict(change) for change in session.exec(query).all()]
+
+    def subscribe(self, since: Optional[int] = None, kinds: Optional[List[str]] = None) -> ChangeSubscription:
+        """Subscription starting after seq since, or at the current end of the feed."""
+        return ChangeSubscription(self, self.latest_seq() if since is None else since, kinds)
+
+class DataVersionProbe:
+    """
+    Notices commits to the database from any connection or process, in microseconds.
+    SQLite's data_version changes on a connection whenever another connection
+    commits, so a dedicated connection tells readers when the feed is worth polling.
+    """
+
+    def __init__(self):
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def read(self) -> int:
+        """Current data version; the caller serialises calls."""
+        if self._connection is None:
+            get_engine()  # creates the file and tables
+            self._connection = sqlite3.connect(DB_PATH, check_same_thread=False)
+        return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+class WorkItemIndex:
+    """
+    Every story and task as normalized work items, held in memory and indexed
+    by ID, plan, owner, status and due date. Readers get their slice without
+    a query or a scan. After the first load the index follows the change feed,
+    applying only the items changed since it last looked, whichever process
+    changed them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscription: Optional[ChangeSubscription] = None
+        # The feed is only polled after some connection has committed
+        self._probe = DataVersionProbe()
+        self._data_version: Optional[int] = None
+        self._items: Dict[str, Dict[str, Any]] = {}
+        # Item IDs per plan, owner and status, as insertion-ordered dicts for O(1) removal
+        self._by_plan: Dict[int, Dict[str, None]] = {}
+        self._by_owner: Dict[str, Dict[str, None]] = {}
+        self._by_status: Dict[str, Dict[str, None]] = {}
+        # (due day ordinal, item ID), sorted: every item with an ISO due date, and those not done
+        self._by_due: List[Tuple[int, str]] = []
+        self._open_by_due: List[Tuple[int, str]] = []
+        self._stats = {"rebuilds": 0, "changes_applied": 0, "unchanged": 0, "queries": 0}
+
+    def _refresh(self):
+        """Load everything on first use, then apply the changes since (caller holds the lock)."""
+        data_version = self._probe.read()
+        if self._subscription is not None and data_version == self._data_version:
+            self._stats["unchanged"] += 1
+            return
+        # Taken before reading, so a commit that races this refresh is seen next time
+        self._data_version = data_version
+        if self._subscription is None:
+            # Subscribe before loading: changes that race the load are applied again, which is harmless
+            subscription = changes.subscribe()
+            with get_session() as session:
+                stories = session.exec(select(StoryRecord).order_by(StoryRecord.id)).all()
+                task_records = session.exec(select(TaskRecord).order_by(TaskRecord.id)).all()
+            self._build([_story_item(story) for story in stories] + [_task_item(task) for task in task_records])
+            self._subscription = subscription
+            self._stats["rebuilds"] += 1
+        for change in self._subscription.poll():
+            payload = change["payload"]
+            if change["kind"] == TASK_DELETED:
+                self._remove(payload["item_id"])
+            for item in payload.get("items", []) + ([payload["item"]] if "item" in payload else []):
+                self._put(item)
+            self._stats["changes_applied"] += 1
+
+    def _build(self, items: List[Dict[str, Any]]):
+        """Index every item from scratch, sorting the due-date lists once (caller holds the lock)."""
+        self._items = {}
+        self._by_plan, self._by_owner, self._by_status = {}, {}, {}
+        self._by_due, self._open_by_due = [], []
+        for item in items:
+            self._items[item["id"]] = item
+            self._index(item, insort=False)
+        self._by_due.sort()
+        self._open_by_due.sort()
+
+    def _put(self, item: Dict[str, Any]):
+        """Insert or replace an item in every index (caller holds the lock)."""
+        old = self._items.get(item["id"])
+        if old is not None:
+            self._unindex(old)
+        self._items[item["id"]] = item
+        self._index(item)
+
+    def _index(self, item: Dict[str, Any], insort: bool = True):
+        """Add an item to every index; without insort the due-date lists are left for the caller to sort."""
+        item_id = item["id"]
+        if item["plan_id"] is not None:
+            self._by_plan.setdefault(item["plan_id"], {})[item_id] = None
+        self._by_owner.setdefault(item["owner"], {})[item_id] = None
+        self._by_status.setdefault(item["status"], {})[item_id] = None
+        ordinal = _due_ordinal(item["due_date"])
+        if ordinal is not None:
+            add = bisect.insort if insort else list.append
+            add(self._by_due, (ordinal, item_id))
+            if not _is_done(item):
+                add(self._open_by_due, (ordinal, item_id))
+
+    def _remove(self, item_id: str):
+        """Drop an item from every index (caller holds the lock)."""
+        old = self._items.pop(item_id, None)
+        if old is not None:
+            self._unindex(old)
+
+    def _unindex(self, item: Dict[str, Any]):
+        item_id = item["id"]
+        if item["plan_id"] is not None:
+            self._by_plan.get(item["plan_id"], {}).pop(item_id, None)
+        self._by_owner.get(item["owner"], {}).pop(item_id, None)
+        self._by_status.get(item["status"], {}).pop(item_id, None)
+        ordinal = _due_ordinal(item["due_date"])
+        if ordinal is not None:
+            for by_due in (self._by_due, self._open_by_due):
+                position = bisect.bisect_left(by_due, (ordinal, item_id))
+                if position < len(by_due) and by_due[position] == (ordinal, item_id):
+                    del by_due[position]
+
+    def _select(self, plan_id: Optional[int], owner: Optional[str], status: Optional[str]) -> List[str]:
+        """IDs matching every given filter, starting from the narrowest index (caller holds the lock)."""
+        candidates = []
+        if plan_id is not None:
+            candidates.append(self._by_plan.get(plan_id, {}))
+        if owner is not None:
+            candidates.append(self._by_owner.get(owner, {}))
+        if status is not None:
+            candidates.append(self._by_status.get(status, {}))
+        if not candidates:
+            return list(self._items)
+        candidates.sort(key=len)
+        return [item_id for item_id in candidates[0] if all(item_id in other for other in candidates[1:])]
+
+    def items(self, plan_id: Optional[int] = None, owner: Optional[str] = None,
+              status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Work items (copies) matching the filters, in the order they were added."""
+        with self._lock:
+            self._refresh()
+            self._stats["queries"] += 1
+            return [dict(self._items[item_id]) for item_id in self._select(plan_id, owner, status)]
+
+    def count(self, plan_id: Optional[int] = None, owner: Optional[str] = None, status: Optional[str] = None) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._select(plan_id, owner, status))
+
+    def get(self, item_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            item = self._items.get(item_id)
+            return dict(item) if item else None
+
+    def due_between(self, date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Items due within [date_from, date_to] (YYYY-MM-DD, inclusive), earliest first."""
+        with self._lock:
+            self._refresh()
+            self._stats["queries"] += 1
+            start = bisect.bisect_left(self._by_due, (_due_ordinal(date_from),)) if date_from else 0
+            end = bisect.bisect_left(self._by_due, (_due_ordinal(date_to) + 1,)) if date_to else len(self._by_due)
+            return [dict(self._items[item_id]) for _, item_id in self._by_due[start:end]]
+
+    def overdue(self, today: date, include_done: bool = False,
+                plan_id: Optional[int] = None) -> List[Tuple[Dict[str, Any], int]]:
+        """
+        (item, days overdue) for items due before today, most overdue first.
+        Only the sorted prefix of items due before today is visited, and days
+        come from the stored day numbers, so no due date is parsed here.
+        The items are shared with the index; don't modify them.
+        """
+        today_ordinal = today.toordinal()
+        with self._lock:
+            self._refresh()
+            self._stats["queries"] += 1
+            by_due = self._by_due if include_done else self._open_by_due
+            end = bisect.bisect_left(by_due, (today_ordinal,))
+            in_plan = self._by_plan.get(plan_id, {}) if plan_id is not None else None
+            return [
+                (self._items[item_id], today_ordinal - ordinal)
+                for ordinal, item_id in by_due[:end]
+                if in_plan is None or item_id in in_plan
+            ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "items": len(self._items),
+                "plans": len(self._by_plan),
+                "owners": len(self._by_owner),
+                "with_due_date": len(self._by_due),
+                "open_with_due_date": len(self._open_by_due),
+                "seq": self._subscription.since if self._subscription else None
+            })
+        return stats
+
+# Process-wide repositories
+plans = PlanRepository()
+tasks = TaskRepository()
+risks = RiskRepository()
+changes = ChangeFeed()
+work_items = WorkItemIndex()
+
+# One-shot import of the JSON files this database replaces
+def _parse_created_at(value: Optional[str]) -> datetime:
+    try:
+        return datetime.fromisoformat(value) if value else datetime.now()
+    except ValueError:
+        return datetime.now()
+
+def import_json_files(data_dir: str = "data", task_path: Optional[str] = None) -> Dict[str, int]:
+    """
+    Load data/plan.json, data/risk_*.json and task.json into the database.
+
+    Plans and check-ins already imported (same title or team lead and creation
+    time) are skipped, and tasks are upserted by ID, so running it twice is
+    harmless. Returns counts of what was imported.
+    """
+    counts = {"plans": 0, "stories": 0, "risk_checkins": 0, "tasks": 0}
+
+    plan_path = os.path.join(data_dir, "plan.json")
+    if os.path.exists(plan_path):
+        with open(plan_path, "r", encoding="utf-8") as f:
+            plan_data = json.load(f)
+        created_at = _parse_created_at(plan_data.get("created_at"))
+        with get_session() as session:
+            exists = session.exec(select(PlanRecord).where(PlanRecord.created_at == created_at)).first()
+        if not exists:
+            # Batch files keep each plan under "plans"; single plans are the top level
+            imported = plan_data.get("plans") or [plan_data]
+            plans.add_plans([{
+                "title": plan.get("title", ""),
+                "due_date": plan.get("due_date", ""),
+                "stories": plan.get("stories", []),
+                "plan_text": plan.get("plan_text")
+            } for plan in imported], created_at=created_at, batch="plans" in plan_data)
+            counts["plans"] += len(imported)
+            counts["stories"] += sum(len(plan.get("stories", [])) for plan in imported)
+
+    for risk_path in sorted(glob.glob(os.path.join(data_dir, "risk_*.json"))):
+        with open(risk_path, "r", encoding="utf-8") as f:
+            risk_data = json.load(f)
+        created_at = _parse_created_at(risk_data.get("timestamp"))
+        with get_session() as session:
+            exists = session.exec(select(RiskCheckInRecord).where(
+                RiskCheckInRecord.team_lead == risk_data.get("team_lead", ""),
+                RiskCheckInRecord.created_at == created_at
+            )).first()
+        if exists:
+            continue
+        # Only blockers were saved; items on track weren't
+        risks.add_checkin(risk_data.get("team_lead", ""), risk_data.get("blockers", []),
+                          {item["story_id"] for item in risk_data.get("needs_discussion", [])}, created_at)
+        counts["risk_checkins"] += 1
+
+    if task_path:
+        counts["tasks"] = import_task_json(task_path)
+
+    logger.info(f"Imported JSON data into {DB_PATH}: {counts}")
+    return counts
+
+def import_task_json(task_path: str) -> int:
+    """Upsert the tasks in a task.json file in one transaction. Returns how many were imported."""
+    if not os.path.exists(task_path):
+        return 0
+    with open(task_path, "r", encoding="utf-8") as f:
+        imported = [fields for fields in (task_from_json(task) for task in json.load(f)) if fields.get("id")]
+    if imported:
+        tasks.save_tasks(imported)
+    return len(imported)
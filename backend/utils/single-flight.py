@@ -0,0 +1,115 @@
+"""
+Single-flight coalescing of identical in-flight LLM requests.
+Concurrent callers asking for the same key share one execution: the first
+caller runs the work and the rest wait for its result. Counters show how many
+calls were coalesced instead of sent to the model.
+Following windsurf conventions: kebab-case filename, camelCase module usage.
+"""
+
+import re
+import asyncio
+import hashlib
+import logging
+import threading
+import weakref
+from typing import Any, Awaitable, Callable, Dict
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def prompt_key(prompt: str) -> str:
+    """Key for a completion prompt, ignoring differences in whitespace."""
+    normalized = re.sub(r"\s+", " ", prompt.strip())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+class _Call:
+    """A synchronous call in progress, shared by everyone waiting on its key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key into one execution."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        # Async tasks are bound to their event loop, so keep one table per loop
+        self._tasks = weakref.WeakKeyDictionary()
+        self._stats = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def _count(self, coalesced: bool):
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["coalesced" if coalesced else "executions"] += 1
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for the identical call already running (blocking)."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+        self._count(coalesced=not leader)
+
+        if not leader:
+            logger.info(f"Coalesced duplicate {self.name} request")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await factory() for key, or join the identical call already in flight.
+
+        The shared work runs as its own task, so a caller that is cancelled
+        (e.g. a closed browser tab) doesn't cancel it for everyone else.
+        """
+        tasks = self._tasks.setdefault(asyncio.get_running_loop(), {})
+        task = tasks.get(key)
+        self._count(coalesced=task is not None)
+
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            tasks[key] = task
+            task.add_done_callback(lambda _: tasks.pop(key, None))
+        else:
+            logger.info(f"Coalesced duplicate {self.name} request")
+
+        return await asyncio.shield(task)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return call, execution and coalesced counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = len(self._calls) + sum(len(tasks) for tasks in self._tasks.values())
+        stats["coalesced_rate"] = round(stats["coalesced"] / stats["calls"], 4) if stats["calls"] else 0.0
+        return stats
+
+# Shared groups so identical requests coalesce across modules
+plan_flight = SingleFlight("plan")
+completion_flight = SingleFlight("completion")
+
+def get_stats() -> Dict[str, Dict[str, Any]]:
+    """Return counters for every shared group."""
+    return {
+        "plan": plan_flight.get_stats(),
+        "completion": completion_flight.get_stats()
+    }
@@ -5,18 +5,27 @@ const LogViewer = ({ refreshTrigger }) => {
   const [loading, setLoading] = useState(true);
   const [logEntries, setLogEntries] = useState([]);
   const [error, setError] = useState(null);
+  // Cursor for the next (older) page of the unfiltered log
+  const [nextCursor, setNextCursor] = useState(null);
+  // Entries in the whole log (or matching the filters), not just those loaded
+  const [totalEntries, setTotalEntries] = useState(0);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [filter, setFilter] = useState({
     keyword: '',
     dateFrom: '',
     dateTo: '',
   });
 
-  // Function to fetch log entries from the API
+  // Function to fetch the newest page of log entries from the API
   const fetchLogEntries = async () => {
     setLoading(true);
     try {
-      const response = await axios.get('http://localhost:8000/api/log');
+      const response = await axios.get('http://localhost:8000/api/log', {
+        params: { limit: 50 }
+      });
       setLogEntries(response.data.entries);
+      setTotalEntries(response.data.total_entries);
+      setNextCursor(response.data.has_more ? response.data.next_cursor : null);
       setError(null);
     } catch (err) {
       console.error('Error fetching log entries:', err);
@@ -26,6 +35,25 @@ const LogViewer = ({ refreshTrigger }) => {
     }
   };
 
+  // Function to append the next page of older entries
+  const fetchOlderEntries = async () => {
+    if (nextCursor === null) return;
+    setLoadingMore(true);
+    try {
+      const response = await axios.get('http://localhost:8000/api/log', {
+        params: { limit: 50, before: nextCursor }
+      });
+      setLogEntries((entries) => [...entries, ...response.data.entries]);
+      setTotalEntries(response.data.total_entries);
+      setNextCursor(response.data.has_more ? response.data.next_cursor : null);
+    } catch (err) {
+      console.error('Error fetching older log entries:', err);
+      setError('Failed to load older log entries. Please try again later.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Function to filter log entries
   const filterLogEntries = async () => {
     setLoading(true);
@@ -37,6 +65,8 @@ const LogViewer = ({ refreshTrigger }) => {
         limit: 50
       });
       setLogEntries(response.data.entries);
+      setTotalEntries(response.data.total_entries);
+      setNextCursor(null);
       setError(null);
     } catch (err) {
       console.error('Error filtering log entries:', err);
@@ -161,6 +191,9 @@ const LogViewer = ({ refreshTrigger }) => {
         </div>
       ) : (
         <div className="overflow-hidden border border-gray-200 rounded-md">
+          <div className="px-4 py-2 text-xs text-gray-500 bg-gray-50 border-b border-gray-200">
+            Showing {logEntries.length} of {totalEntries} entries
+          </div>
           <ul className="divide-y divide-gray-200">
             {logEntries.map((entry, index) => (
               <li key={index} className="p-4 hover:bg-gray-50">
@@ -175,6 +208,17 @@ const LogViewer = ({ refreshTrigger }) => {
               </li>
             ))}
           </ul>
+          {nextCursor !== null && (
+            <div className="p-3 text-center border-t border-gray-200">
+              <button
+                onClick={fetchOlderEntries}
+                className="px-3 py-1 bg-gray-200 hover:bg-gray-300 rounded text-sm"
+                disabled={loadingMore}
+              >
+                {loadingMore ? 'Loading...' : 'Load older entries'}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
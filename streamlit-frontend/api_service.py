@@ -55,7 +55,7 @@ class ApiService:
             response.raise_for_status()
             result = response.json()
             
-            # Update the task.json file with the new plan
+            # Record the new plan as a task
             cls._update_task_json(project_name, description, team_members, result)
             
             # Log the action in project_log.md
@@ -76,31 +76,13 @@ class ApiService:
     
     @classmethod
     def _update_task_json(cls, project_name, description, team_members, plan_result):
-        """Update task.json with the new plan according to windsurf requirements"""
+        """Add the new plan as a task according to windsurf requirements"""
         try:
-            import json
-            import os
-            
-            # Path to task.json in the project root
-            task_json_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "task.json")
-            
-            # Load existing tasks if available
-            tasks = []
-            if os.path.exists(task_json_path):
-                with open(task_json_path, 'r') as f:
-                    tasks = json.load(f)
-            
-            # Get the next task ID
-            next_id = 1
-            if tasks:
-                # Extract numbers from existing task IDs and find the maximum
-                existing_ids = [int(task["Task ID"].split('-')[1]) for task in tasks if "Task ID" in task and task["Task ID"].startswith("TSK-")]
-                if existing_ids:
-                    next_id = max(existing_ids) + 1
+            # The shared task repository allocates the next TSK- ID and stores the task in the project database
+            from task_service import task_repository
             
             # Create a new task for the plan
             new_task = {
-                "Task ID": f"TSK-{next_id:03d}",
                 "Title": f"Plan: {project_name}",
                 "Status": "InProgress",
                 "Dependencies": "",
@@ -111,45 +93,26 @@ class ApiService:
             }
             
             # Add the new task
-            tasks.append(new_task)
+            task_id = task_repository.add(new_task)
+            if not task_id:
+                return False
             
-            # Save the updated task.json
-            with open(task_json_path, 'w') as f:
-                json.dump(tasks, f, indent=2)
-            
-            print(f"Updated task.json with new plan task: {new_task['Task ID']}")
+            print(f"Added new plan task: {task_id}")
             return True
         except Exception as e:
-            print(f"Error updating task.json: {str(e)}")
+            print(f"Error adding plan task: {str(e)}")
             return False
     
     @classmethod
     def _append_to_project_log(cls, message):
         """Append a message to project_log.md with timestamp according to windsurf rules"""
-        try:
-            import os
-            from datetime import datetime
-            
-            # Path to project_log.md in the project root
-            log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project_log.md")
-            
-            # Create the file if it doesn't exist
-            if not os.path.exists(log_path):
-                with open(log_path, 'w') as f:
-                    f.write("# Project Log\n\n")
-            
-            # Format timestamp according to windsurf format (YYYY‑MM‑DD HH:MM)
-            timestamp = datetime.now().strftime("%Y‑%m‑%d %H:%M")
-            
-            # Append the log entry
-            with open(log_path, 'a') as f:
-                f.write(f"- **{timestamp}**: {message}\n")
-            
-            print(f"Added entry to project_log.md: {message}")
-            return True
-        except Exception as e:
-            print(f"Error updating project_log.md: {str(e)}")
+        # The shared writer creates the file with its header and formats the timestamp (YYYY‑MM‑DD HH:MM)
+        from log_service import log_writer
+        
+        if not log_writer.append_entry(message):
             return False
+        print(f"Added entry to project_log.md: {message}")
+        return True
     
     @staticmethod
     def send_risk_checkin(task_id: str, recipients: List[str], message: str) -> Dict:
@@ -12,8 +12,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import services
 from api_service import ApiService
-from task_service import TaskService
-from log_service import LogService
+from task_service import TaskService, task_repository
+from log_service import LogService, log_writer
 
 # Import command handlers from separate files for modularity
 from digest_command import handle_digest_command
@@ -36,21 +36,8 @@ st.sidebar.title("PM Agent")
 
 # Function to log frontend actions to project_log.md
 def log_action(action_description):
-    try:
-        log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project_log.md")
-        
-        # Read existing content
-        with open(log_path, "r") as f:
-            content = f.read()
-        
-        # Append new entry
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        with open(log_path, "w") as f:
-            f.write(content + f"\n- **{timestamp}**: {action_description}")
-            
+    if log_writer.append_entry(action_description):
         print(f"Logged action: {action_description}")
-    except Exception as e:
-        print(f"Failed to update project log: {e}")
 
 # API Connection functions
 def check_api_health():
@@ -64,8 +51,8 @@ def check_api_health():
 
 def load_tasks():
     try:
-        with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "task.json"), "r") as f:
-            return json.load(f)
+        # Served from the shared in-memory task repository, including changes not yet written
+        return task_repository.list_tasks()
     except Exception as e:
         st.error(f"Error loading tasks: {e}")
         return []
@@ -160,7 +147,7 @@ def handle_risk_command():
     st.header("Risk Check-In")
     st.subheader("Send Risk Assessment to Team Leads")
     
-    # Load current tasks from task.json
+    # Load current tasks
     tasks = load_tasks()
     
     # Filter tasks for active stories
@@ -177,7 +164,7 @@ def handle_risk_command():
         # Identify team leads from task owners
         team_leads = set()
         for task in active_tasks:
-            # Extract details based on task.json format
+            # Extract details based on the task fields
             details = task.get("Details", "")
             if "Dev:" in details:
                 for dev in [part.strip() for part in details.split(";") if "Dev:" in part]:
@@ -307,7 +294,7 @@ def handle_alerts_command():
     st.header("Task Alerts")
     st.subheader("Daily Overdue Alerts")
     
-    # Load current tasks from task.json
+    # Load current tasks
     tasks = load_tasks()
     
     # Add date filter for overdue tasks
@@ -460,30 +447,8 @@ def handle_log_command():
     st.subheader("View Project Activities")
     
     try:
-        # Read the project log content
-        log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project_log.md")
-        with open(log_path, "r") as f:
-            log_content = f.read()
-        
-        # Parse log entries and organize them
-        import re
-        pattern = r'\- \*\*(.*?)\*\*: (.+)'
-        entries = []
-        
-        for match in re.finditer(pattern, log_content):
-            timestamp_str = match.group(1)
-            message = match.group(2)
-            
-            # Convert Unicode hyphens to regular hyphens for parsing
-            timestamp_str = timestamp_str.replace('\u2011', '-')
-            
-            try:
-                entries.append({
-                    "timestamp": timestamp_str,
-                    "message": message
-                })
-            except Exception:
-                pass  # Skip unparseable entries
+        # Parsed entries come from the shared cache, which only parses bytes appended since the last rerun
+        entries = LogService.get_timeline_entries()
         
         # Add filtering options
         st.sidebar.header("Log Filters")
@@ -510,8 +475,9 @@ def handle_log_command():
                 "System Events": ["loaded", "created", "updated", "initialized"]
             }
             
+            # Any of the category's keywords, looked up in the keyword index rather than scanning every message
             keywords = filter_keywords.get(selected_filter, [])
-            filtered_entries = [entry for entry in entries if any(kw.lower() in entry["message"].lower() for kw in keywords)]
+            filtered_entries = LogService.search_timeline_entries(" OR ".join(keywords))
         
         # Sort entries by timestamp (newest first)
         filtered_entries.reverse()
@@ -639,7 +605,7 @@ if page == "Home":
         ## PM Agent - Windsurf Project Structure
         
         This application follows strict windsurf project architecture with kebab-case files and camelCase modules.
-        All commands are tracked in `task.json` and logged in `project_log.md` to avoid module name errors and hallucinations.
+        All commands are tracked as tasks in the project database and logged in `project_log.md` to avoid module name errors and hallucinations.
         
         ### Detailed Command Usage:
         
@@ -652,7 +618,7 @@ if page == "Home":
         
         #### /risk Command
         Sends risk assessment surveys to team leads about specific tasks:
-        - **task_id**: ID from task.json (e.g., TSK-004) (required)
+        - **task_id**: task ID (e.g., TSK-004) (required)
         - **recipients**: Email addresses for notifications (required)
         - **team_lead**: Primary contact for the risk assessment (required)
         - **message**: Additional context for the risk survey (optional)
@@ -688,7 +654,7 @@ if page == "Home":
         API calls fail.
         """)
     
-    # Display tasks from task.json
+    # Display tasks from the project database
     st.subheader("Current Tasks")
     tasks = load_tasks()
     
@@ -5,7 +5,7 @@ def handle_digest_command():
     import os
     import io
     import base64
-    from datetime import datetime
+    from datetime import datetime, timedelta
     import matplotlib.pyplot as plt
     from PIL import Image
     import sys
@@ -16,6 +16,7 @@ def handle_digest_command():
     
     from api_service import ApiService
     from helpers import load_tasks, log_action
+    from log_service import LogService
     
     st.header("Project Digest")
     st.subheader("Generate Project Status Report")
@@ -41,6 +42,9 @@ def handle_digest_command():
     with col2:
         recipients = st.text_input("Recipients (comma-separated emails)")
         audience = st.selectbox("Target Audience", ["Executives", "Technical Team", "Stakeholders", "All"])
+        timeline_range = st.date_input("Timeline Period",
+                                       [datetime.now() - timedelta(days=30), datetime.now()],
+                                       format="YYYY-MM-DD")
     
     # Report content options
     st.subheader("Report Content")
@@ -194,21 +198,14 @@ def handle_digest_command():
                             st.markdown("### Project Timeline")
                             st.markdown("#### Recent Activities")
                             
-                            # Show a timeline of activities from project_log.md
+                            # Show a timeline of activities from the project log, including rotated months
                             try:
-                                log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project_log.md")
-                                with open(log_path, "r") as f:
-                                    log_content = f.read()
-                                
-                                # Parse and show recent entries
-                                import re
-                                pattern = r'\- \*\*(.*?)\*\*: (.+)'
-                                entries = []
-                                
-                                for match in re.finditer(pattern, log_content):
-                                    timestamp_str = match.group(1)
-                                    message = match.group(2)
-                                    entries.append((timestamp_str, message))
+                                # A single picked date is a one-day period
+                                period = list(timeline_range) if isinstance(timeline_range, (list, tuple)) else [timeline_range]
+                                date_from = period[0].strftime('%Y-%m-%d') if period else None
+                                date_to = period[-1].strftime('%Y-%m-%d') if period else None
+                                entries = [(entry["timestamp"], entry["message"])
+                                           for entry in LogService.get_history_entries(date_from, date_to)]
                                 
                                 # Show most recent entries first
                                 entries.reverse()
@@ -222,7 +219,7 @@ def handle_digest_command():
                                             for date, message in entries[5:15]:
                                                 st.markdown(f"**{date}:** {message}")
                                 else:
-                                    st.info("No project activities logged yet.")
+                                    st.info("No project activities logged in this period.")
                             except Exception as e:
                                 st.error(f"Could not load project log: {str(e)}")
                         
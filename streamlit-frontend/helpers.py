@@ -6,30 +6,19 @@ import os
 import json
 import streamlit as st
 from datetime import datetime
+from log_service import log_writer
+from task_service import task_repository
 
 def load_tasks():
-    """Load tasks from task.json"""
+    """Load tasks from the project database"""
     try:
-        with open(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "task.json"), "r") as f:
-            return json.load(f)
+        # Served from the shared in-memory task repository, including changes not yet written
+        return task_repository.list_tasks()
     except Exception as e:
         st.error(f"Error loading tasks: {e}")
         return []
 
 def log_action(action_description):
     """Log action to project_log.md"""
-    try:
-        log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project_log.md")
-        
-        # Read existing content
-        with open(log_path, "r") as f:
-            content = f.read()
-        
-        # Append new entry
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-        with open(log_path, "w") as f:
-            f.write(content + f"\n- **{timestamp}**: {action_description}")
-            
+    if log_writer.append_entry(action_description):
         print(f"Logged action: {action_description}")
-    except Exception as e:
-        print(f"Failed to update project log: {e}")
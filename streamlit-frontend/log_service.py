@@ -1,14 +1,46 @@
 import os
+import sys
+import importlib.util
 from datetime import datetime
 from typing import List, Optional
 
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+
+def _load_backend_util(filename: str, module_name: str):
+    """Load a backend utility (backend/utils/<filename>) by path."""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    path = os.path.join(BACKEND_DIR, "utils", filename)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+# Shared append-only project log writer, parsed-entry cache, keyword index, rotated
+# log history, versioned document helpers and project database (tasks), also used by the backend
+log_writer = _load_backend_util("log-writer.py", "log_writer")
+log_cache = _load_backend_util("log-cache.py", "log_cache")
+log_search = _load_backend_util("log-search.py", "log_search")
+log_segments = _load_backend_util("log-segments.py", "log_segments")
+doc_store = _load_backend_util("doc-store.py", "doc_store")
+project_db = _load_backend_util("project-db.py", "project_db")
+
+def _make_timeline_entry(timestamp_str: str, message: str) -> dict:
+    """Build a timeline entry from a parsed (timestamp, message) log pair"""
+    # Convert Unicode hyphens to regular hyphens for display
+    return {
+        "timestamp": timestamp_str.replace('\u2011', '-'),
+        "message": message
+    }
+
 class LogService:
     """Service for managing project log entries according to windsurf standards"""
     
     @staticmethod
     def get_log_path() -> str:
         """Get the absolute path to the project_log.md file"""
-        return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project_log.md")
+        return log_writer.PROJECT_LOG_PATH
     
     @staticmethod
     def read_log() -> str:
@@ -21,23 +53,53 @@ class LogService:
             return "# Project Log\n\n*No entries found*"
     
     @staticmethod
-    def append_log_entry(action_description: str) -> bool:
-        """Append a new entry to the project log"""
+    def get_timeline_entries() -> List[dict]:
+        """
+        Get every log entry as {"timestamp", "message"}, oldest first.
+        Entries come from the process-wide parsed-log cache, which survives
+        Streamlit reruns and only parses bytes appended since the last read.
+        """
         try:
-            log_path = LogService.get_log_path()
-            
-            # Read existing content
-            content = LogService.read_log()
-            
-            # Append new entry
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-            with open(log_path, "w") as f:
-                f.write(content + f"\n- **{timestamp}**: {action_description}")
-                
-            return True
+            return log_cache.get_cache(LogService.get_log_path()).entries(_make_timeline_entry)
         except Exception as e:
-            print(f"Failed to update project log: {e}")
-            return False
+            print(f"Error reading project log: {e}")
+            return []
+    
+    @staticmethod
+    def get_history_entries(date_from: Optional[str] = None, date_to: Optional[str] = None) -> List[dict]:
+        """
+        Get the log entries dated within [date_from, date_to] (YYYY-MM-DD), oldest first.
+        Unlike get_timeline_entries this includes months rotated out to compressed
+        segments (see log-segments.py); only the segments overlapping the window are opened.
+        """
+        try:
+            entries = log_segments.default_history.entries(_make_timeline_entry, date_from, date_to)
+            return [
+                entry for entry in entries
+                if (not date_from or entry["timestamp"][:10] >= date_from)
+                and (not date_to or entry["timestamp"][:10] <= date_to)
+            ]
+        except Exception as e:
+            print(f"Error reading project log history: {e}")
+            return []
+    
+    @staticmethod
+    def search_timeline_entries(query: str) -> List[dict]:
+        """
+        Get the log entries matching a keyword query (see log-search.py), oldest first.
+        Words are matched as prefixes through the shared keyword index.
+        """
+        try:
+            index = log_search.get_index(log_cache.get_cache(LogService.get_log_path()))
+            return [_make_timeline_entry(timestamp_str, message) for timestamp_str, message in index.filter(query, prefix=True)]
+        except Exception as e:
+            print(f"Error searching project log: {e}")
+            return []
+    
+    @staticmethod
+    def append_log_entry(action_description: str) -> bool:
+        """Append a new entry to the project log"""
+        return log_writer.append_entry(action_description)
     
     @staticmethod
     def get_recent_entries(count: int = 10) -> List[str]:
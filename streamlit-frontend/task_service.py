@@ -1,55 +1,256 @@
-import json
 import os
-from datetime import datetime
+import atexit
+import threading
+from contextlib import contextmanager
 from typing import List, Dict, Any, Optional
+from log_service import log_writer, project_db
+
+# Legacy task.json in the project root, imported into the project database on first use
+TASK_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "task.json")
+
+# Seconds to coalesce task changes before writing them; 0 writes at every commit point
+TASK_FLUSH_DELAY = float(os.getenv("TASK_FLUSH_DELAY", "0"))
+
+TASK_ID_PREFIX = "TSK-"
+
+def _task_number(task_id: str) -> int:
+    """Number of a TSK- ID, or 0 for other IDs"""
+    if task_id.startswith(TASK_ID_PREFIX):
+        try:
+            return int(task_id[len(TASK_ID_PREFIX):])
+        except ValueError:
+            pass
+    return 0
+
+class TaskRepository:
+    """
+    Tasks from the project database (the tasks table the backend reads), held
+    in memory as a dict keyed by Task ID, with task.json's keys.
+    Lookups and ID allocation never touch the database. Changes are written
+    back either at the end of each change, once at the end of a batch(), or
+    coalesced on a timer (TASK_FLUSH_DELAY), in one transaction that also
+    records them in the change feed. If another process took an ID allocated
+    here first, the task is stored under the next free one. The tasks are
+    reloaded only after some connection has committed to the database.
+    """
+    
+    def __init__(self, path: str = TASK_PATH, flush_delay: float = TASK_FLUSH_DELAY):
+        self.path = path
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._tasks: Dict[str, Dict] = {}
+        # Database data_version self._tasks reflects (None: reload on the next read)
+        self._probe = project_db.DataVersionProbe()
+        self._data_version: Optional[int] = None
+        self._legacy_checked = False  # whether task.json was considered for import
+        self._last_id = 0  # highest TSK- number seen or allocated; never goes down
+        # Changes not yet written: changed tasks by ID, IDs allocated here, and whether replace_all() was called
+        self._pending: Dict[str, Dict] = {}
+        self._added = set()
+        self._replace = False
+        # IDs allocated here that another process took first, and what they were written as
+        self._renamed: Dict[str, str] = {}
+        self._batch_depth = 0
+        self._timer: Optional[threading.Timer] = None
+        self._stats = {"loads": 0, "writes": 0, "changes": 0, "renumbered": 0}
+    
+    def _sync(self):
+        """Reload the tasks if the database changed, keeping unwritten changes on top (caller holds the lock)."""
+        if self._replace:
+            return
+        if not self._legacy_checked:
+            self._legacy_checked = True
+            if project_db.tasks.count() == 0:
+                imported = project_db.import_task_json(self.path)
+                if imported:
+                    print(f"Imported {imported} tasks from {self.path} into the project database")
+        # Taken before reading, so a commit that races the reload is seen next time
+        data_version = self._probe.read()
+        if data_version == self._data_version:
+            return
+        self._tasks = {}
+        for task in project_db.tasks.list_task_json():
+            self._tasks[task["Task ID"]] = task
+            self._note_id(task["Task ID"])
+        self._tasks.update(self._pending)
+        self._data_version = data_version
+        self._stats["loads"] += 1
+    
+    def _note_id(self, task_id: str):
+        self._last_id = max(self._last_id, _task_number(task_id))
+    
+    def _allocate_id(self) -> str:
+        self._last_id += 1
+        return f"{TASK_ID_PREFIX}{str(self._last_id).zfill(3)}"
+    
+    def next_id(self) -> str:
+        """Allocate the next TSK- ID"""
+        with self._lock:
+            self._sync()
+            return self._allocate_id()
+    
+    def list_tasks(self) -> List[Dict]:
+        """Every task in file order (copies, safe to modify)"""
+        with self._lock:
+            self._sync()
+            return [dict(task) for task in self._tasks.values()]
+    
+    def get(self, task_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._sync()
+            task = self._tasks.get(task_id)
+            return dict(task) if task is not None else None
+    
+    def add(self, task: Dict) -> Optional[str]:
+        """
+        Add a task, allocating its Task ID if it has none, and return the ID.
+        If another process took the same ID first, the task is written under the
+        next free one, and that is the ID returned when the write happens now.
+        Returns None if writing it failed; the task is kept and written with the next change.
+        """
+        with self._lock:
+            self._sync()
+            task = dict(task)
+            if not task.get("Task ID"):
+                task = {"Task ID": self._allocate_id(), **task}
+                self._added.add(task["Task ID"])
+            else:
+                self._note_id(task["Task ID"])
+            task_id = task["Task ID"]
+            self._tasks[task_id] = self._pending[task_id] = task
+            if not self._changed():
+                return None
+            return self._renamed.pop(task_id, task_id)
+    
+    def update(self, task_id: str, fields: Dict) -> bool:
+        """Set fields (task.json keys) on a task; False if it doesn't exist or writing it failed"""
+        with self._lock:
+            self._sync()
+            task = self._tasks.get(task_id)
+            if task is None:
+                return False
+            task.update(fields)
+            self._pending[task_id] = task
+            return self._changed()
+    
+    def replace_all(self, tasks: List[Dict]) -> bool:
+        """Replace every task, deleting stored tasks not listed (IDs allocated so far stay used)"""
+        with self._lock:
+            self._tasks = {}
+            for task in tasks:
+                self._tasks[task.get("Task ID", "")] = dict(task)
+                self._note_id(task.get("Task ID", ""))
+            self._replace = True
+            return self._changed()
+    
+    @contextmanager
+    def batch(self):
+        """Group changes so they cost one write, made when the outermost batch ends"""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._is_dirty() and self.flush_delay <= 0:
+                    self._flush()
+    
+    def _is_dirty(self) -> bool:
+        return bool(self._pending) or self._replace
+    
+    def _changed(self) -> bool:
+        """
+        Record a change and write it now, at the end of the batch, or when the timer fires.
+        Returns False only if writing it now failed.
+        """
+        self._stats["changes"] += 1
+        if self.flush_delay > 0:
+            if self._timer is None:
+                self._timer = threading.Timer(self.flush_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        elif self._batch_depth == 0:
+            return self._flush()
+        return True
+    
+    def flush(self) -> bool:
+        """Write pending changes to the project database"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._is_dirty():
+                return True
+            return self._flush()
+    
+    def _flush(self) -> bool:
+        """Write the pending changes to the database in one transaction (caller holds the lock)."""
+        changed = list(self._tasks.values()) if self._replace else list(self._pending.values())
+        try:
+            renamed = project_db.tasks.save_tasks(
+                [project_db.task_from_json(task) for task in changed],
+                new_ids=set() if self._replace else self._added,
+                replace=self._replace
+            )
+        except Exception as e:
+            print(f"Error saving tasks: {e}")
+            return False
+        if renamed:
+            print(f"Task IDs taken by another writer were renumbered: {renamed}")
+            self._renamed.update(renamed)
+            self._stats["renumbered"] += len(renamed)
+            for stored_id in renamed.values():
+                self._note_id(stored_id)
+        self._pending = {}
+        self._added = set()
+        self._replace = False
+        # Reload with what was stored (renumbered IDs included) on the next read
+        self._data_version = None
+        self._stats["writes"] += 1
+        return True
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "tasks": len(self._tasks),
+                "last_id": self._last_id,
+                "data_version": self._data_version,
+                "dirty": self._is_dirty()
+            })
+        return stats
+
+# Shared by every Streamlit session (modules survive reruns) and by ApiService
+task_repository = TaskRepository()
+atexit.register(task_repository.flush)
 
 class TaskService:
-    """Service for handling task.json and project data"""
+    """Service for handling tasks and project data"""
     
     @staticmethod
     def load_tasks() -> List[Dict]:
-        """Load tasks from task.json"""
+        """Load tasks from the project database"""
         try:
-            task_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "task.json")
-            with open(task_path, "r") as f:
-                return json.load(f)
+            return task_repository.list_tasks()
         except Exception as e:
             print(f"Error loading tasks: {e}")
             return []
     
     @staticmethod
     def save_tasks(tasks: List[Dict]) -> bool:
-        """Save tasks to task.json"""
+        """Replace the stored tasks"""
         try:
-            task_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "task.json")
-            with open(task_path, "w") as f:
-                json.dump(tasks, f, indent=2)
-            return True
+            return task_repository.replace_all(tasks)
         except Exception as e:
             print(f"Error saving tasks: {e}")
             return False
     
     @staticmethod
     def add_task(task_data: Dict) -> str:
-        """Add a new task to task.json"""
-        tasks = TaskService.load_tasks()
-        
-        # Generate task ID
-        last_id = 0
-        for task in tasks:
-            if task.get("Task ID", "").startswith("TSK-"):
-                try:
-                    task_num = int(task.get("Task ID", "TSK-0").split("-")[1])
-                    if task_num > last_id:
-                        last_id = task_num
-                except ValueError:
-                    pass
-        
-        new_id = f"TSK-{str(last_id + 1).zfill(3)}"
-        
-        # Create new task
+        """Add a new task"""
+        # Create new task; the repository allocates the next TSK- ID
         new_task = {
-            "Task ID": new_id,
             "Title": task_data.get("Title", "Untitled Task"),
             "Status": task_data.get("Status", "Todo"),
             "Dependencies": task_data.get("Dependencies", ""),
@@ -59,52 +260,31 @@ class TaskService:
             "Test Strategy": task_data.get("Test Strategy", "")
         }
         
-        tasks.append(new_task)
-        
-        # Save updated tasks
-        if TaskService.save_tasks(tasks):
-            return new_id
-        return ""
+        try:
+            return task_repository.add(new_task) or ""
+        except Exception as e:
+            print(f"Error adding task: {e}")
+            return ""
     
     @staticmethod
     def update_task_status(task_id: str, new_status: str) -> bool:
         """Update the status of a task"""
-        tasks = TaskService.load_tasks()
-        
-        for task in tasks:
-            if task.get("Task ID") == task_id:
-                task["Status"] = new_status
-                return TaskService.save_tasks(tasks)
-        
-        return False
+        try:
+            return task_repository.update(task_id, {"Status": new_status})
+        except Exception as e:
+            print(f"Error updating task: {e}")
+            return False
     
     @staticmethod
     def get_task_by_id(task_id: str) -> Optional[Dict]:
         """Get a task by its ID"""
-        tasks = TaskService.load_tasks()
-        
-        for task in tasks:
-            if task.get("Task ID") == task_id:
-                return task
-        
-        return None
+        try:
+            return task_repository.get(task_id)
+        except Exception as e:
+            print(f"Error loading tasks: {e}")
+            return None
     
     @staticmethod
     def log_task_action(task_id: str, action: str) -> bool:
         """Log a task action to project_log.md"""
-        try:
-            log_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "project_log.md")
-            
-            # Read existing content
-            with open(log_path, "r") as f:
-                content = f.read()
-            
-            # Append new entry
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
-            with open(log_path, "w") as f:
-                f.write(content + f"\n- **{timestamp}**: {action} for task {task_id}")
-                
-            return True
-        except Exception as e:
-            print(f"Failed to update project log: {e}")
-            return False
+        return log_writer.append_entry(f"{action} for task {task_id}")